@@ -0,0 +1,80 @@
+import requests
+
+from ..cli.capabilities import get_host_capabilities
+from .index import get_chart_versions
+
+MANIFEST_TYPE = "application/vnd.oci.image.manifest.v1+json"
+
+
+def get_chart_dependencies(
+    registry_url: str,
+    chart_path: str,
+    version: str,
+    headers: dict[str, str] | None = None,
+) -> list[dict]:
+    """Gets the `dependencies` a Helm chart version declares in its Chart.yaml.
+
+    The chart archive is not downloaded: classic repositories carry the Chart.yaml
+    metadata in the entries of their cached `index.yaml` (see `get_chart_versions`),
+    OCI registries in the config blob of the chart manifest.
+
+    Args:
+        registry_url (str): URL of the Helm chart's registry.
+        chart_path (str): The path or name of the Helm chart.
+        version (str): The version of the Helm chart.
+        headers (Optional[Dict[str, str]]): Optional headers for authenticating the request.
+
+    Returns:
+        list[dict]: The dependencies, each with `name`, `version` and `repository`.
+
+    Raises:
+        requests.exceptions.RequestException: If the metadata cannot be fetched.
+        ValueError: If the chart version does not exist in the repository.
+    """
+    headers = headers or {}
+    if not registry_url.startswith(("http://", "https://")):
+        registry_url = f"https://{registry_url}"
+
+    if not get_host_capabilities(registry_url).oci:
+        entry = get_chart_versions(registry_url, chart_path, headers).get(version)
+        if entry is None:
+            raise ValueError(f"Version {version} not found for chart {chart_path}")
+        return entry.get("dependencies") or []
+
+    base_url = f"{registry_url.rstrip('/')}/v2/{chart_path}"
+    response = requests.get(
+        f"{base_url}/manifests/{version}",
+        headers={**headers, "Accept": MANIFEST_TYPE},
+        timeout=10,
+    )
+    response.raise_for_status()
+    config_digest = response.json()["config"]["digest"]
+    response = requests.get(f"{base_url}/blobs/{config_digest}", headers=headers, timeout=10)
+    response.raise_for_status()
+    return response.json().get("dependencies") or []
+
+
+def dependency_source(repository: str, name: str) -> tuple[str, str] | None:
+    """Maps the repository of a dependency to the source registry and chart of a chart entry.
+
+    Example inputs:
+      - ("oci://registry-1.docker.io/bitnamicharts", "common")
+        -> ("registry-1.docker.io", "bitnamicharts/common")
+      - ("https://charts.bitnami.com/bitnami", "common")
+        -> ("charts.bitnami.com/bitnami", "common")
+
+    Args:
+        repository (str): The `repository` of the dependency.
+        name (str): The `name` of the dependency.
+
+    Returns:
+        tuple[str, str] | None: The source registry and chart, or None if the
+        dependency is vendored (`file://`, no repository) or refers to a repository
+        by its local alias (`@stable`, `alias:stable`), which cannot be resolved.
+    """
+    if repository.startswith("oci://"):
+        host, _, path = repository.removeprefix("oci://").strip("/").partition("/")
+        return host, f"{path}/{name}" if path else name
+    if repository.startswith(("https://", "http://")):
+        return repository.split("://", 1)[1].rstrip("/"), name
+    return None
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+
+import yaml
+
+from ..cli.cache import get_cache_path
+from ..models.config.config_image import ConfigImage
+from ..models.resources.image import Image
+from .index import SafeLoader
+from .utils import iter_chart_files
+
+CACHE_FILE = "chart-images.json"
+# the registry `Image` pulls Docker Hub images from
+DOCKER_HUB = "registry-1.docker.io"
+
+_IMAGE_REF = re.compile(
+    r"^[a-z0-9][a-z0-9._/-]*(?::\d+/[a-z0-9][a-z0-9._/-]*)?"
+    r"(?::(?P<tag>\w[\w.-]{0,127}))?(?P<digest>@sha256:[0-9a-f]{64})?$"
+)
+# literal image references in templates, e.g. `image: busybox:1.36`
+_TEMPLATE_IMAGE = re.compile(r"""^\s*(?:-\s*)?image:\s*["']?([^\s"'{}]+)["']?\s*(?:#.*)?$""")
+
+# discovered images by chart archive digest and archive digest by chart reference,
+# loaded from the cache folder once per run
+_cache: dict[str, dict] | None = None
+_lock = threading.Lock()
+
+
+def cached_chart_images(chart_ref: str) -> list[str] | None:
+    """Gets the images discovered in a chart version during an earlier sync.
+
+    Args:
+        chart_ref (str): The reference of the chart version in its source, e.g.
+            "https://charts.longhorn.io/longhorn:1.7.2".
+
+    Returns:
+        list[str] | None: The image references, or None if the chart version has not
+        been inspected yet.
+    """
+    with _lock:
+        cache = _load_cache()
+        digest = cache["refs"].get(chart_ref)
+        return cache["digests"].get(digest) if digest else None
+
+
+def discover_chart_images(chart_path: str, chart_ref: str | None = None) -> list[str]:
+    """Discovers the container images a Helm chart archive references.
+
+    Image references are collected from the `values.yaml` files of the chart and
+    its vendored subcharts, both `image: repo:tag` strings and `repository`/`tag`
+    mappings, and from the literal `image:` lines of the templates. Templated image
+    lines are covered by the values they are rendered from. Missing tags default to
+    the `appVersion` of the (sub)chart, as the usual Helm templates do; references
+    pinned only by digest are skipped, as images are synced by tag.
+
+    The archive is read with `iter_chart_files`, without extracting it. Results are
+    cached by the digest of the archive, in memory and in the cache folder, so a
+    chart is inspected only once.
+
+    Args:
+        chart_path (str): The file path of the tar.gz Helm chart archive.
+        chart_ref (str, optional): The reference of the chart version in its source,
+            recorded so `cached_chart_images` finds the result without the archive.
+            Defaults to None.
+
+    Returns:
+        list[str]: The sorted image references, each with a tag.
+
+    Raises:
+        OSError: If the archive cannot be read.
+        tarfile.TarError: If the archive is not a tar.gz archive.
+    """
+    sha256_hash = hashlib.sha256()
+    with open(chart_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256_hash.update(chunk)
+    digest = f"sha256:{sha256_hash.hexdigest()}"
+
+    with _lock:
+        images = _load_cache()["digests"].get(digest)
+    if images is None:
+        images = _scan_chart(chart_path)
+        logging.info(f"discovered {len(images)} images in chart: {chart_ref or chart_path}")
+
+    with _lock:
+        cache = _load_cache()
+        cache["digests"][digest] = images
+        if chart_ref:
+            cache["refs"][chart_ref] = digest
+        _save_cache(cache)
+    return images
+
+
+def chart_image_configs(
+    discovered: list[tuple[str, str]], configured: list[Image]
+) -> list[ConfigImage]:
+    """Turns the images discovered in charts into image resources.
+
+    References are parsed the way `Image` parses them (see `_normalize_image`), e.g.
+    `redis:7.2` is pulled from `registry-1.docker.io/library/redis`. Every image keeps its
+    repository path below the target of the chart, e.g. `bitnami/redis` is mirrored
+    to `<images_target>/bitnami/redis` and `redis` to `<images_target>/library/redis`. Images
+    discovered in several charts are synced once, tags already synced to the same
+    target by a configured image are left out, and targets receiving the same tags
+    of a source are combined into one resource, so the source is pulled only once.
+
+    Args:
+        discovered (list[tuple[str, str]]): The image references and the image target
+            of the chart they were discovered in.
+        configured (list[Image]): The images of the sync config.
+
+    Returns:
+        list[ConfigImage]: The image resources to sync.
+    """
+    configured_tags = {
+        (f"{i.source_registry}/{i.source_repo}", target, tag)
+        for i in configured
+        for target in i.targets
+        for tag in i.tags
+    }
+
+    tags_by_target: dict[str, dict[str, set[str]]] = {}
+    for ref, images_target in discovered:
+        registry, repo, tag = _normalize_image(ref)
+        source = f"{registry}/{repo}"
+        target = f"{images_target.rstrip('/')}/{repo}"
+        if (source, target, tag) in configured_tags:
+            continue
+        tags_by_target.setdefault(source, {}).setdefault(target, set()).add(tag)
+
+    configs = []
+    for source, targets in tags_by_target.items():
+        targets_by_tags: dict[tuple[str, ...], list[str]] = {}
+        for target, tags in targets.items():
+            targets_by_tags.setdefault(tuple(sorted(tags)), []).append(target)
+        for tags, target_list in targets_by_tags.items():
+            configs.append(
+                ConfigImage(
+                    source=source,
+                    target=target_list[0],
+                    additional_targets=target_list[1:],
+                    tags=list(tags),
+                    push_mode="skip",
+                )
+            )
+    return configs
+
+
+def _normalize_image(ref: str) -> tuple[str, str, str]:
+    """Parses an image reference into registry, repository and tag, as `Image` does.
+
+    The first path segment is the registry if it contains "." or ":" or is
+    "localhost", e.g. `registry.k8s.io/pause` or `localhost:5000/app`; otherwise the
+    image is on Docker Hub.
+    """
+    name, tag = ref, "latest"
+    if ":" in ref.rsplit("/", 1)[-1]:
+        name, tag = ref.rsplit(":", 1)
+    first, _, rest = name.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        registry, repo = first, rest
+    else:
+        registry, repo = DOCKER_HUB, name
+    if registry in {"docker.io", "index.docker.io", DOCKER_HUB}:
+        registry = DOCKER_HUB
+        repo = repo if "/" in repo else f"library/{repo}"
+    return registry, repo, tag
+
+
+def _scan_chart(chart_path: str) -> list[str]:
+    app_versions: dict[str, str] = {}
+    values: dict[str, bytes] = {}
+    images: set[str] = set()
+
+    def select(name: str) -> bool:
+        return name.endswith(("/Chart.yaml", "/values.yaml")) or "/templates/" in name
+
+    for name, content in iter_chart_files(chart_path, select):
+        chart_dir, _, file_name = name.rpartition("/")
+        if "/templates/" in name:
+            for line in content.decode("utf-8", errors="replace").splitlines():
+                if match := _TEMPLATE_IMAGE.match(line):
+                    images.add(match[1])
+        elif file_name == "Chart.yaml":
+            app_version = (yaml.load(content, Loader=SafeLoader) or {}).get("appVersion")  # noqa: S506
+            app_versions[chart_dir] = str(app_version or "")
+        else:
+            values[chart_dir] = content
+
+    for chart_dir, content in values.items():
+        try:
+            document = yaml.load(content, Loader=SafeLoader)  # noqa: S506
+        except yaml.YAMLError:
+            logging.warning(f"skipping unparsable values: {chart_dir}/values.yaml")
+            continue
+        images.update(_values_images(document, "", app_versions.get(chart_dir, "")))
+
+    refs = set()
+    for image in images:
+        match = _IMAGE_REF.match(image)
+        if not match:
+            continue
+        if not match["tag"]:
+            if match["digest"]:
+                logging.debug(f"skipping image pinned by digest: {image}")
+            continue
+        refs.add(image.removesuffix(match["digest"] or ""))
+    return sorted(refs)
+
+
+def _values_images(node: object, key: str, app_version: str) -> list[str]:
+    """Collects image references from a parsed values document."""
+    found = []
+    if isinstance(node, dict):
+        repository = node.get("repository")
+        if isinstance(repository, str) and repository and ("image" in key.lower() or "tag" in node):
+            registry = node.get("registry")
+            ref = (
+                f"{registry}/{repository}" if isinstance(registry, str) and registry else repository
+            )
+            if ":" not in ref.rsplit("/", 1)[-1]:
+                tag = node.get("tag") or app_version
+                ref = f"{ref}:{tag}" if tag else ref
+            found.append(ref)
+        for child_key, child in node.items():
+            found.extend(_values_images(child, str(child_key), app_version))
+    elif isinstance(node, list):
+        for child in node:
+            found.extend(_values_images(child, key, app_version))
+    elif isinstance(node, str) and key.lower().endswith("image") and node:
+        found.append(node)
+    return found
+
+
+def _load_cache() -> dict[str, dict]:
+    global _cache  # noqa: PLW0603
+    if _cache is None:
+        _cache = {"digests": {}, "refs": {}}
+        path = get_cache_path(CACHE_FILE)
+        if path is not None:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    _cache.update(json.load(f))
+            except FileNotFoundError:
+                pass
+            except Exception:
+                logging.warning(f"ignoring unreadable chart image cache: {path}")
+    return _cache
+
+
+def _save_cache(cache: dict[str, dict]) -> None:
+    path = get_cache_path(CACHE_FILE)
+    if path is None:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        logging.warning(f"could not write chart image cache: {path}")
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from http import HTTPStatus
+
+import requests
+import yaml
+
+from ..cli.cache import get_cache_path
+
+# (connect, read) timeout, large indexes take a while to transfer
+INDEX_TIMEOUT = (5, 120)
+
+# prefer the libyaml C loader, the pure Python loader takes seconds for large indexes
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# local index file per index URL, fetched or revalidated once per run
+_indexes: dict[str, str] = {}
+# {version: entry} lookup per (index URL, chart name)
+_charts: dict[tuple[str, str], dict[str, dict]] = {}
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def get_chart_versions(
+    repo_url: str,
+    chart_name: str,
+    headers: dict[str, str] | None = None,
+) -> dict[str, dict]:
+    """Gets the index entries of a chart in a classic Helm repository.
+
+    The repository `index.yaml` is fetched once per run and shared by all charts and
+    versions of the repository. Between runs it is kept in the cache folder together
+    with its `ETag` and `Last-Modified` headers, and revalidated with a conditional
+    request, so an unchanged index is not transferred again.
+
+    Only the entries of the requested chart are parsed (see `_slice_chart_entries`),
+    and the resulting `{version: entry}` lookup is kept for the run.
+
+    Args:
+        repo_url (str): The URL of the Helm repository. HTTPS is used if the scheme
+            is missing.
+        chart_name (str): The name of the chart in the repository.
+        headers (dict[str, str] | None): HTTP headers to include in the request.
+
+    Returns:
+        dict[str, dict]: The index entries of the chart by version, empty if the
+        repository does not contain the chart.
+
+    Raises:
+        requests.exceptions.RequestException: If the index cannot be fetched.
+    """
+    if not repo_url.startswith(("http://", "https://")):
+        repo_url = f"https://{repo_url}"
+    index_url = f"{repo_url.rstrip('/')}/index.yaml"
+
+    with _locks_guard:
+        lock = _locks.setdefault(index_url, threading.Lock())
+    with lock:
+        if index_url not in _indexes:
+            _indexes[index_url] = _fetch_index(index_url, headers or {})
+        key = (index_url, chart_name)
+        if key not in _charts:
+            _charts[key] = _load_chart_entries(_indexes[index_url], chart_name)
+        return _charts[key]
+
+
+def _fetch_index(index_url: str, headers: dict[str, str]) -> str:
+    """Fetches an index, revalidating the cached copy if there is one.
+
+    Returns:
+        str: The path of the index file, in the cache folder or a run-local temp file.
+    """
+    key = hashlib.sha256(index_url.encode()).hexdigest()
+    index_path = get_cache_path("helm-index", f"{key}.yaml")
+    meta_path = get_cache_path("helm-index", f"{key}.json")
+    if index_path is None:
+        index_path = os.path.join("./tmp/helm-index", f"{key}.yaml")
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+
+    request_headers = headers.copy()
+    meta = _read_meta(meta_path) if os.path.exists(index_path) else {}
+    if meta.get("etag"):
+        request_headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        request_headers["If-Modified-Since"] = meta["last_modified"]
+
+    with requests.get(
+        index_url, headers=request_headers, timeout=INDEX_TIMEOUT, stream=True
+    ) as response:
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            logging.debug(f"index not modified, using cache: {index_url}")
+            return index_path
+        response.raise_for_status()
+
+        logging.debug(f"downloading index: {index_url}")
+        partial_path = f"{index_path}.part"
+        with open(partial_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+        os.replace(partial_path, index_path)
+
+        if meta_path:
+            _write_meta(
+                meta_path,
+                {
+                    "url": index_url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                },
+            )
+    return index_path
+
+
+def _load_chart_entries(index_path: str, chart_name: str) -> dict[str, dict]:
+    snippet = _slice_chart_entries(index_path, chart_name)
+    if snippet is None:
+        # unexpected layout, fall back to parsing the whole index
+        logging.debug(f"parsing complete index: {index_path}")
+        with open(index_path, encoding="utf-8") as f:
+            index = yaml.load(f, Loader=SafeLoader)  # noqa: S506
+        entries = (index.get("entries") or {}).get(chart_name) or []
+    else:
+        entries = (yaml.load(snippet, Loader=SafeLoader) or {}).get(chart_name) or []  # noqa: S506
+    return {str(entry["version"]): entry for entry in entries}
+
+
+def _slice_chart_entries(index_path: str, chart_name: str) -> str | None:
+    """Cuts the block of a single chart out of the `entries` mapping of an index.
+
+    Helm writes block style indexes, with every chart key on its own line at the
+    same indentation below `entries:`. The file is scanned line by line and only the
+    lines belonging to the requested chart are kept.
+
+    Returns:
+        str | None: The YAML block of the chart, an empty string if the index does not
+        contain the chart, or None if the index does not have the expected layout.
+    """
+    lines: list[str] = []
+    in_entries = False
+    key_indent = None
+    with open(index_path, encoding="utf-8") as f:
+        for line in f:
+            if not in_entries:
+                in_entries = line.rstrip() == "entries:"
+                continue
+            content = line.lstrip(" ")
+            if not content.strip():
+                if lines:
+                    lines.append(line)
+                continue
+            indent = len(line) - len(content)
+            if indent == 0:
+                break  # next top-level key
+            if key_indent is None:
+                key_indent = indent
+            if indent == key_indent and not content.startswith("-"):
+                if lines:
+                    break  # next chart
+                key = content.rstrip()
+                if not key.endswith(":"):
+                    return None
+                if key[:-1].strip("\"'") == chart_name:
+                    lines.append(line)
+            elif lines:
+                lines.append(line)
+    if not in_entries:
+        return None
+    return "".join(lines)
+
+
+def _read_meta(meta_path: str | None) -> dict:
+    if meta_path is None or not os.path.exists(meta_path):
+        return {}
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        logging.warning(f"ignoring unreadable index metadata: {meta_path}")
+        return {}
+
+
+def _write_meta(meta_path: str, meta: dict) -> None:
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
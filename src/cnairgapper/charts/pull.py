@@ -1,13 +1,21 @@
+import hashlib
+import logging
 import os
-import tarfile
+import shutil
 import tempfile
 
 import requests
-import yaml
 
+from ..cli.cache import get_cache_path
 from ..models.rc import RC
+from .index import get_chart_versions
 from .utils import is_oci_registry
 
+CHART_LAYER_TYPE = "application/vnd.cncf.helm.chart.content.v1.tar+gzip"
+# (connect, read) timeout for blob and chart archive downloads, the read timeout
+# applies per chunk, not to the whole transfer
+BLOB_TIMEOUT = (5, 60)
+
 
 def pull_helm_chart(
     chart_path: str,
@@ -57,8 +65,11 @@ def _pull_traditional_chart(
     """Fetches and saves a Helm chart from a specified repository.
 
     This function retrieves a specified Helm chart in a particular version from
-    a given Helm repository URL. The chart is downloaded and stored locally in
-    the specified output directory.
+    a given Helm repository URL. The chart is streamed to the specified output
+    directory and hashed while writing; if the index entry carries a digest, a
+    mismatching download is rejected. Verified archives are kept in the cache folder
+    by digest, so a chart already downloaded in an earlier run is copied from there
+    instead of being downloaded again.
 
     Args:
         chart_path (str): The name of the chart to retrieve from the repository.
@@ -83,40 +94,48 @@ def _pull_traditional_chart(
     if not repo_url.startswith(("http://", "https://")):
         repo_url = f"https://{repo_url}"
 
-    # Fetch repository index
-    index_url = f"{repo_url.rstrip('/')}/index.yaml"
-    response = requests.get(index_url, headers=headers, timeout=5)
-    response.raise_for_status()
-
-    # Parse index
-    index = yaml.safe_load(response.text)
-
-    # Find chart entry
-    if chart_path not in index["entries"]:
+    # Find chart entries in the repository index, cached per repository
+    chart_versions = get_chart_versions(repo_url, chart_path, headers)
+    if not chart_versions:
         raise ValueError(f"Chart {chart_path} not found in repository")
 
     # Find a specific version
-    chart_entry = None
-    for entry in index["entries"][chart_path]:
-        if entry["version"] == version:
-            chart_entry = entry
-            break
-
+    chart_entry = chart_versions.get(version)
     if not chart_entry:
         raise ValueError(f"Version {version} not found for chart {chart_path}")
 
-    # Download chart
     chart_url = chart_entry["urls"][0]
     if not chart_url.startswith("http"):
         chart_url = f"{repo_url.rstrip('/')}/{chart_url}"
 
-    response = requests.get(chart_url, headers=headers, timeout=5)
-    response.raise_for_status()
-
-    # Save chart
     output_file = os.path.join(output_dir, f"{chart_path}-{version}.tgz")
-    with open(output_file, "wb") as f:
-        f.write(response.content)
+    digest = f"sha256:{chart_entry['digest']}" if chart_entry.get("digest") else None
+    cache_file = get_cache_path("helm-charts", f"{chart_entry['digest']}.tgz") if digest else None
+
+    # Reuse the archive downloaded by an earlier run
+    if cache_file and os.path.exists(cache_file):
+        logging.debug(f"using cached chart archive: {chart_url}")
+        shutil.copyfile(cache_file, output_file)
+        return RC(ok=True, ref=output_file)
+
+    # Download chart
+    try:
+        _download_blob(chart_url, headers, digest, output_file)
+    except ValueError as e:
+        msg = f"Error pulling chart {chart_path}:{version}: {e}"
+        logging.exception(msg)
+        return RC(ok=False, err=True, type="helm", msg=msg)
+
+    if cache_file:
+        # unique partial file, charts sharing an archive may be pulled at once
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix=".part")
+        os.close(fd)
+        try:
+            shutil.copyfile(output_file, partial)
+            os.replace(partial, cache_file)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
 
     return RC(ok=True, ref=output_file)
 
@@ -128,8 +147,13 @@ def _pull_oci_chart(
     output_dir: str,
     headers: dict[str, str],
 ) -> RC:
-    """Pulls an OCI-compliant Helm chart from a remote OCI registry and assembles it into a
-    compressed tarball archive saved to the specified output directory.
+    """Pulls an OCI-compliant Helm chart from a remote OCI registry and saves it to the
+    specified output directory.
+
+    The chart content layer is streamed byte for byte into the output `.tgz` and its
+    digest is verified while writing, so the archive is bit-identical to the one in the
+    registry. The config blob is saved next to it as `<chart>.config.json`, so a push
+    can reuse it unchanged.
 
     Args:
         chart_path: The path to the Helm chart in the OCI registry.
@@ -140,20 +164,19 @@ def _pull_oci_chart(
         headers: A dictionary of HTTP headers to include in requests.
 
     Returns:
-        RC: A result object containing a success indicator and a reference to the
-            generated output file.
+        RC: A result object containing a success indicator, a reference to the
+            saved chart archive and the path of the saved config blob as entity.
 
     Raises:
-        TypeError: If any provided arguments are of an incompatible type.
         requests.exceptions.RequestException: If there is an error in HTTP communication.
         json.JSONDecodeError: If the manifest cannot be parsed as valid JSON.
         KeyError: If the OCI manifest is missing required keys or layers.
-        OSError: If any file or directory operation fails during chart extraction
-                 and assembly.
+        OSError: If any file or directory operation fails while saving the chart.
     """
     # Ensure repo_url has proper scheme
     if not repo_url.startswith(("http://", "https://")):
         repo_url = f"https://{repo_url}"
+    base_url = f"{repo_url.rstrip('/')}/v2/{chart_path}"
 
     # Add accept headers for OCI
     oci_headers = headers.copy()
@@ -165,37 +188,59 @@ def _pull_oci_chart(
     )
 
     # Get manifest
-    manifest_url = f"{repo_url.rstrip('/')}/v2/{chart_path}/manifests/{version}"
-    response = requests.get(manifest_url, headers=oci_headers, timeout=5)
+    response = requests.get(f"{base_url}/manifests/{version}", headers=oci_headers, timeout=5)
     response.raise_for_status()
 
     manifest = response.json()
+    layer = next(
+        (layer for layer in manifest["layers"] if layer.get("mediaType") == CHART_LAYER_TYPE),
+        manifest["layers"][0],
+    )
 
-    # Download layers
-    with tempfile.TemporaryDirectory() as temp_dir:
-        for layer in manifest["layers"]:
-            layer_digest = layer["digest"]
-            layer_url = f"{repo_url.rstrip('/')}/v2/{chart_path}/blobs/{layer_digest}"
-
-            response = requests.get(layer_url, headers=headers, timeout=5)
-            response.raise_for_status()
-
-            layer_file = os.path.join(temp_dir, layer_digest.replace(":", "_"))
-            with open(layer_file, "wb") as f:
-                f.write(response.content)
-
-        # Create final chart archive
-        output_file = os.path.join(output_dir, f"{chart_path}-{version}.tgz")
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-        # Combine layers into final chart
-        with tarfile.open(output_file, "w:gz") as tar:
-            for layer_file in os.listdir(temp_dir):
-                layer_path = os.path.join(temp_dir, layer_file)
-                with tarfile.open(layer_path, "r:*") as layer_tar:
-                    for member in layer_tar.getmembers():
-                        content = layer_tar.extractfile(member)
-                        if content:
-                            tar.addfile(member, content)
+    output_file = os.path.join(output_dir, f"{chart_path}-{version}.tgz")
+    config_file = f"{output_file.removesuffix('.tgz')}.config.json"
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-    return RC(ok=True, ref=output_file)
+    try:
+        _download_blob(f"{base_url}/blobs/{layer['digest']}", headers, layer["digest"], output_file)
+        _download_blob(
+            f"{base_url}/blobs/{manifest['config']['digest']}",
+            headers,
+            manifest["config"]["digest"],
+            config_file,
+        )
+    except ValueError as e:
+        msg = f"Error pulling chart {chart_path}:{version}: {e}"
+        logging.exception(msg)
+        return RC(ok=False, err=True, type="helm", msg=msg)
+
+    return RC(ok=True, ref=output_file, entity=config_file)
+
+
+def _download_blob(url: str, headers: dict[str, str], digest: str | None, output_file: str) -> str:
+    """Streams a blob to a file while verifying its digest.
+
+    Returns:
+        str: The sha256 digest of the written file, prefixed with the algorithm when
+        a digest was given.
+
+    Raises:
+        ValueError: If the content does not match the digest; the file is removed.
+        requests.exceptions.RequestException: If the download fails.
+    """
+    algorithm, _, expected = (digest or "sha256:").partition(":")
+    hasher = hashlib.new(algorithm)
+
+    # identity encoding, the bytes on disk must be the bytes of the digest
+    blob_headers = {**headers, "Accept-Encoding": "identity"}
+    with requests.get(url, headers=blob_headers, timeout=BLOB_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        with open(output_file, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                hasher.update(chunk)
+                f.write(chunk)
+
+    if expected and hasher.hexdigest() != expected:
+        os.remove(output_file)
+        raise ValueError(f"digest mismatch for {url}: got {algorithm}:{hasher.hexdigest()}")
+    return f"{algorithm}:{hasher.hexdigest()}"
@@ -2,14 +2,30 @@ import hashlib
 import json
 import logging
 import os
-from typing import Literal
+import threading
+from http import HTTPStatus
+from typing import BinaryIO, Literal
+from urllib.parse import urljoin
 
 import requests
 
+from ..cli.capabilities import get_host_capabilities, update_host_capabilities
 from ..models.rc import RC
-from .utils import extract_chart_info
+from .pull import CHART_LAYER_TYPE
+from .static import push_static_chart, static_repo_dir
+from .utils import read_chart_metadata
 
-RepoType = Literal["oci", "nexus"]
+RepoType = Literal["oci", "nexus", "static"]
+
+CONFIG_TYPE = "application/vnd.cncf.helm.config.v1+json"
+# (connect, read) timeout for blob uploads
+UPLOAD_TIMEOUT = (5, 120)
+
+# pooled connections, one session per worker thread as sessions are not thread-safe
+_local = threading.local()
+# repository per (registry URL, blob digest) known to hold the blob, used for mounts
+_blob_repos: dict[tuple[str, str], str] = {}
+_blob_repos_lock = threading.Lock()
 
 
 def push_helm_chart(
@@ -19,6 +35,7 @@ def push_helm_chart(
     repo_path: str | None = None,
     headers: dict | None = None,
     cleanup_chart: bool = True,
+    config_path: str | None = None,
 ) -> RC:
     """Pushes a Helm chart to a specified repository.
 
@@ -37,6 +54,9 @@ def push_helm_chart(
             Defaults to None.
         cleanup_chart (bool): Indicates whether the chart file should be removed after
             successfully uploading. Defaults to True.
+        config_path (Optional[str]): Path to the OCI config blob pulled with the chart.
+            OCI pushes reuse it unchanged, so the target holds the same config digest
+            as the source. Defaults to None, which generates a config.
 
     Returns:
         RC: Result code containing the status of the operation, with metadata of the pushed chart
@@ -53,14 +73,17 @@ def push_helm_chart(
         )
 
     # Extract chart metadata
-    chart_info = extract_chart_info(chart_path)
+    metadata = read_chart_metadata(chart_path, config_path)
+    chart_info = {"name": metadata["name"], "version": str(metadata["version"])}
 
     rc = RC(ok=True)
     match repo_type:
         case "oci":
-            rc = _push_oci_chart(chart_path, chart_info, repo_url, headers, repo_path)
+            rc = _push_oci_chart(chart_path, chart_info, repo_url, headers, repo_path, config_path)
         case "nexus":
             rc = _push_nexus_chart(chart_path, repo_path, chart_info, repo_url, headers)
+        case "static":
+            rc = push_static_chart(chart_path, static_repo_dir(repo_url, repo_path), metadata)
 
     if cleanup_chart:
         try:
@@ -131,14 +154,17 @@ def _push_oci_chart(
     repo_url: str,
     headers: dict[str, str],
     repo_path: str | None = None,
+    config_path: str | None = None,
 ) -> RC:
     """Pushes a Helm chart to an OCI-compliant image repository.
 
     This function uploads a Helm chart to an OCI-compliant image repository
     at a specified URL. It involves calculating the chart's digest, creating
     a configuration blob, uploading both the chart blob and configuration blob,
-    and finally generating and pushing a manifest. The function utilizes the
-    OCI Image Format Specifications to ensure compatibility.
+    and finally generating and pushing a manifest. Blobs already present in the
+    target are not uploaded again (see `_push_blob`), so re-pushing an existing
+    chart costs a manifest PUT. The function utilizes the OCI Image Format
+    Specifications to ensure compatibility.
 
     Args:
         chart_path (str): Path to the Helm chart file (e.g., `.tgz` file) to be pushed.
@@ -146,6 +172,8 @@ def _push_oci_chart(
         repo_url (str): Base URL of the OCI repository.
         headers (Dict[str, str]): HTTP headers for authentication or additional metadata.
         repo_path (Optional[str]): Optional repository path to be appended to the full URL.
+        config_path (Optional[str]): Optional path to an existing config blob to push
+            instead of a generated one.
 
     Returns:
         RC: An object representing the result of the push operation. Contains whether
@@ -167,69 +195,50 @@ def _push_oci_chart(
         chart_repo_path = chart_info["name"]
 
     # Calculate chart digest
+    sha256_hash = hashlib.sha256()
     with open(chart_path, "rb") as f:
-        chart_data = f.read()
-        sha256_hash = hashlib.sha256(chart_data).hexdigest()
-        chart_digest = f"sha256:{sha256_hash}"
-
-    # Create config
-    config = {
-        "mediaType": "application/vnd.cncf.helm.config.v1+json",
-        "schemaVersion": 2,
-        "software": {
-            "name": chart_info["name"],
-            "version": chart_info["version"],
-            "type": "helm",
-        },
-    }
-    config_bytes = json.dumps(config).encode()
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256_hash.update(chunk)
+    chart_digest = f"sha256:{sha256_hash.hexdigest()}"
+    chart_size = os.path.getsize(chart_path)
+
+    # Reuse the pulled config or create one
+    if config_path:
+        with open(config_path, "rb") as f:
+            config_bytes = f.read()
+    else:
+        config = {
+            "mediaType": CONFIG_TYPE,
+            "schemaVersion": 2,
+            "software": {
+                "name": chart_info["name"],
+                "version": chart_info["version"],
+                "type": "helm",
+            },
+        }
+        config_bytes = json.dumps(config).encode()
     config_digest = f"sha256:{hashlib.sha256(config_bytes).hexdigest()}"
 
+    repo_url = repo_url.rstrip("/")
     try:
-        # Upload config blob
-        upload_url = f"{repo_url.rstrip('/')}/v2/{chart_repo_path}/blobs/uploads/"
-        response = requests.post(upload_url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        upload_location = response.headers["Location"]
-        headers_with_type = headers.copy()
-        headers_with_type["Content-Type"] = "application/json"
-        response = requests.put(
-            f"{upload_location}&digest={config_digest}",
-            headers=headers_with_type,
-            data=config_bytes,
-            timeout=10,
-        )
-        response.raise_for_status()
-
-        # Upload chart blob
-        response = requests.post(upload_url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        upload_location = response.headers["Location"]
-        headers_with_type = headers.copy()
-        headers_with_type["Content-Type"] = "application/vnd.cncf.helm.chart.content.v1.tar+gzip"
-        response = requests.put(
-            f"{upload_location}&digest={chart_digest}",
-            headers=headers_with_type,
-            data=chart_data,
-            timeout=10,
-        )
-        response.raise_for_status()
+        # Upload config and chart blobs, unless the target already has them
+        _push_blob(repo_url, chart_repo_path, config_digest, config_bytes, headers)
+        with open(chart_path, "rb") as f:
+            _push_blob(repo_url, chart_repo_path, chart_digest, f, headers)
 
         # Create and push manifest
         manifest = {
             "schemaVersion": 2,
             "mediaType": "application/vnd.oci.image.manifest.v1+json",
             "config": {
-                "mediaType": "application/vnd.cncf.helm.config.v1+json",
+                "mediaType": CONFIG_TYPE,
                 "size": len(config_bytes),
                 "digest": config_digest,
             },
             "layers": [
                 {
-                    "mediaType": "application/vnd.cncf.helm.chart.content.v1.tar+gzip",
-                    "size": len(chart_data),
+                    "mediaType": CHART_LAYER_TYPE,
+                    "size": chart_size,
                     "digest": chart_digest,
                 }
             ],
@@ -237,10 +246,10 @@ def _push_oci_chart(
 
         headers_with_type = headers.copy()
         headers_with_type["Content-Type"] = "application/vnd.oci.image.manifest.v1+json"
-        manifest_url = (
-            f"{repo_url.rstrip('/')}/v2/{chart_repo_path}/manifests/{chart_info['version']}"
+        manifest_url = f"{repo_url}/v2/{chart_repo_path}/manifests/{chart_info['version']}"
+        response = _get_session().put(
+            manifest_url, headers=headers_with_type, json=manifest, timeout=10
         )
-        response = requests.put(manifest_url, headers=headers_with_type, json=manifest, timeout=10)
         response.raise_for_status()
     except requests.RequestException as e:
         msg = f"Error pushing chart to OCI repository: {e}"
@@ -251,5 +260,80 @@ def _push_oci_chart(
         ok=True,
         ref=response.headers.get("Docker-Content-Digest", ""),
         type="helm",
-        msg=f"{repo_url.rstrip('/')}/{chart_repo_path}:{chart_info['version']}",
+        msg=f"{repo_url}/{chart_repo_path}:{chart_info['version']}",
     )
+
+
+def _push_blob(
+    repo_url: str,
+    repo_path: str,
+    digest: str,
+    data: bytes | BinaryIO,
+    headers: dict[str, str],
+) -> None:
+    """Uploads a blob to an OCI repository unless it is already there.
+
+    The blob is checked with a HEAD request first. If it was pushed to another
+    repository of the same registry during this run, it is mounted from there instead
+    of uploaded, as long as the registry is not known to reject cross-repo mounts.
+    Otherwise, it is uploaded in a single streamed PUT.
+
+    Args:
+        repo_url (str): Base URL of the OCI registry, including the scheme.
+        repo_path (str): Repository path of the chart in the registry.
+        digest (str): Digest of the blob.
+        data (bytes | BinaryIO): Content of the blob, an open file is streamed.
+        headers (Dict[str, str]): HTTP headers for authentication.
+
+    Raises:
+        requests.RequestException: If one of the requests fails.
+    """
+    base_url = f"{repo_url}/v2/{repo_path}"
+    session = _get_session()
+    response = session.head(f"{base_url}/blobs/{digest}", headers=headers, timeout=10)
+    if response.status_code == HTTPStatus.OK:
+        logging.debug(f"blob exists, skipping upload: {repo_path}@{digest}")
+        _remember_blob(repo_url, digest, repo_path)
+        return
+
+    params = {}
+    with _blob_repos_lock:
+        mount_from = _blob_repos.get((repo_url, digest))
+    if mount_from and get_host_capabilities(repo_url).cross_repo_mount is not False:
+        params = {"mount": digest, "from": mount_from}
+
+    response = session.post(
+        f"{base_url}/blobs/uploads/", headers=headers, params=params, timeout=10
+    )
+    response.raise_for_status()
+    if params:
+        mounted = response.status_code == HTTPStatus.CREATED
+        update_host_capabilities(repo_url, cross_repo_mount=mounted)
+        if mounted:
+            logging.debug(f"blob mounted from {mount_from}: {repo_path}@{digest}")
+            _remember_blob(repo_url, digest, repo_path)
+            return
+
+    location = urljoin(f"{repo_url}/", response.headers["Location"])
+    separator = "&" if "?" in location else "?"
+    headers_with_type = headers.copy()
+    headers_with_type["Content-Type"] = "application/octet-stream"
+    response = session.put(
+        f"{location}{separator}digest={digest}",
+        headers=headers_with_type,
+        data=data,
+        timeout=UPLOAD_TIMEOUT,
+    )
+    response.raise_for_status()
+    _remember_blob(repo_url, digest, repo_path)
+
+
+def _get_session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _remember_blob(repo_url: str, digest: str, repo_path: str) -> None:
+    with _blob_repos_lock:
+        _blob_repos[repo_url, digest] = repo_path
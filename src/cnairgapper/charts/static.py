@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from datetime import UTC, datetime
+
+import yaml
+
+from ..models.rc import RC
+from .index import SafeLoader
+from .versions import version_key
+
+# prefer the libyaml C dumper, large indexes take a while to serialize
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# parsed index per repository folder, read once per run and updated in place
+_indexes: dict[str, dict] = {}
+# repository folders whose index changed since it was last written
+_pending: set[str] = set()
+_lock = threading.Lock()
+
+
+def static_repo_dir(registry: str, repo: str) -> str:
+    """Gets the folder of a static Helm repository target.
+
+    Args:
+        registry (str): The root folder of the static repositories.
+        repo (str): The repository, a folder below the root folder.
+
+    Returns:
+        str: The folder holding the chart archives and the `index.yaml`.
+    """
+    return os.path.join(os.path.expanduser(registry), repo.strip("/"))
+
+
+def static_chart_exists(repo_dir: str, chart_name: str, version: str) -> RC:
+    """Checks if a Helm chart version exists in a static repository.
+
+    Args:
+        repo_dir (str): The folder of the static repository.
+        chart_name (str): The name of the chart.
+        version (str): The version of the chart.
+
+    Returns:
+        RC: A response object indicating whether the chart exists or not.
+    """
+    with _lock:
+        entries = _load_index(repo_dir)["entries"].get(chart_name, [])
+        exists = any(str(entry["version"]) == version for entry in entries)
+    return RC(ok=exists, type="helm")
+
+
+def push_static_chart(chart_path: str, repo_dir: str, metadata: dict) -> RC:
+    """Writes a Helm chart into a static repository and adds it to its `index.yaml`.
+
+    The archive is copied into the repository folder and hashed while copying. The
+    index is parsed once per run and kept in memory, and the new entry is merged into
+    it, so the repository never has to be re-indexed from its archives. The index is
+    written by `write_static_indexes` once all charts are pushed.
+
+    Args:
+        chart_path (str): Path to the Helm chart file (.tgz archive).
+        repo_dir (str): The folder of the static repository.
+        metadata (dict): The Chart.yaml metadata of the chart (see `read_chart_metadata`).
+
+    Returns:
+        RC: The result of the push, with the digest of the archive as reference.
+    """
+    file_name = f"{metadata['name']}-{metadata['version']}.tgz"
+
+    try:
+        os.makedirs(repo_dir, exist_ok=True)
+        digest = _copy_with_digest(chart_path, os.path.join(repo_dir, file_name))
+
+        with _lock:
+            index = _load_index(repo_dir)
+            entry = {
+                **metadata,
+                "urls": [file_name],
+                "created": datetime.now(UTC).isoformat(),
+                "digest": digest,
+            }
+            entries = [
+                e
+                for e in index["entries"].get(metadata["name"], [])
+                if str(e["version"]) != str(metadata["version"])
+            ]
+            entries.append(entry)
+            entries.sort(key=lambda e: version_key(str(e["version"])) or (), reverse=True)
+            index["entries"][metadata["name"]] = entries
+            _pending.add(repo_dir)
+    except OSError as e:
+        msg = f"Error pushing chart to static repository: {e}"
+        logging.exception(msg)
+        return RC(ok=False, err=True, type="helm", msg=msg)
+
+    return RC(
+        ok=True,
+        ref=f"sha256:{digest}",
+        type="helm",
+        msg=f"{repo_dir}/{file_name}",
+    )
+
+
+def write_static_indexes() -> list[RC]:
+    """Writes the `index.yaml` of every static repository charts were pushed to.
+
+    Each index is written atomically, once per sync rather than once per chart.
+
+    Returns:
+        list[RC]: One failed RC per index that could not be written.
+    """
+    rcs = []
+    with _lock:
+        for repo_dir in sorted(_pending):
+            index = _indexes[repo_dir]
+            index["generated"] = datetime.now(UTC).isoformat()
+            try:
+                _write_index(repo_dir, index)
+            except OSError as e:
+                msg = f"Error writing index of static repository {repo_dir}: {e}"
+                logging.exception(msg)
+                rcs.append(RC(ok=False, err=True, type="helm", msg=msg, ref=repo_dir))
+        _pending.clear()
+    return rcs
+
+
+def _copy_with_digest(src: str, dst: str) -> str:
+    sha256_hash = hashlib.sha256()
+    partial = f"{dst}.part"
+    with open(src, "rb") as f_src, open(partial, "wb") as f_dst:
+        for chunk in iter(lambda: f_src.read(1024 * 1024), b""):
+            sha256_hash.update(chunk)
+            f_dst.write(chunk)
+    shutil.move(partial, dst)
+    return sha256_hash.hexdigest()
+
+
+def _load_index(repo_dir: str) -> dict:
+    if repo_dir not in _indexes:
+        index_path = os.path.join(repo_dir, "index.yaml")
+        index = None
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                index = yaml.load(f, Loader=SafeLoader)  # noqa: S506
+        index = index or {}
+        index.setdefault("apiVersion", "v1")
+        index["entries"] = index.get("entries") or {}
+        _indexes[repo_dir] = index
+    return _indexes[repo_dir]
+
+
+def _write_index(repo_dir: str, index: dict) -> None:
+    index_path = os.path.join(repo_dir, "index.yaml")
+    with open(f"{index_path}.part", "w", encoding="utf-8") as f:
+        yaml.dump(index, f, Dumper=SafeDumper, sort_keys=False)
+    os.replace(f"{index_path}.part", index_path)
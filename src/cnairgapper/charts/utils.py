@@ -1,27 +1,33 @@
+import gzip
+import json
 import logging
-import os
 import tarfile
-import tempfile
+from collections.abc import Callable, Iterator
 from http import HTTPStatus
 
 import requests
 import yaml
 
+from ..cli.capabilities import get_host_capabilities
 from ..cli.utils import get_registry_token
 from ..models.creds.creds import Creds
 from ..models.rc import RC
 from ..models.resources.helm import HelmChart
+from .index import get_chart_versions
+from .static import static_chart_exists, static_repo_dir
 
 
-def extract_chart_info(chart_path: str) -> dict[str, str]:
+def extract_chart_info(chart_path: str, config_path: str | None = None) -> dict[str, str]:
     """Extract Helm chart information from a tar.gz file.
 
-    This function takes the file path of a Helm chart archive in tar.gz format, reads
-    the Chart.yaml file inside it, and extracts the name and version of the chart. If
-    the Chart.yaml file is not found in the archive, an exception is raised.
+    This function takes the file path of a Helm chart archive in tar.gz format and
+    extracts the name and version of the chart (see `read_chart_metadata`). If the
+    Chart.yaml file is not found in the archive, an exception is raised.
 
     Args:
         chart_path (str): The file path of the tar.gz Helm chart archive.
+        config_path (str, optional): The file path of the OCI config blob of the chart.
+            Defaults to None.
 
     Returns:
         Dict[str, str]: A dictionary containing the name and version of the chart
@@ -30,22 +36,68 @@ def extract_chart_info(chart_path: str) -> dict[str, str]:
     Raises:
         ValueError: If the Chart.yaml file cannot be found within the given archive.
     """
-    with tempfile.TemporaryDirectory() as temp_dir:
-        with tarfile.open(chart_path, "r:gz") as tar:
-            # Find and extract Chart.yaml
-            for member in tar.getmembers():
-                if member.name.endswith("Chart.yaml"):
-                    tar.extract(member, temp_dir)
-                    chart_yaml_path = os.path.join(temp_dir, member.name)
-                    with open(chart_yaml_path, encoding="utf-8") as f:
-                        chart_yaml = yaml.safe_load(f)
-                    return {
-                        "name": chart_yaml["name"],
-                        "version": chart_yaml["version"],
-                    }
+    metadata = read_chart_metadata(chart_path, config_path)
+    return {"name": metadata["name"], "version": str(metadata["version"])}
+
+
+def read_chart_metadata(chart_path: str, config_path: str | None = None) -> dict:
+    """Reads the Chart.yaml metadata of a Helm chart.
+
+    If the OCI config blob pulled with the chart already carries name and version, it
+    holds the complete Chart.yaml metadata and the archive is not read at all.
+    Otherwise the gzip stream is scanned sequentially up to the first top-level
+    Chart.yaml, which is parsed from memory.
+
+    Args:
+        chart_path (str): The file path of the tar.gz Helm chart archive.
+        config_path (str, optional): The file path of the OCI config blob of the chart.
+            Defaults to None.
+
+    Returns:
+        dict: The Chart.yaml metadata of the chart.
+
+    Raises:
+        ValueError: If the Chart.yaml file cannot be found within the given archive.
+    """
+    if config_path:
+        with open(config_path, encoding="utf-8") as f:
+            config = json.load(f)
+        if config.get("name") and config.get("version"):
+            return config
+
+    # Chart.yaml of the chart itself, not of a vendored subchart
+    for _, content in iter_chart_files(
+        chart_path,
+        lambda name: (
+            name.count("/") <= 1 and (name.endswith("/Chart.yaml") or name == "Chart.yaml")
+        ),
+    ):
+        return yaml.safe_load(content)
     raise ValueError("Could not find Chart.yaml in the archive")
 
 
+def iter_chart_files(chart_path: str, select: Callable[[str], bool]) -> Iterator[tuple[str, bytes]]:
+    """Reads selected files of a Helm chart archive without extracting it.
+
+    The gzip stream is scanned sequentially and only the selected files are read
+    into memory, so the archive is never written to disk. Stopping the iteration
+    early stops reading the archive.
+
+    Args:
+        chart_path (str): The file path of the tar.gz Helm chart archive.
+        select (Callable[[str], bool]): Decides by the member name whether a file is read.
+
+    Yields:
+        tuple[str, bytes]: The member name and content of every selected file.
+    """
+    # gzip.open rather than "r|gz", tarfile's own stream reader mishandles the gzip
+    # extra field Helm writes into the archive header
+    with gzip.open(chart_path) as gz, tarfile.open(fileobj=gz, mode="r|") as tar:
+        for member in tar:
+            if member.isfile() and select(member.name):
+                yield member.name, tar.extractfile(member).read()
+
+
 def get_helm_repo_hostname(repo_url: str) -> str:
     """Extracts and returns the hostname from a given Helm repository URL.
 
@@ -77,41 +129,21 @@ def get_helm_repo_hostname(repo_url: str) -> str:
 def is_oci_registry(repo_url: str, headers: dict) -> bool:
     """Determine if a given repository URL corresponds to an OCI registry.
 
-    This function checks if the provided repository URL is either an OCI registry or a
-    legacy Helm registry. It performs a request to the OCI registry endpoint and also
-    checks for the presence of a Helm `index.yaml` file. If neither check identifies the
-    repository type, the function defaults to returning `False`.
+    This function consults the capability record of the repository location (see
+    `get_host_capabilities`). The location is probed once for the OCI registry
+    endpoint and a Helm `index.yaml` file; the result is persisted with a TTL, so
+    repeated lookups for every chart version do not hit the network. If neither
+    check identifies the repository type, the function defaults to returning `False`.
 
     Args:
         repo_url (str): The repository URL to be validated.
-        headers (dict): The headers to include in the HTTP requests.
+        headers (dict): The headers of the chart requests. The probes are sent without
+            them, as the record describes the location, not a set of credentials.
 
     Returns:
         bool: `True` if the repository is an OCI registry, otherwise `False`.
     """
-    # Normalize the URL
-    repo_url = repo_url.rstrip("/")
-
-    # Check if it's an OCI registry
-    try:
-        oci_url = f"{repo_url}/v2/"
-        response = requests.get(oci_url, headers=headers, timeout=5)
-        if response.status_code in [HTTPStatus.OK, HTTPStatus.UNAUTHORIZED]:
-            return True  # OCI registry detected
-    except requests.exceptions.RequestException:
-        pass  # Suppress exceptions for this check
-
-    # Check if it's a legacy Helm registry
-    try:
-        helm_index_url = f"{repo_url}/index.yaml"
-        response = requests.head(helm_index_url, headers=headers, timeout=5)
-        if response.status_code == HTTPStatus.OK:
-            return False  # Legacy Helm registry detected
-    except requests.exceptions.RequestException:
-        pass  # Suppress exceptions for this check
-
-    # If neither checks succeed, default to not an OCI registry
-    return False
+    return get_host_capabilities(repo_url).oci
 
 
 def get_auth_headers(creds: Creds, registry: str) -> dict:
@@ -216,3 +248,62 @@ def oci_chart_exists(
         return RC(ok=False, err=True, type="helm", entity=requests, msg=msg)
 
     return RC(ok=False, type="helm", entity=response)
+
+
+def index_chart_exists(
+    chart: HelmChart,
+    headers: dict[str, str],
+) -> RC:
+    """Checks if a Helm chart version exists in a classic, index based target repository.
+
+    Nexus Helm hosted repositories serve their `index.yaml` below
+    `/repository/<repo>/`. The index is fetched once per run and shared by all
+    charts and versions of the repository (see `get_chart_versions`), so checking
+    further versions costs no requests.
+
+    Args:
+        chart (HelmChart): The Helm chart object containing details like the registry,
+            repository, chart name, and version.
+        headers (Dict[str, str]): Dictionary of HTTP headers to be included in the request.
+
+    Returns:
+        RC: A response object indicating whether the chart exists or not.
+    """
+    repo_url = f"{chart.target_registry.rstrip('/')}/repository/{chart.target_repo.strip('/')}"
+    try:
+        versions = get_chart_versions(repo_url, chart.chart_name, headers)
+    except requests.HTTPError as e:
+        # a new, empty repository may not serve an index yet
+        if e.response is not None and e.response.status_code == HTTPStatus.NOT_FOUND:
+            return RC(ok=False, type="helm")
+        msg = f"Error checking chart existence: {e}"
+        logging.exception(msg)
+        return RC(ok=False, err=True, type="helm", msg=msg)
+    except requests.RequestException as e:
+        msg = f"Error checking chart existence: {e}"
+        logging.exception(msg)
+        return RC(ok=False, err=True, type="helm", msg=msg)
+
+    return RC(ok=chart.version in versions, type="helm")
+
+
+def chart_exists(
+    chart: HelmChart,
+    headers: dict[str, str],
+) -> RC:
+    """Checks if a Helm chart version exists in its target, depending on the target type.
+
+    Args:
+        chart (HelmChart): The Helm chart object containing details like the registry,
+            repository, repository type, chart name, and version.
+        headers (Dict[str, str]): Dictionary of HTTP headers to be included in the request.
+
+    Returns:
+        RC: A response object indicating whether the chart exists or not.
+    """
+    if chart.target_repo_type == "nexus":
+        return index_chart_exists(chart=chart, headers=headers)
+    if chart.target_repo_type == "static":
+        repo_dir = static_repo_dir(chart.target_registry, chart.target_repo)
+        return static_chart_exists(repo_dir, chart.chart_name, chart.version)
+    return oci_chart_exists(chart=chart, headers=headers)
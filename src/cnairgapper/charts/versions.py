@@ -0,0 +1,267 @@
+import functools
+import logging
+import re
+from urllib.parse import urljoin
+
+import requests
+
+from ..cli.capabilities import get_host_capabilities
+from ..repositories.utils import pattern_is_regex
+from .index import get_chart_versions
+
+_VERSION = re.compile(
+    r"^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$"
+)
+_CONSTRAINT = re.compile(r"^(>=|<=|!=|==|=|>|<)(\S+)$")
+_LATEST = re.compile(r"^latest(-minor)?(?::(\d+))?$")
+
+
+@functools.cache
+def version_key(version: str) -> tuple | None:
+    """Computes a sort key for a semantic version.
+
+    Missing minor and patch parts count as 0, a leading `v` is ignored, pre-releases
+    sort before their release and build metadata is ignored. Keys are cached, so
+    sorting thousands of versions parses each version only once.
+
+    Args:
+        version (str): The version, e.g. "1.2.3", "v2.0.0-rc.1" or "16".
+
+    Returns:
+        tuple | None: The sort key, or None if the version is not a semantic version.
+    """
+    match = _VERSION.match(version)
+    if not match:
+        return None
+    major, minor, patch, pre = match.groups()
+    if pre:
+        pre_key = (0, tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in pre.split(".")))
+    else:
+        pre_key = (1, ())
+    return int(major), int(minor or 0), int(patch or 0), pre_key
+
+
+def is_version_selector(entry: str) -> bool:
+    """Determines if a version entry selects versions rather than naming one.
+
+    Selectors are `latest[:N]`, `latest-minor[:N]`, range constraints starting with a
+    comparison operator, e.g. ">=15.0.0 <16", and regular expressions. Semantic
+    versions are exact even if they contain regex characters, e.g. "1.2.3+build.1".
+
+    Args:
+        entry (str): The version entry of the chart config.
+
+    Returns:
+        bool: True if the entry is a selector, False if it is an exact version.
+
+    Raises:
+        ValueError: If the entry is empty.
+    """
+    entry = entry.strip()
+    if not entry:
+        raise ValueError("Empty version entry")
+    if version_key(entry) is not None:
+        return False
+    return bool(_LATEST.match(entry)) or entry[0] in "<>=!" or pattern_is_regex(entry)
+
+
+def select_versions(selectors: list[str], available: list[str]) -> list[str]:
+    """Resolves version entries against the versions available in the source.
+
+    Exact versions are kept as they are, selectors are expanded to the matching
+    available versions, newest first. Pre-releases are only selected by regular
+    expressions. The result contains every version once, in the order of the entries.
+
+    Args:
+        selectors (list[str]): The version entries of the chart config.
+        available (list[str]): The versions available in the source.
+
+    Returns:
+        list[str]: The resolved versions.
+
+    Raises:
+        ValueError: If an entry is empty, a constraint is invalid or a selector
+            matches no available version.
+    """
+    keyed = [(version_key(v), v) for v in available]
+    keyed = sorted(((k, v) for k, v in keyed if k is not None), reverse=True)
+    stable = [(k, v) for k, v in keyed if k[3][0] == 1]
+
+    resolved: dict[str, None] = {}
+    for entry in selectors:
+        selector = entry.strip()
+        if not is_version_selector(selector):
+            matched = [selector]
+        elif match := _LATEST.match(selector):
+            count = int(match[2] or 1)
+            if match[1]:
+                # newest release of each of the newest minor lines
+                newest: dict[tuple[int, int], str] = {}
+                for k, v in stable:
+                    newest.setdefault(k[:2], v)
+                matched = list(newest.values())[:count]
+            else:
+                matched = [v for _, v in stable[:count]]
+        elif selector[:1] in "<>=!":
+            constraints = _parse_constraints(selector)
+            matched = [v for k, v in stable if all(op(k, bound) for op, bound in constraints)]
+        else:
+            pattern = re.compile(selector)
+            matched = [v for _, v in keyed if pattern.match(v)]
+        if not matched:
+            raise ValueError(f"Version selector [{selector}] matched no version")
+        logging.info(f"version selector [{selector}] matched: {matched!s}")
+        resolved.update(dict.fromkeys(matched))
+    return list(resolved)
+
+
+def _parse_constraints(selector: str) -> list[tuple]:
+    operators = {
+        ">=": tuple.__ge__,
+        "<=": tuple.__le__,
+        ">": tuple.__gt__,
+        "<": tuple.__lt__,
+        "=": tuple.__eq__,
+        "==": tuple.__eq__,
+        "!=": tuple.__ne__,
+    }
+    constraints = []
+    normalized = re.sub(r"(>=|<=|!=|==|=|>|<)\s+", r"\1", selector.replace(",", " "))
+    for token in normalized.split():
+        match = _CONSTRAINT.match(token)
+        bound = version_key(match[2]) if match else None
+        if bound is None:
+            raise ValueError(f"Invalid version constraint: {token}")
+        constraints.append((operators[match[1]], bound))
+    return constraints
+
+
+def match_version_constraint(constraint: str, available: list[str]) -> str | None:
+    """Finds the newest version satisfying a Helm dependency version constraint.
+
+    Supports the constraint syntax of `Chart.yaml` dependencies: exact versions,
+    comparisons, caret (`^1.2`) and tilde (`~1.2.3`) ranges, wildcards (`1.2.x`, `*`),
+    hyphen ranges (`1.2 - 1.4`), comma or space separated conjunctions and `||`
+    alternatives. Pre-releases are only matched by exact versions.
+
+    Args:
+        constraint (str): The version constraint of the dependency.
+        available (list[str]): The versions available in the dependency's repository.
+
+    Returns:
+        str | None: The newest matching version, or None if no version matches.
+
+    Raises:
+        ValueError: If the constraint cannot be parsed.
+    """
+    alternatives = [_helm_constraints(alt) for alt in constraint.split("||")]
+    keyed = sorted(((version_key(v), v) for v in available if version_key(v)), reverse=True)
+    for key, version in keyed:
+        for constraints, allow_pre in alternatives:
+            if (key[3][0] == 1 or allow_pre) and all(op(key, bound) for op, bound in constraints):
+                return version
+    return None
+
+
+def _helm_constraints(constraint: str) -> tuple[list[tuple], bool]:
+    """Expands a Helm constraint without `||` into comparisons on version keys.
+
+    Returns:
+        tuple[list[tuple], bool]: The (operator, bound) pairs and whether the
+        constraint names a pre-release exactly.
+    """
+    constraint = re.sub(r"^\s*(\S+)\s+-\s+(\S+)\s*$", r">=\1 <=\2", constraint)
+    normalized = re.sub(r"(\^|~>?|>=|<=|!=|==|=|>|<)\s+", r"\1", constraint.replace(",", " "))
+
+    constraints: list[tuple] = []
+    allow_pre = False
+    for token in normalized.split():
+        match = re.match(r"^(\^|~>?|>=|<=|!=|==|=|>|<)?v?(.*)$", token)
+        op, version = match[1] or "", match[2]
+        parts = []
+        for part in re.split(r"[-+]", version, maxsplit=1)[0].split(".")[:3]:
+            if part in ("x", "X", "*") or not part.isdigit():
+                break
+            parts.append(int(part))
+        if not parts:
+            if version in ("x", "X", "*", ""):
+                continue  # any version
+            raise ValueError(f"Invalid version constraint: {token}")
+
+        exact = version_key(version) if len(parts) == 3 else None
+        lower = exact or (*parts, *[0] * (3 - len(parts)), (0, ()))
+        if op == "^":
+            bump = next((i for i, p in enumerate(parts) if p), len(parts) - 1)
+            constraints += [(tuple.__ge__, lower), (tuple.__lt__, _bump(parts, bump))]
+        elif op.startswith("~"):
+            constraints += [
+                (tuple.__ge__, lower),
+                (tuple.__lt__, _bump(parts, min(len(parts), 2) - 1)),
+            ]
+        elif op in ("", "=", "==") and exact is None:
+            constraints += [(tuple.__ge__, lower), (tuple.__lt__, _bump(parts, len(parts) - 1))]
+        elif op in ("<=", ">") and exact is None:
+            # "<=1.2" includes every 1.2.x
+            bound = _bump(parts, len(parts) - 1)
+            constraints.append((tuple.__lt__ if op == "<=" else tuple.__ge__, bound))
+        else:
+            operators = {
+                "": tuple.__eq__,
+                "=": tuple.__eq__,
+                "==": tuple.__eq__,
+                "!=": tuple.__ne__,
+                ">=": tuple.__ge__,
+                "<": tuple.__lt__,
+                "<=": tuple.__le__,
+                ">": tuple.__gt__,
+            }
+            constraints.append((operators[op], lower))
+            allow_pre = allow_pre or (
+                exact is not None and exact[3][0] == 0 and op in ("", "=", "==")
+            )
+    return constraints, allow_pre
+
+
+def _bump(parts: list[int], index: int) -> tuple:
+    """Gets the lowest version key above every version starting with `parts[:index + 1]`."""
+    bumped = [*parts[:index], parts[index] + 1]
+    return *bumped, *[0] * (3 - len(bumped)), (0, ())
+
+
+def list_chart_versions(
+    registry_url: str,
+    chart_path: str,
+    headers: dict[str, str] | None = None,
+) -> list[str]:
+    """Lists the versions of a chart available in its source registry.
+
+    Classic Helm repositories are read from the cached `index.yaml` (see
+    `get_chart_versions`), OCI registries from the paginated `tags/list` endpoint.
+
+    Args:
+        registry_url (str): URL of the Helm chart's registry.
+        chart_path (str): The path or name of the Helm chart.
+        headers (Optional[Dict[str, str]]): Optional headers for authenticating the request.
+
+    Returns:
+        list[str]: The available versions of the chart.
+
+    Raises:
+        requests.exceptions.RequestException: If the versions cannot be listed.
+    """
+    headers = headers or {}
+    if not registry_url.startswith(("http://", "https://")):
+        registry_url = f"https://{registry_url}"
+    if not get_host_capabilities(registry_url).oci:
+        return list(get_chart_versions(registry_url, chart_path, headers))
+
+    versions = []
+    url = f"{registry_url.rstrip('/')}/v2/{chart_path}/tags/list"
+    while url:
+        response = requests.get(url, headers=headers, timeout=10)
+        response.raise_for_status()
+        # OCI tags cannot contain "+", Helm stores build metadata with "_"
+        versions.extend(tag.replace("_", "+") for tag in response.json().get("tags") or [])
+        next_link = response.links.get("next", {}).get("url")
+        url = urljoin(url, next_link) if next_link else None
+    return versions
@@ -0,0 +1,35 @@
+import logging
+import os
+
+# root folder of the on-disk caches, None keeps every cache in memory only
+_cache_dir: str | None = None
+
+
+def set_cache_dir(path: str | None) -> None:
+    """Sets the root folder of the on-disk caches.
+
+    Args:
+        path (str | None): The folder to persist caches in. `~` is expanded. None
+            disables persistence, all caches are then kept for the current run only.
+    """
+    global _cache_dir  # noqa: PLW0603
+    _cache_dir = os.path.expanduser(path) if path else None
+    logging.debug(f"cache dir: {_cache_dir}")
+
+
+def get_cache_path(*parts: str) -> str | None:
+    """Gets the path of an entry below the cache folder.
+
+    The parent folder of the entry is created if it does not exist yet.
+
+    Args:
+        *parts (str): The path components of the entry relative to the cache folder.
+
+    Returns:
+        str | None: The path of the cache entry, or None if persistence is disabled.
+    """
+    if _cache_dir is None:
+        return None
+    path = os.path.join(_cache_dir, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,205 @@
+import json
+import logging
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from http import HTTPStatus
+
+import requests
+
+from .cache import get_cache_path
+from .defaults import DEFAULT_TTL
+
+CACHE_FILE = "capabilities.json"
+
+_ttl: int = DEFAULT_TTL
+_lock = threading.Lock()
+
+
+@dataclass
+class HostCapabilities:
+    """Holds the detected capabilities of a registry host.
+
+    Attributes:
+        host: The registry location, hostname with an optional path.
+        checked_at: Unix timestamp of the detection.
+        oci: Whether the host answers the OCI distribution `/v2/` ping.
+        helm_index: Whether the host serves a classic Helm `index.yaml`.
+        anonymous_pull: Whether the `/v2/` ping succeeds without authentication.
+        auth_schemes: The lower-cased authentication schemes offered by the host.
+        realm: The URL of the token endpoint of the bearer challenge.
+        service: The service name of the bearer challenge.
+        cross_repo_mount: Whether blobs can be mounted from another repository,
+            None until learned from a push.
+    """
+
+    host: str
+    checked_at: float = 0.0
+    oci: bool = False
+    helm_index: bool = False
+    anonymous_pull: bool = False
+    auth_schemes: list[str] = field(default_factory=list)
+    realm: str = ""
+    service: str = ""
+    cross_repo_mount: bool | None = None
+
+
+# capability record per registry location, loaded or detected once per run
+_capabilities: dict[str, HostCapabilities] = {}
+
+
+def set_capability_ttl(ttl: int) -> None:
+    """Sets how long persisted capability records stay valid.
+
+    Args:
+        ttl (int): The time to live of a capability record in seconds.
+    """
+    global _ttl  # noqa: PLW0603
+    _ttl = ttl
+
+
+def parse_www_authenticate(header: str) -> tuple[list[str], dict[str, str]]:
+    """Parses a `WWW-Authenticate` header into its schemes and parameters.
+
+    Example inputs:
+      - 'Bearer realm="https://auth.docker.io/token",service="registry.docker.io"'
+      - 'Basic realm="Harbor"'
+
+    Args:
+        header (str): The value of the `WWW-Authenticate` header.
+
+    Returns:
+        tuple[list[str], dict[str, str]]: The lower-cased schemes and the quoted
+        parameters of the challenge.
+    """
+    schemes = [m.lower() for m in re.findall(r"(?:^|,)\s*([A-Za-z]+)\s+(?=[A-Za-z_]+=)", header)]
+    params = dict(re.findall(r'([A-Za-z_]+)="([^"]*)"', header))
+    return schemes, params
+
+
+def detect_host_capabilities(host: str) -> HostCapabilities:
+    """Detects the capabilities of a registry host.
+
+    The host is pinged with an unauthenticated `GET /v2/`. A 200 response marks an
+    OCI registry allowing anonymous access, a 401 response an OCI registry whose
+    authentication challenge is recorded. Otherwise the host is checked for a classic
+    Helm `index.yaml`.
+
+    Args:
+        host (str): The registry location, hostname with an optional path and scheme.
+
+    Returns:
+        HostCapabilities: The detected capabilities of the host.
+    """
+    base_url = host if host.startswith(("http://", "https://")) else f"https://{host}"
+    caps = HostCapabilities(host=host, checked_at=time.time())
+
+    try:
+        response = requests.get(f"{base_url}/v2/", timeout=5)
+        if response.status_code == HTTPStatus.OK:
+            caps.oci = True
+            caps.anonymous_pull = True
+        elif response.status_code == HTTPStatus.UNAUTHORIZED:
+            caps.oci = True
+            schemes, params = parse_www_authenticate(response.headers.get("WWW-Authenticate", ""))
+            caps.auth_schemes = schemes
+            caps.realm = params.get("realm", "")
+            caps.service = params.get("service", "")
+    except requests.exceptions.RequestException:
+        pass  # Suppress exceptions for this check
+
+    if not caps.oci:
+        try:
+            response = requests.head(f"{base_url}/index.yaml", timeout=5)
+            caps.helm_index = response.status_code == HTTPStatus.OK
+        except requests.exceptions.RequestException:
+            pass  # Suppress exceptions for this check
+
+    logging.debug(f"detected capabilities: {caps!s}")
+    return caps
+
+
+def get_host_capabilities(host: str) -> HostCapabilities:
+    """Gets the capabilities of a registry host.
+
+    Records are looked up in memory first, then in the on-disk cache, where they are
+    valid for the configured TTL. Unknown or expired hosts are detected and the result
+    is kept for the run and persisted. The probes run outside the lock, so a slow host
+    does not block lookups of other hosts. Hosts answering neither probe are not
+    stored at all, so a temporary outage is detected again on the next lookup.
+
+    Args:
+        host (str): The registry location, hostname with an optional path and scheme.
+
+    Returns:
+        HostCapabilities: The capabilities of the host.
+    """
+    host = host.rstrip("/").removeprefix("https://")
+    with _lock:
+        if host in _capabilities:
+            return _capabilities[host]
+
+        caps = _load_capabilities().get(host)
+        if caps is not None and time.time() - caps.checked_at <= _ttl:
+            _capabilities[host] = caps
+            return caps
+
+    caps = detect_host_capabilities(host)
+    if not (caps.oci or caps.helm_index):
+        return caps
+
+    with _lock:
+        if host not in _capabilities:
+            # another thread may have detected the host meanwhile
+            _capabilities[host] = caps
+            _save_capabilities(caps)
+        return _capabilities[host]
+
+
+def update_host_capabilities(host: str, **facts: bool) -> None:
+    """Records capabilities of a registry host learned while syncing.
+
+    Args:
+        host (str): The registry location, hostname with an optional path and scheme.
+        **facts (bool): The capabilities to record, e.g. `cross_repo_mount=True`.
+    """
+    caps = get_host_capabilities(host)
+    if not (caps.oci or caps.helm_index):
+        return  # detection failed, the record is not stored
+    with _lock:
+        for name, value in facts.items():
+            setattr(caps, name, value)
+        _save_capabilities(caps)
+
+
+def _load_capabilities() -> dict[str, HostCapabilities]:
+    path = get_cache_path(CACHE_FILE)
+    if path is None:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        known = {attr.name for attr in fields(HostCapabilities)}
+        return {
+            host: HostCapabilities(**{k: v for k, v in caps.items() if k in known})
+            for host, caps in records.items()
+        }
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        logging.warning(f"ignoring unreadable capability cache: {path}")
+        return {}
+
+
+def _save_capabilities(caps: HostCapabilities) -> None:
+    path = get_cache_path(CACHE_FILE)
+    if path is None:
+        return
+    records = {host: asdict(c) for host, c in _load_capabilities().items()}
+    records[caps.host] = asdict(caps)
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2)
+    except OSError:
+        logging.warning(f"could not write capability cache: {path}")
@@ -0,0 +1,10 @@
+# defaults of the command line options, kept apart so the parser stays light to import
+
+# concurrent chart versions, shared by all charts
+DEFAULT_WORKERS = 4
+# Git repositories synced at once
+DEFAULT_GIT_WORKERS = 4
+# bytes the Git mirrors may take up in the cache folder
+DEFAULT_MIRROR_BUDGET = 20 * 1024**3
+# seconds persisted capability records stay valid
+DEFAULT_TTL = 24 * 60 * 60
@@ -4,6 +4,8 @@ from importlib.metadata import version as pkg_version
 
 import configargparse
 
+from .defaults import DEFAULT_GIT_WORKERS, DEFAULT_MIRROR_BUDGET, DEFAULT_TTL, DEFAULT_WORKERS
+
 
 def create_parser():
     """Creates and configures an `ArgumentParser` for handling command-line arguments.
@@ -33,6 +35,49 @@ def create_parser():
         "--config-folder", help="Path to a folder containing YAML sync config files"
     )
 
+    parser.add_argument(
+        "--cache-dir",
+        default="~/.cache/airgapper",
+        env_var="AIRGAPPER_CACHE_DIR",
+        help="Folder for persistent caches, e.g. detected registry capabilities",
+    )
+    parser.add_argument(
+        "--capability-ttl",
+        type=int,
+        default=DEFAULT_TTL,
+        help="Seconds a detected registry capability record stays valid",
+    )
+
+    parser.add_argument(
+        "--git-mirror-budget",
+        type=int,
+        default=DEFAULT_MIRROR_BUDGET // 1024**3,
+        help="Size budget of the cached Git mirrors in GiB, least recently used ones are removed",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of chart versions synced concurrently",
+    )
+
+    parser.add_argument(
+        "--git-workers",
+        type=int,
+        default=DEFAULT_GIT_WORKERS,
+        help="Number of Git repositories synced concurrently",
+    )
+
+    parser.add_argument(
+        "--git-bundle-export",
+        help="Export Git repositories as incremental bundles to this folder instead of pushing",
+    )
+    parser.add_argument(
+        "--git-bundle-import",
+        help="Import Git repositories from the bundles in this folder instead of fetching",
+    )
+
     parser.add_argument(
         "--version",
         action="version",
@@ -54,7 +99,8 @@ def _get_version() -> str:
 def validate_arguments(args: argparse.Namespace, parser: argparse.ArgumentParser) -> bool:
     """Validates the provided command-line arguments to ensure exactly one option is specified
     between mutually exclusive pairs (--credentials-file, --credentials-folder) and
-    (--config-file, --config-folder).
+    (--config-file, --config-folder), and at most one of --git-bundle-export and
+    --git-bundle-import.
 
     Args:
         args (argparse.Namespace): The parsed command-line arguments.
@@ -73,4 +119,8 @@ def validate_arguments(args: argparse.Namespace, parser: argparse.ArgumentParser
         print("You must provide exactly one of --config-file or --config-folder.")
         parser.print_help()
         return False
+    if args.git_bundle_export and args.git_bundle_import:
+        print("You can provide only one of --git-bundle-export or --git-bundle-import.")
+        parser.print_help()
+        return False
     return True
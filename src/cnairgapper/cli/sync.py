@@ -1,21 +1,39 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from ..charts.images import chart_image_configs
+from ..charts.static import write_static_indexes
 from ..models.config.config_file import ConfigFile
 from ..models.config.config_resources import SyncResources
 from ..models.creds.creds import Creds
 from ..models.creds.creds_file import CredsFile
 from ..models.rc import RC
+from ..models.resources.image import Image
 from ..models.scanner.scanners import Scanners
-from .sync_git import sync_repo
-from .sync_helm import sync_chart
+from ..repositories.bundle import load_bundle_state, save_bundle_state
+from .defaults import DEFAULT_GIT_WORKERS, DEFAULT_WORKERS
+from .sync_git import import_repo, sync_repo
+from .sync_helm import resolve_chart_dependencies, resolve_chart_versions, sync_chart
 from .sync_image import sync_image
 
 
-def sync(creds_file: CredsFile, config_file: ConfigFile) -> RC:
+def sync(
+    creds_file: CredsFile,
+    config_file: ConfigFile,
+    workers: int = DEFAULT_WORKERS,
+    git_workers: int = DEFAULT_GIT_WORKERS,
+    *,
+    git_bundle_export: str | None = None,
+    git_bundle_import: str | None = None,
+) -> RC:
     """Synchronizes resources specified in a configuration file using credentials.
 
     This function takes a credentials file and a configuration file as input.
     The configuration file specifies the resources to synchronize, which may include
     images, charts, and repositories. It uses the credentials to authorize synchronization
-    actions and scanners to analyze the resources as required. The function aggregates
+    actions and scanners to analyze the resources as required. Images referenced by
+    charts with an `images_target` are synced after the charts. The function aggregates
     the results of all synchronization actions into a single result object.
 
     Args:
@@ -23,6 +41,15 @@ def sync(creds_file: CredsFile, config_file: ConfigFile) -> RC:
             required for the synchronization of resources.
         config_file (ConfigFile): A configuration file specifying the resources
             and scanners to be used during the synchronization.
+        workers (int): The number of chart versions synced concurrently, shared by
+            all charts, and of charts whose versions are resolved concurrently.
+            Defaults to `DEFAULT_WORKERS`.
+        git_workers (int): The number of Git repositories synced concurrently.
+            Defaults to `DEFAULT_GIT_WORKERS`.
+        git_bundle_export (str, optional): A transfer folder to export the Git
+            repositories to as bundles, instead of pushing them. Defaults to None.
+        git_bundle_import (str, optional): A transfer folder to import the Git
+            repository bundles from, instead of fetching the sources. Defaults to None.
 
     Returns:
         RC: An object containing the overall status of the synchronization process
@@ -57,14 +84,54 @@ def sync(creds_file: CredsFile, config_file: ConfigFile) -> RC:
         _rc = sync_image(image, creds, scanners)
         rc.entity.extend(_rc.entity)
 
-    for chart in sync_resources.charts:
-        _rc = sync_chart(chart, creds)
-        rc.entity.extend(_rc.entity)
+    # version selectors are resolved once, each source is listed a single time
+    configured_charts, version_rcs = resolve_chart_versions(sync_resources.charts, creds, workers)
+    rc.entity.extend(version_rcs)
+
+    # subchart dependencies are mirrored like configured charts, each version once
+    dependency_charts, dependency_rcs = resolve_chart_dependencies(configured_charts, creds)
+    rc.entity.extend(dependency_rcs)
+
+    # charts wait on their versions in the shared, bounded worker pool; at most
+    # `workers` charts queue their versions at once
+    charts = [*configured_charts, *dependency_charts]
+    chart_images: list[tuple[str, str]] = []
+    with (
+        ThreadPoolExecutor(max_workers=workers) as pool,
+        ThreadPoolExecutor(max_workers=max(min(len(charts), workers), 1)) as chart_pool,
+    ):
+        futures = [
+            chart_pool.submit(sync_chart, chart, creds, pool, chart_images) for chart in charts
+        ]
+        for future in futures:
+            rc.entity.extend(future.result().entity)
+    # static repository indexes are written once, after all chart versions are pushed
+    rc.entity.extend(write_static_indexes())
 
-    for repo in sync_resources.repos:
-        _rc = sync_repo(repo, creds)
+    # images referenced by charts with an images_target, deduplicated across charts
+    for config_image in chart_image_configs(chart_images, sync_resources.images):
+        _rc = sync_image(Image(config_image), creds, scanners)
         rc.entity.extend(_rc.entity)
 
+    # bundles carry only the commits missing since the previous export
+    if git_bundle_import:
+        sync_git = partial(import_repo, creds=creds, bundle_dir=git_bundle_import)
+    elif git_bundle_export:
+        os.makedirs(git_bundle_export, exist_ok=True)
+        bundle_state = load_bundle_state(git_bundle_export)
+        sync_git = partial(
+            sync_repo, creds=creds, bundle_dir=git_bundle_export, bundle_state=bundle_state
+        )
+    else:
+        sync_git = partial(sync_repo, creds=creds)
+
+    # repositories are latency bound, a bounded pool syncs several at once
+    with ThreadPoolExecutor(max_workers=git_workers) as pool:
+        for _rc in pool.map(sync_git, sync_resources.repos):
+            rc.entity.extend(_rc.entity)
+    if git_bundle_export and sync_resources.repos:
+        save_bundle_state(git_bundle_export, bundle_state)
+
     for _rc in rc.entity:
         if not _rc.ok:
             rc.ok = False
@@ -1,29 +1,65 @@
 import logging
+import re
 from typing import Literal
 
+from git import GitCommandError
+
 from ..models.creds.creds import Creds
+from ..models.creds.creds_git_repo import CredsGitRepo
 from ..models.rc import RC
 from ..models.resources.git import GitRepo
-from ..repositories.pull import clone_repo_ref
-from ..repositories.push import push_repo_ref
-from ..repositories.utils import get_matching_refs, pattern_is_regex
+from ..repositories.bundle import (
+    apply_bundles,
+    bundle_key,
+    bundle_path,
+    create_bundle,
+    list_bundles,
+    read_bundle_manifest,
+    remove_bundle,
+    write_bundle_manifest,
+)
+from ..repositories.lfs import sync_lfs_objects
+from ..repositories.mirror import open_mirror
+from ..repositories.pull import fetch_repo_refs
+from ..repositories.push import push_repo_refs
+from ..repositories.utils import (
+    forget_remote_refs,
+    get_matching_refs,
+    git_auth,
+    list_remote_refs,
+    pattern_is_regex,
+    resolve_ref,
+)
 
 
-def sync_repo(repo: GitRepo, creds: Creds) -> RC:
+def sync_repo(
+    repo: GitRepo,
+    creds: Creds,
+    bundle_dir: str | None = None,
+    bundle_state: dict[str, dict] | None = None,
+) -> RC:
     """Synchronize the specified Git repository by processing its references.
 
     This function processes the repository and its associated references (refs),
-    syncing those that match the given patterns while skipping duplicates. It uses
+    syncing those that match the given patterns while skipping duplicates. All refs
+    are fetched into a persistent mirror of the source repository at once. It uses
     credentials and push mode to perform the synchronization. The function handles
     regex patterns in references and collects the results of each synchronization
     operation. The combined results, indicating the overall success or failure,
     are returned as an RC object.
 
+    With a `bundle_state` the references are exported to a bundle in `bundle_dir`
+    instead of being pushed to the target (see `_export_repo_refs`).
+
     Args:
         repo (GitRepo): A GitRepo object representing the repository to sync. It
             contains the references, source repository, and push mode information.
         creds (Creds): A Creds object containing credentials to authenticate
             against the Git repository.
+        bundle_dir (str, optional): The transfer folder of an export. Defaults to None.
+        bundle_state (dict[str, dict], optional): The baselines of the previous
+            exports (see `load_bundle_state`), updated with the exported references.
+            Defaults to None, which syncs to the target.
 
     Returns:
         RC: An RC object that represents the result of the synchronization
@@ -36,7 +72,7 @@ def sync_repo(repo: GitRepo, creds: Creds) -> RC:
         logging.error(msg)
         return RC(ok=False, sync_cnt=True, msg=msg, ref=f"{repo.source_repo}")
 
-    rc = RC(ok=False, ref=f"{repo.source_repo}", entity=[])
+    rc = RC(ok=True, ref=f"{repo.source_repo}", entity=[])
 
     all_refs = []
 
@@ -57,16 +93,20 @@ def sync_repo(repo: GitRepo, creds: Creds) -> RC:
                 logging.info(f"working on ref: {ref}")
                 all_refs.append(ref)
 
-                _rc = _sync_repo_ref(
-                    git_repo=repo,
-                    ref=ref,
-                    credentials=creds,
-                    push_mode=repo.push_mode,
-                )
-                _rc.sync_cnt = True
-                _rc.type = "git"
-                _rc.ref = f"{repo.source_repo}:{ref}"
-                rc.entity.append(_rc)
+    if bundle_dir is not None and bundle_state is not None:
+        rcs = _export_repo_refs(repo, all_refs, creds, bundle_dir, bundle_state)
+    else:
+        rcs = _sync_repo_refs(
+            git_repo=repo,
+            refs=all_refs,
+            credentials=creds,
+            push_mode=repo.push_mode,
+        )
+    for ref, _rc in zip(all_refs, rcs, strict=True):
+        _rc.sync_cnt = True
+        _rc.type = "git"
+        _rc.ref = f"{repo.source_repo}:{ref}"
+        rc.entity.append(_rc)
 
     for _rc in rc.entity:
         if not _rc.ok:
@@ -75,24 +115,28 @@ def sync_repo(repo: GitRepo, creds: Creds) -> RC:
     return rc
 
 
-def _sync_repo_ref(
+def _sync_repo_refs(
     git_repo: GitRepo,
-    ref: str,
+    refs: list[str],
     credentials: Creds,
     push_mode: Literal["push", "skip", "force"] = "push",
-) -> RC:
-    """Synchronizes a specific reference from a source Git repository to a target Git repository.
+) -> list[RC]:
+    """Synchronizes references from a source Git repository to a target Git repository.
 
-    This function pulls a specific reference (branch, tag, or commit) from a source Git repository
-    and pushes it to a target Git repository. Authentication credentials are retrieved dynamically
-    for both the source and target repositories. If the operation fails at any step (clone or push),
-    an appropriate response code is returned to indicate the nature of the failure. Temporary local
-    storage is used during synchronization, which is cleaned automatically by the calling process.
+    The refs of the source and the target repository are listed up front (see
+    `list_remote_refs`). References whose SHAs already match, and existing references
+    with push mode "skip", are settled without fetching anything. Only the remaining
+    references are fetched into the persistent bare mirror of the source repository
+    (see `open_mirror`) with a single incremental fetch, and pushed to the target
+    repository from there with a single push. Authentication credentials are retrieved
+    dynamically for both the source and target repositories. If the operation fails at
+    any step (fetch or push), an appropriate response code is returned to indicate the
+    nature of the failure.
 
     Args:
         git_repo (GitRepo): A representation of the source and target Git repositories,
             including their URLs and hosts.
-        ref (str): The Git reference (e.g., branch name, commit hash, or tag) to be synchronized.
+        refs (list[str]): The Git references (branch or tag names) to be synchronized.
         credentials (Creds): Credentials manager to retrieve authentication details for
             both the source and target repositories.
         push_mode (Literal["push", "skip", "force"], optional): Determines the push behavior.
@@ -100,36 +144,315 @@ def _sync_repo_ref(
             (forcefully update the target reference). Defaults to "push".
 
     Returns:
-        RC: Response code object indicating the success or failure of the synchronization operation.
+        list[RC]: One response code object per reference, in the order of `refs`,
+            indicating the success or failure of its synchronization.
     """
-    logging.info(f"pulling Git repo {git_repo.source_repo}:{ref}")
-    folder_name = "./tmp/sync_tmp"
+    if not refs:
+        return []
 
     src_creds = credentials.get_git_creds(name=git_repo.source_repo_host)
-    _rc = clone_repo_ref(
-        repo_url=git_repo.source_repo,
-        target_path=folder_name,
-        ref=ref,
-        username=src_creds.username,
-        password=src_creds.password,
-        ssh_key_path=src_creds.ssh_key_path,
-    )
-    if not _rc.ok:
-        return _rc
-
-    logging.info(f"pushing to Git repo {git_repo.target_repo}:{ref}")
     tgt_creds = credentials.get_git_creds(name=git_repo.target_repo_host)
-    _rc = push_repo_ref(
-        local_repo_path=folder_name,
-        remote_url=git_repo.target_repo,
-        ref=ref,
-        username=tgt_creds.username,
-        password=tgt_creds.password,
-        ssh_key_path=tgt_creds.ssh_key_path,
-        push_mode=push_mode,
+    try:
+        src_refs = list_remote_refs(
+            git_repo.source_repo, src_creds.username, src_creds.password, src_creds.ssh_key_path
+        )
+        tgt_refs = list_remote_refs(
+            git_repo.target_repo, tgt_creds.username, tgt_creds.password, tgt_creds.ssh_key_path
+        )
+    except (GitCommandError, ValueError) as e:
+        msg = f"Failed to list refs: {e!s}"
+        logging.exception(msg)
+        return [RC(ok=False, msg=msg) for _ in refs]
+
+    # refs already identical in the target are settled without touching the mirror
+    rcs: dict[str, RC] = {}
+    pending = []
+    for ref in refs:
+        full_name = resolve_ref(src_refs, ref)
+        if full_name is None:
+            msg = f"Ref {ref} not found in {git_repo.source_repo}"
+            logging.error(msg)
+            rcs[ref] = RC(ok=False, msg=msg)
+        elif tgt_refs.get(full_name) == src_refs[full_name]:
+            msg = f"Ref {ref} is up to date in remote, skipping push"
+            logging.info(msg)
+            rcs[ref] = RC(ok=True, msg=msg, ref=ref)
+        elif full_name in tgt_refs and push_mode == "skip":
+            msg = f"Ref {ref} already exists in remote, skipping push"
+            logging.info(msg)
+            rcs[ref] = RC(ok=True, msg=msg, ref=ref)
+        else:
+            pending.append(ref)
+
+    if pending:
+        rcs.update(
+            _push_repo_refs(
+                git_repo,
+                pending,
+                src_creds,
+                tgt_creds,
+                push_mode,
+                target_shas=list(tgt_refs.values()),
+            )
+        )
+        forget_remote_refs(git_repo.target_repo)
+    return [rcs[ref] for ref in refs]
+
+
+def _push_repo_refs(
+    git_repo: GitRepo,
+    refs: list[str],
+    src_creds: CredsGitRepo,
+    tgt_creds: CredsGitRepo,
+    push_mode: Literal["push", "skip", "force"],
+    *,
+    target_shas: list[str],
+) -> dict[str, RC]:
+    """Fetches references into the mirror of the source repository and pushes them.
+
+    The references are fetched with one `git fetch` and pushed with one multi-refspec
+    `git push` (see `push_repo_refs`). For repositories with `lfs`, the LFS objects
+    reachable from the references but not from `target_shas`, the commits of the
+    target refs, are copied before the push (see `sync_lfs_objects`), so the target
+    never holds pointer files without their objects.
+
+    Returns:
+        dict[str, RC]: The result of every reference.
+    """
+    with open_mirror(git_repo.source_repo) as mirror:
+        logging.info(f"fetching Git repo {git_repo.source_repo}: {refs!s}")
+        _rc = fetch_repo_refs(
+            repo=mirror,
+            repo_url=git_repo.source_repo,
+            refs=refs,
+            username=src_creds.username,
+            password=src_creds.password,
+            ssh_key_path=src_creds.ssh_key_path,
+        )
+        if not _rc.ok:
+            return {ref: RC(ok=False, msg=_rc.msg) for ref in refs}
+
+        found = _rc.entity
+
+        if git_repo.lfs and found:
+            _rc = sync_lfs_objects(
+                mirror,
+                list(found.values()),
+                target_shas,
+                source_url=git_repo.source_repo,
+                source_creds=src_creds,
+                target_url=git_repo.target_repo,
+                target_creds=tgt_creds,
+            )
+            if not _rc.ok:
+                return {ref: RC(ok=False, msg=_rc.msg) for ref in refs}
+
+        logging.info(f"pushing to Git repo {git_repo.target_repo}: {list(found)!s}")
+        pushed = push_repo_refs(
+            local_repo_path=mirror.git_dir,
+            remote_url=git_repo.target_repo,
+            refs=found,
+            username=tgt_creds.username,
+            password=tgt_creds.password,
+            ssh_key_path=tgt_creds.ssh_key_path,
+            push_mode=push_mode,
+        )
+
+    rcs = {ref: RC(ok=False, msg=f"Ref {ref} not found in {git_repo.source_repo}") for ref in refs}
+    for ref, _rc in zip(found, pushed, strict=True):
+        if _rc.ok:
+            logging.info(f"sync done: {git_repo.source_repo}:{ref}")
+        else:
+            logging.error(f"sync failed: {git_repo.source_repo}:{ref}")
+        rcs[ref] = _rc
+    return rcs
+
+
+def _export_repo_refs(
+    git_repo: GitRepo,
+    refs: list[str],
+    credentials: Creds,
+    bundle_dir: str,
+    bundle_state: dict[str, dict],
+) -> list[RC]:
+    """Exports references of a source repository to a bundle for an air-gapped transfer.
+
+    References whose commit did not change since the previous export (the baseline
+    in `bundle_state`) are skipped. The others are fetched into the mirror of the
+    source repository and bundled with only the commits missing since the baseline
+    (see `create_bundle`), as the next numbered bundle of the repository sync. The
+    bundles of previous exports are kept, as they may not have been imported yet.
+
+    Returns:
+        list[RC]: One response code object per reference, in the order of `refs`.
+    """
+    if not refs:
+        return []
+
+    src_creds = credentials.get_git_creds(name=git_repo.source_repo_host)
+    try:
+        src_refs = list_remote_refs(
+            git_repo.source_repo, src_creds.username, src_creds.password, src_creds.ssh_key_path
+        )
+    except (GitCommandError, ValueError) as e:
+        msg = f"Failed to list refs: {e!s}"
+        logging.exception(msg)
+        return [RC(ok=False, msg=msg) for _ in refs]
+
+    key = bundle_key(git_repo.source_repo, git_repo.target_repo)
+    previous = bundle_state.get(key, {})
+    baseline = previous.get("refs", {})
+    sequence = previous.get("sequence", 0) + 1
+    path = bundle_path(bundle_dir, key, sequence)
+    rcs: dict[str, RC] = {}
+    changed: dict[str, str] = {}
+    for ref in refs:
+        full_name = resolve_ref(src_refs, ref)
+        if full_name is None:
+            msg = f"Ref {ref} not found in {git_repo.source_repo}"
+            logging.error(msg)
+            rcs[ref] = RC(ok=False, msg=msg)
+        elif baseline.get(full_name) == src_refs[full_name]:
+            msg = f"Ref {ref} unchanged since last export, skipping"
+            logging.info(msg)
+            rcs[ref] = RC(ok=True, msg=msg, ref=ref)
+        else:
+            changed[ref] = full_name
+
+    if not changed:
+        return [rcs[ref] for ref in refs]
+
+    exported = {changed[ref]: src_refs[changed[ref]] for ref in changed}
+    try:
+        with open_mirror(git_repo.source_repo) as mirror:
+            _rc = fetch_repo_refs(
+                repo=mirror,
+                repo_url=git_repo.source_repo,
+                refs=list(changed),
+                username=src_creds.username,
+                password=src_creds.password,
+                ssh_key_path=src_creds.ssh_key_path,
+            )
+            if not _rc.ok:
+                return [rcs.get(ref) or RC(ok=False, msg=_rc.msg) for ref in refs]
+            logging.info(f"exporting Git repo {git_repo.source_repo} to {path}: {list(changed)!s}")
+            create_bundle(mirror, path, exported, baseline)
+        write_bundle_manifest(path, git_repo.source_repo, exported)
+    except (GitCommandError, OSError) as e:
+        msg = f"Failed to export bundle: {e!s}"
+        logging.exception(msg)
+        remove_bundle(path)
+        return [rcs.get(ref) or RC(ok=False, msg=msg) for ref in refs]
+
+    bundle_state[key] = {
+        "source": git_repo.source_repo,
+        "target": git_repo.target_repo,
+        "sequence": sequence,
+        "refs": {**baseline, **exported},
+    }
+    for ref in changed:
+        rcs[ref] = RC(ok=True, msg=f"exported to {path}", ref=ref)
+    return [rcs[ref] for ref in refs]
+
+
+def import_repo(repo: GitRepo, creds: Creds, bundle_dir: str) -> RC:
+    """Imports the bundles exported for a Git repository into its target repository.
+
+    The bundles are looked up by the source and the target repository in
+    `bundle_dir` (see `list_bundles`), and the references of their manifests, the
+    newest commit of each, are filtered by the configured patterns. The current refs
+    of the target are fetched into the mirror of the target, so the prerequisites of
+    the bundles can be checked, and the bundles are applied there in export order
+    (see `apply_bundles`). The references are then pushed to the target with the
+    `push_mode` of the repository, like a regular sync. Bundles already imported can
+    be removed from the transfer folder.
+
+    Args:
+        repo (GitRepo): A GitRepo object representing the repository to import.
+        creds (Creds): A Creds object containing credentials to authenticate
+            against the target repository.
+        bundle_dir (str): The transfer folder holding the bundles.
+
+    Returns:
+        RC: An RC object with one entity per imported reference.
+    """
+    logging.info(f"importing repo: {repo.source_repo}")
+    rc = RC(ok=True, ref=f"{repo.source_repo}", entity=[])
+    paths = list_bundles(bundle_dir, bundle_key(repo.source_repo, repo.target_repo))
+    if not paths:
+        logging.info(f"no bundle to import: {repo.source_repo}")
+        return rc
+    manifest: dict[str, str] = {}
+    for path in paths:
+        manifest.update(read_bundle_manifest(path) or {})
+
+    names = {full_name.split("/", 2)[2]: full_name for full_name in manifest}
+    refs = {name: full_name for name, full_name in names.items() if _ref_matches(repo.refs, name)}
+    rcs = _import_repo_refs(repo, paths, refs, manifest, creds) if refs else {}
+    for ref, _rc in rcs.items():
+        _rc.sync_cnt = True
+        _rc.type = "git"
+        _rc.ref = f"{repo.source_repo}:{ref}"
+        rc.entity.append(_rc)
+        if not _rc.ok:
+            rc.ok = False
+    return rc
+
+
+def _import_repo_refs(
+    git_repo: GitRepo,
+    paths: list[str],
+    refs: dict[str, str],
+    manifest: dict[str, str],
+    creds: Creds,
+) -> dict[str, RC]:
+    """Applies bundles to the mirror of the target repository and pushes the references.
+
+    Returns:
+        dict[str, RC]: The result of every reference.
+    """
+    tgt_creds = creds.get_git_creds(name=git_repo.target_repo_host)
+    try:
+        url, options = git_auth(
+            git_repo.target_repo, tgt_creds.username, tgt_creds.password, tgt_creds.ssh_key_path
+        )
+        with open_mirror(git_repo.target_repo) as mirror:
+            # the current refs of the target hold the prerequisites of the bundles
+            mirror.git(**options).fetch(
+                url, "--no-tags", "+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"
+            )
+            errors = apply_bundles(mirror, paths, {refs[ref]: manifest[refs[ref]] for ref in refs})
+
+            rcs = {}
+            for ref, full_name in refs.items():
+                if full_name in errors:
+                    msg = f"Failed to import ref {ref}: {errors[full_name]}"
+                    logging.error(msg)
+                    rcs[ref] = RC(ok=False, msg=msg)
+            applied = {ref: full_name for ref, full_name in refs.items() if ref not in rcs}
+            logging.info(f"pushing to Git repo {git_repo.target_repo}: {list(applied)!s}")
+            pushed = push_repo_refs(
+                local_repo_path=mirror.git_dir,
+                remote_url=git_repo.target_repo,
+                refs=applied,
+                username=tgt_creds.username,
+                password=tgt_creds.password,
+                ssh_key_path=tgt_creds.ssh_key_path,
+                push_mode=git_repo.push_mode,
+            )
+    except (GitCommandError, ValueError) as e:
+        msg = f"Failed to import bundle: {e!s}"
+        logging.exception(msg)
+        return {ref: RC(ok=False, msg=msg) for ref in refs}
+
+    forget_remote_refs(git_repo.target_repo)
+    rcs.update(zip(applied, pushed, strict=True))
+    return {ref: rcs[ref] for ref in refs}
+
+
+def _ref_matches(patterns: list[str], name: str) -> bool:
+    """Checks if a branch or tag name is selected by the configured ref patterns."""
+    return any(
+        re.match(pattern, name) if pattern_is_regex(pattern) else pattern == name
+        for pattern in patterns
     )
-    if _rc.ok:
-        logging.info(f"sync done: {git_repo.source_repo}:{ref}")
-    else:
-        logging.error(f"sync failed: {git_repo.source_repo}:{ref}")
-    return _rc
@@ -1,23 +1,69 @@
 import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
+
+from ..charts.dependencies import dependency_source, get_chart_dependencies
+from ..charts.images import cached_chart_images, discover_chart_images
 from ..charts.pull import pull_helm_chart
 from ..charts.push import push_helm_chart
-from ..charts.utils import get_auth_headers, oci_chart_exists
+from ..charts.static import write_static_indexes
+from ..charts.utils import chart_exists, get_auth_headers
+from ..charts.versions import (
+    is_version_selector,
+    list_chart_versions,
+    match_version_constraint,
+    select_versions,
+    version_key,
+)
 from ..models.config.config_helm_chart import ConfigHelmChart
+from ..models.config.config_helm_chart_target import ConfigHelmChartTarget
 from ..models.creds.creds import Creds
 from ..models.rc import RC
 from ..models.resources.helm import HelmChart
+from .defaults import DEFAULT_WORKERS
+
+# staging folders of the chart versions in flight, one per version
+STAGING_DIR = "./tmp/sync_tmp/helm"
+# seconds before authentication headers are refreshed, below common token lifetimes
+HEADERS_MAX_AGE = 240
 
 
-def sync_chart(chart_config: ConfigHelmChart, credentials: Creds) -> RC:
+def sync_chart(
+    chart_config: ConfigHelmChart,
+    credentials: Creds,
+    pool: ThreadPoolExecutor | None = None,
+    images: list[tuple[str, str]] | None = None,
+) -> RC:
     """Synchronizes a Helm chart with specified configurations and credentials, processing
     chart versions and determining their synchronization results.
 
+    Version selectors (`latest:N`, `latest-minor:N`, range constraints and regular
+    expressions, see `select_versions`) are resolved against the versions available in
+    the source first, unless the chart was passed through `resolve_chart_versions`.
+    The versions of the chart are synced concurrently by a bounded worker pool, each
+    in its own staging folder. Authentication headers are resolved
+    once per chart and shared by all versions; the registry type and the classic
+    repository index are cached per run (see `get_host_capabilities` and
+    `get_chart_versions`).
+
     Args:
         chart_config (ConfigHelmChart): The configuration object for the Helm chart,
             including source details and version specifications.
         credentials (Creds): The credentials required for accessing and synchronizing
             the Helm chart.
+        pool (ThreadPoolExecutor, optional): The worker pool to sync the versions in,
+            shared between charts; the caller then writes the static repository
+            indexes (see `write_static_indexes`). Defaults to None, which uses a pool
+            of `DEFAULT_WORKERS` for this chart and writes the indexes afterwards.
+        images (list[tuple[str, str]], optional): Collects the images discovered in
+            the chart versions, with the image target of the chart, if the chart sets
+            `images_target` (see `discover_chart_images`). Defaults to None.
 
     Returns:
         RC: A result container object that encapsulates the synchronization results,
@@ -41,23 +87,41 @@ def sync_chart(chart_config: ConfigHelmChart, credentials: Creds) -> RC:
             ref=f"{chart_config.source_registry} - {chart_config.source_chart}",
         )
 
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=DEFAULT_WORKERS) as own_pool:
+            rc = sync_chart(chart_config, credentials, own_pool, images)
+        failed = write_static_indexes()
+        if failed:
+            rc.ok = False
+            rc.entity = [*(rc.entity or []), *failed]
+        return rc
+
     rc = RC(
         ok=True,
         type="helm",
         ref=f"{chart_config.source_registry} - {chart_config.source_chart}",
         entity=[],
     )
-    for version in chart_config.versions:
+    headers = _HeadersCache(credentials)
+    versions_rc = _resolve_versions(chart_config, headers)
+    if not versions_rc.ok:
+        return versions_rc
+
+    futures = {}
+    for version in dict.fromkeys(versions_rc.entity):
         chart = HelmChart(chart_config, version)
-        logging.info(f"processing chart version: {chart.chart_name}:{version}")
-        _rc = _sync_chart_version(
-            chart=chart,
-            creds=credentials,
-        )
-        _rc.sync_cnt = True
-        _rc.type = "helm"
-        _rc.ref = f"{chart_config.source_registry} - {chart_config.source_chart}:{version}"
-        rc.entity.append(_rc)
+        futures[version] = (chart, pool.submit(_sync_chart_version, chart, headers, images))
+
+    for version, (chart, future) in futures.items():
+        target_charts = chart.target_charts
+        rcs = future.result()
+        for target_chart, _rc in zip(target_charts, rcs, strict=True):
+            _rc.sync_cnt = True
+            _rc.type = "helm"
+            _rc.ref = f"{chart_config.source_registry} - {chart_config.source_chart}:{version}"
+            if len(target_charts) > 1:
+                _rc.ref += f" -> {target_chart.target_ref}"
+            rc.entity.append(_rc)
     for _rc in rc.entity:
         if not _rc.ok:
             rc.ok = False
@@ -65,67 +129,387 @@ def sync_chart(chart_config: ConfigHelmChart, credentials: Creds) -> RC:
     return rc
 
 
+class _HeadersCache:
+    """Authentication headers per registry, shared by the versions of a chart.
+
+    Headers are refreshed after `HEADERS_MAX_AGE` seconds, so bearer tokens do not
+    expire while a long list of versions is synced. Each registry has a lock of its
+    own, so a token fetch only blocks the workers waiting for the same registry.
+    """
+
+    def __init__(self, creds: Creds):
+        self.creds = creds
+        self._headers: dict[str, tuple[float, dict]] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, registry: str) -> dict:
+        with self._lock:
+            lock = self._locks.setdefault(registry, threading.Lock())
+        with lock:
+            created, headers = self._headers.get(registry, (0.0, {}))
+            if time.monotonic() - created > HEADERS_MAX_AGE:
+                headers = get_auth_headers(creds=self.creds, registry=registry)
+                self._headers[registry] = (time.monotonic(), headers)
+            return headers
+
+
+def resolve_chart_versions(
+    charts: list[ConfigHelmChart], credentials: Creds, workers: int = DEFAULT_WORKERS
+) -> tuple[list[ConfigHelmChart], list[RC]]:
+    """Resolves the version selectors of the charts against the versions of their source.
+
+    Every source with selectors is listed once, concurrently by a pool of `workers`.
+    The returned chart entries list exact versions only, so neither
+    `resolve_chart_dependencies` nor `sync_chart` lists the source again. Charts
+    without selectors are returned as they are.
+
+    Args:
+        charts (list[ConfigHelmChart]): The Helm charts of the sync config.
+        credentials (Creds): The credentials for accessing the source registries.
+        workers (int, optional): The number of sources listed concurrently. Defaults
+            to `DEFAULT_WORKERS`.
+
+    Returns:
+        tuple[list[ConfigHelmChart], list[RC]]: The chart entries with resolved
+        versions, and one failed RC per chart whose versions could not be resolved.
+    """
+    headers = _HeadersCache(credentials)
+    resolved, rcs = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda c: _resolve_versions(c, headers), charts)
+        for chart_config, versions_rc in zip(charts, results, strict=True):
+            if not versions_rc.ok:
+                rcs.append(versions_rc)
+            elif versions_rc.entity == chart_config.versions:
+                resolved.append(chart_config)
+            else:
+                resolved.append(chart_config.model_copy(update={"versions": versions_rc.entity}))
+    return resolved, rcs
+
+
+def resolve_chart_dependencies(
+    charts: list[ConfigHelmChart], credentials: Creds
+) -> tuple[list[ConfigHelmChart], list[RC]]:
+    """Resolves the subchart dependencies of the charts that set `include_dependencies`.
+
+    The `dependencies` of every chart version are read from its Chart.yaml metadata
+    (see `get_chart_dependencies`), and their version constraints are resolved to the
+    newest matching version in the dependency's repository, using the cached
+    indexes. Dependencies are followed transitively and pushed to the targets of the
+    chart depending on them. The resulting graph is deduplicated across all charts:
+    every (chart, version, target) node is mirrored once, however many charts depend
+    on it, and nodes already listed in the config are left out.
+
+    Vendored dependencies (`file://` or no repository) ship inside the parent archive
+    and dependencies on repository aliases cannot be resolved; both are skipped.
+
+    Args:
+        charts (list[ConfigHelmChart]): The Helm charts of the sync config, with
+            their versions resolved (see `resolve_chart_versions`).
+        credentials (Creds): The credentials for accessing the source registries.
+
+    Returns:
+        tuple[list[ConfigHelmChart], list[RC]]: The chart entries mirroring the
+        dependencies, to be synced like configured charts, and one failed RC per
+        dependency that could not be resolved.
+    """
+    headers = _HeadersCache(credentials)
+    configured = {
+        (c.source_registry, c.source_chart, version, target)
+        for c in charts
+        for version in c.versions
+        for target in _chart_targets(c)
+    }
+
+    queue = _dependency_roots(charts)
+    rcs = []
+    seen = set()
+    # (registry, chart) -> version -> targets
+    nodes: dict[tuple[str, str], dict[str, set[tuple]]] = {}
+    while queue:
+        registry, chart_path, version, targets = queue.pop(0)
+        try:
+            dependencies = get_chart_dependencies(
+                registry, chart_path, version, headers.get(registry)
+            )
+        except (requests.RequestException, ValueError) as e:
+            msg = f"Error reading dependencies of Helm chart {chart_path}:{version}: {e}"
+            logging.exception(msg)
+            rcs.append(
+                RC(
+                    ok=False,
+                    err=True,
+                    sync_cnt=True,
+                    type="helm",
+                    msg=msg,
+                    ref=f"{registry} - {chart_path}:{version}",
+                )
+            )
+            continue
+
+        for dependency in dependencies:
+            source = dependency_source(dependency.get("repository") or "", dependency["name"])
+            if source is None:
+                logging.debug(f"skipping dependency without repository: {dependency['name']}")
+                continue
+            constraint = str(dependency.get("version") or "*")
+            try:
+                available = list_chart_versions(*source, headers.get(source[0]))
+                dependency_version = match_version_constraint(constraint, available)
+            except (requests.RequestException, ValueError) as e:
+                dependency_version, error = None, e
+            else:
+                error = f"no version matches {constraint}"
+            if dependency_version is None:
+                msg = f"Error resolving dependency {source[1]} of Helm chart {chart_path}: {error}"
+                logging.error(msg)
+                rcs.append(
+                    RC(
+                        ok=False,
+                        err=True,
+                        sync_cnt=True,
+                        type="helm",
+                        msg=msg,
+                        ref=f"{source[0]} - {source[1]}:{constraint}",
+                    )
+                )
+                continue
+
+            new_targets = [t for t in targets if (*source, dependency_version, t) not in seen]
+            if not new_targets:
+                continue
+            seen.update((*source, dependency_version, t) for t in new_targets)
+            logging.info(f"dependency of {chart_path}:{version}: {source[1]}:{dependency_version}")
+            nodes.setdefault(source, {}).setdefault(dependency_version, set()).update(
+                t for t in new_targets if (*source, dependency_version, t) not in configured
+            )
+            queue.append((*source, dependency_version, new_targets))
+
+    return _dependency_charts(nodes), rcs
+
+
+def _resolve_versions(chart_config: ConfigHelmChart, headers: _HeadersCache) -> RC:
+    """Resolves the version selectors of a chart, listing its source only if it has any.
+
+    Returns:
+        RC: The result, with the versions of the chart as entity.
+    """
+    versions = chart_config.versions
+    try:
+        if any(is_version_selector(v) for v in versions):
+            available = list_chart_versions(
+                registry_url=chart_config.source_registry,
+                chart_path=chart_config.source_chart,
+                headers=headers.get(chart_config.source_registry),
+            )
+            versions = select_versions(versions, available)
+    except (requests.RequestException, ValueError) as e:
+        msg = f"Error resolving versions of Helm chart {chart_config.source_chart}: {e}"
+        logging.exception(msg)
+        return RC(
+            ok=False,
+            err=True,
+            sync_cnt=True,
+            type="helm",
+            msg=msg,
+            ref=f"{chart_config.source_registry} - {chart_config.source_chart}",
+        )
+    return RC(ok=True, entity=versions)
+
+
+def _dependency_roots(charts: list[ConfigHelmChart]) -> list[tuple]:
+    """Gets the (registry, chart, version, targets) of the charts including dependencies."""
+    roots = []
+    for chart_config in charts:
+        if not chart_config.include_dependencies:
+            continue
+        targets = _chart_targets(chart_config)
+        roots.extend(
+            (chart_config.source_registry, chart_config.source_chart, v, targets)
+            for v in chart_config.versions
+        )
+    return roots
+
+
+def _dependency_charts(
+    nodes: dict[tuple[str, str], dict[str, set[tuple]]],
+) -> list[ConfigHelmChart]:
+    """Builds one chart entry per dependency and set of targets, listing all its versions."""
+    dependency_charts = []
+    for (registry, chart_path), versions in nodes.items():
+        by_targets: dict[tuple, list[str]] = {}
+        for version, targets in versions.items():
+            if targets:
+                by_targets.setdefault(tuple(sorted(targets)), []).append(version)
+        for targets, target_versions in by_targets.items():
+            (target_registry, target_repo, target_repo_type), *additional = targets
+            dependency_charts.append(
+                ConfigHelmChart(
+                    source_registry=registry,
+                    source_chart=chart_path,
+                    target_registry=target_registry,
+                    target_repo=target_repo,
+                    target_repo_type=target_repo_type,
+                    additional_targets=[
+                        ConfigHelmChartTarget(
+                            target_registry=t[0], target_repo=t[1], target_repo_type=t[2]
+                        )
+                        for t in additional
+                    ],
+                    versions=sorted(
+                        target_versions, key=lambda v: version_key(v) or (), reverse=True
+                    ),
+                )
+            )
+    return dependency_charts
+
+
+def _chart_targets(chart_config: ConfigHelmChart) -> list[tuple[str, str, str]]:
+    """Get the (registry, repo, type) of every target of a chart configuration."""
+    return [
+        (chart_config.target_registry, chart_config.target_repo, chart_config.target_repo_type),
+        *(
+            (t.target_registry, t.target_repo, t.target_repo_type)
+            for t in chart_config.additional_targets
+        ),
+    ]
+
+
 def _sync_chart_version(
     chart: HelmChart,
-    creds: Creds,
-) -> RC:
-    """Synchronizes a Helm chart version between source and target registries.
+    headers: _HeadersCache,
+    images: list[tuple[str, str]] | None = None,
+) -> list[RC]:
+    """Synchronizes a Helm chart version between the source and all target registries.
 
     This function handles the process of ensuring that the specified Helm chart
-    exists in the target registry by pulling the Helm chart from the source
-    registry, if necessary, and pushing it to the target registry. It checks
-    if the chart already exists in the target registry and skips the upload
-    process if the chart is configured to be skipped. Temporary files during
-    the process are stored in a predefined local directory.
+    exists in every target registry. It checks whether the chart already exists in
+    each target and skips those targets if the chart is configured to be skipped.
+    The chart is then pulled from the source registry once, if any target needs it,
+    and pushed to the remaining targets one after another. Temporary files during the
+    process are stored in a staging folder of their own, so versions can be synced
+    concurrently.
+
+    If the chart sets `images_target`, the images referenced by the chart version are
+    collected as well. They are looked up in the discovery cache first; the chart is
+    pulled for discovery only if the version has not been inspected before.
 
     Args:
         chart (HelmChart): The details of the Helm chart to be synchronized,
             including source and target registry details, chart name,
             version, and push mode.
-        creds (Creds): Authentication credentials used to generate the
-            headers required for accessing the source and target registries.
+        headers (_HeadersCache): The authentication headers required for accessing
+            the source and target registries, shared by all versions of the chart.
+        images (list[tuple[str, str]], optional): Collects the images discovered in
+            the chart version, with the image target of the chart. Defaults to None.
 
     Returns:
-        RC: An instance of RC that represents the result of the synchronization
-            operation, including its status (success or failure), error details
-            if any, and reference details when applicable.
+        list[RC]: One RC per target of the chart, in the order of `chart.target_charts`,
+            representing the result of the synchronization operation, including its
+            status (success or failure), error details if any, and reference details
+            when applicable.
     """
-    logging.info(f"pulling [{chart.source_registry}] {chart.chart_name} : {chart.version}")
-    folder_name = "./tmp/sync_tmp"
-
-    # src_headers = get_auth_headers(creds=creds, registry=chart.source_registry, repo=chart.source)
-    src_headers = get_auth_headers(creds=creds, registry=chart.source_registry)
-    # tgt_headers = get_auth_headers( creds=creds, registry=chart.target_registry,
-    # repo=chart.target_repo )
-    tgt_headers = get_auth_headers(creds=creds, registry=chart.target_registry)
-
-    _rc = oci_chart_exists(chart=chart, headers=tgt_headers)
-    # chart exists and can be skipped
-    if _rc.err:
-        return _rc
-
-    if _rc.ok and chart.push_mode == "skip":
-        msg = f"skip chart upload: {chart.chart_name} : {chart.version}"
-        logging.info(msg)
-        return RC(ok=True, msg=msg)
-
-    _rc = pull_helm_chart(
-        chart_path=chart.source,
-        version=chart.version,
-        registry_url=chart.source_registry,
-        output_dir=folder_name,
-        headers=src_headers,
-    )
-    if not _rc.ok:
-        return _rc
+    target_charts = chart.target_charts
+    rcs: list[RC | None] = [None] * len(target_charts)
+
+    src_headers = headers.get(chart.source_registry)
 
+    to_push = []
+    for i, target_chart in enumerate(target_charts):
+        # static targets are folders, there is nothing to authenticate against
+        tgt_headers = (
+            {}
+            if target_chart.target_repo_type == "static"
+            else headers.get(target_chart.target_registry)
+        )
+
+        _rc = chart_exists(chart=target_chart, headers=tgt_headers)
+        if _rc.err:
+            rcs[i] = _rc
+            continue
+
+        # chart exists and can be skipped
+        if _rc.ok and chart.push_mode == "skip":
+            msg = (
+                f"skip chart upload: {target_chart.target_ref}/{chart.chart_name} : {chart.version}"
+            )
+            logging.info(msg)
+            rcs[i] = RC(ok=True, msg=msg)
+            continue
+        to_push.append((i, target_chart, tgt_headers))
+
+    # images of the chart version, from the discovery cache if inspected before
+    chart_ref = f"{chart.source_registry}/{chart.source}:{chart.version}"
+    discover = bool(chart.images_target) and images is not None
+    if discover and (chart_images := cached_chart_images(chart_ref)) is not None:
+        images.extend((image, chart.images_target) for image in chart_images)
+        discover = False
+
+    if not to_push and not discover:
+        return rcs
+
+    os.makedirs(STAGING_DIR, exist_ok=True)
+    folder_name = tempfile.mkdtemp(prefix=f"{chart.chart_name}-{chart.version}-", dir=STAGING_DIR)
+    try:
+        logging.info(f"pulling [{chart.source_registry}] {chart.chart_name} : {chart.version}")
+        _rc = pull_helm_chart(
+            chart_path=chart.source,
+            version=chart.version,
+            registry_url=chart.source_registry,
+            output_dir=folder_name,
+            headers=src_headers,
+        )
+        if not _rc.ok:
+            for i, _, _ in to_push:
+                rcs[i] = _rc
+            return rcs
+        chart_file = _rc.ref
+        config_file = _rc.entity
+
+        if discover:
+            try:
+                chart_images = discover_chart_images(chart_file, chart_ref)
+                images.extend((image, chart.images_target) for image in chart_images)
+            except Exception:
+                logging.exception(f"Error discovering images of Helm chart {chart_ref}")
+
+        # targets one after another, the worker pool bounds the pushes in flight
+        for i, target_chart, tgt_headers in to_push:
+            rcs[i] = _push_chart_version(chart_file, target_chart, tgt_headers, config_file)
+    finally:
+        shutil.rmtree(folder_name, ignore_errors=True)
+    return rcs
+
+
+def _push_chart_version(
+    chart_file: str,
+    chart: HelmChart,
+    headers: dict[str, str],
+    config_file: str | None = None,
+) -> RC:
+    """Pushes a pulled Helm chart archive to a single target of a chart.
+
+    Args:
+        chart_file (str): Path to the pulled chart archive; it is left in place so it
+            can be pushed to further targets.
+        chart (HelmChart): A single-target view of the chart to push.
+        headers (Dict[str, str]): The authentication headers for the target registry.
+        config_file (Optional[str]): Path to the OCI config blob pulled with the chart,
+            None if the source is a classic Helm repository.
+
+    Returns:
+        RC: The result of the push operation.
+    """
     logging.info(f"pushing [{chart.target_registry}] repo - {chart.target_repo} : {chart.version}")
     _rc = push_helm_chart(
-        chart_path=_rc.ref,
+        chart_path=chart_file,
         repo_type=chart.target_repo_type,
         repo_url=chart.target_registry,
         repo_path=chart.target_repo,
-        headers=tgt_headers,
+        headers=headers,
+        cleanup_chart=False,
+        config_path=config_file,
     )
-    logging.info(f"sync done - {chart.chart_name} : {chart.version}")
+    logging.info(f"sync done - {chart.target_ref}/{chart.chart_name} : {chart.version}")
     return _rc
@@ -1,24 +1,29 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from ..images.pull import pull_container_image
-from ..images.push import push_container_image
-from ..images.utils import check_image_tag_exists
+from ..images.mirrors import mirror_location, record_source_failure, select_image_sources
+from ..images.pull import get_image_digests, pull_container_image
+from ..images.push import cleanup_directory, push_container_image, push_container_manifest
+from ..images.utils import check_image_tag_exists, group_tags_by_digest
 from ..models.creds.creds import Creds
 from ..models.rc import RC
 from ..models.resources.image import Image
+from ..models.scanner.scanner import Scanner
 from ..models.scanner.scanners import Scanners
 
 
 def sync_image(image: Image, credentials: Creds, scanners: Scanners) -> RC:
     """Synchronizes a container image with associated tags by validating scanning
-    configurations and performing scan and sync operations. The function processes
-    each tag of a Docker image sequentially, scans the image, and attempts to
-    synchronize if scanning is successful. Returns a comprehensive result object
-    indicating the outcome for each tag and the overall image.
+    configurations and performing scan and sync operations. The function checks each
+    tag of a Docker image for existence in every target, groups the tags that have to
+    be synced by their resolved source digest, and scans and pulls every group once.
+    The pulled data is then pushed to all targets concurrently; additional tags of a
+    group are created with a single manifest push. Returns a comprehensive result object
+    indicating the outcome for each tag and target, and the overall image.
 
     Args:
         image (Image): The container image to be synchronized, including its scan
-            configuration and tags.
+            configuration, targets and tags.
         credentials (Creds): The credentials object providing login details for
             image registry access.
         scanners (Scanners): A Scanners object containing scanner configurations
@@ -27,14 +32,14 @@ def sync_image(image: Image, credentials: Creds, scanners: Scanners) -> RC:
     Returns:
         RC: An object representing the synchronization result. The `ok` field
             denotes the overall success. The `entity` field contains the outcome
-            for each image tag.
+            for each image tag and target.
 
     Raises:
         None
     """
     # get scan config by name
     scanner = scanners.get_scanner(image.scan)
-    tgt_creds = credentials.get_image_creds(name=image.target_registry)
+    src_creds = credentials.get_image_creds(name=image.source_registry)
 
     if image.scan and not scanner:
         msg = f"No scan config provided for scanning image: {image.source}"
@@ -48,63 +53,64 @@ def sync_image(image: Image, credentials: Creds, scanners: Scanners) -> RC:
         return RC(ok=False, msg=msg, ref=f"{image.source}")
 
     rc = RC(ok=True, ref=f"{image.source}", entity=[])
+    target_images = image.target_images
+    # tag -> target -> result of every tag that has to be synced to a target
+    pending: dict[str, dict[str, RC]] = {}
+    processed = []
     for tag in image.tags:
+        if tag in processed:
+            logging.info(f"skipping tag - already processed: {image.source}:{tag}")
+            continue
+        processed.append(tag)
         logging.info(f"processing image tag: {image.source}:{tag}")
-        _rc = check_image_tag_exists(
-            image=image,
-            tag=tag,
-            username=tgt_creds.username,
-            password=tgt_creds.password,
-        )
-        image_exists = _rc.ok
-        logging.debug(f"image exists [{_rc.ok!s}]: {_rc.msg}")
-        _rc.sync_cnt = True
-        _rc.type = "docker"
-        _rc.ref = f"{image.source}:{tag}"
-
-        if _rc.err:
-            # failure while checking for existence
+        for target_image in target_images:
+            tgt_creds = credentials.get_image_creds(name=target_image.target_registry)
+            _rc = check_image_tag_exists(
+                image=target_image,
+                tag=tag,
+                username=tgt_creds.username,
+                password=tgt_creds.password,
+            )
+            image_exists = _rc.ok
+            logging.debug(f"image exists [{_rc.ok!s}]: {_rc.msg}")
+            _rc.sync_cnt = True
+            _rc.type = "docker"
+            _rc.ref = f"{image.source}:{tag}"
+            if len(target_images) > 1:
+                _rc.ref += f" -> {target_image.target}"
             rc.entity.append(_rc)
-            continue
 
-        if (image_exists and image.push_mode == "force") or not image_exists:
-            # image does not exist yet, or force sync is activated
-            image_okay = True
-            if image.scan:
-                logging.info(f"scanning image with {scanner.name}")
-                scan_rc = scanner.scan_image(
-                    image=image,
-                    tag=tag,
-                    registry_username=credentials.get_image_creds(
-                        name=image.source_registry
-                    ).username,
-                    registry_password=credentials.get_image_creds(
-                        name=image.source_registry
-                    ).password,
-                )
-                logging.debug(f"scanning ok [{scan_rc.ok!s}]: {scan_rc.msg}")
-                image_okay = scan_rc.ok
-                if not scan_rc.ok:
-                    _rc.ok = False
-                    _rc.msg = scan_rc.msg
-            if image_okay:
-                logging.info(f"starting sync for {image.source}:{tag} ...")
-                sync_rc = _sync_image_tag(
-                    image=image,
-                    tag=tag,
-                    credentials=credentials,
-                )
-                if not sync_rc.ok:
-                    _rc.msg = sync_rc.msg
-                else:
-                    _rc.msg = f"synced tag: {image.source}:{tag}"
-                logging.debug(f"sync finished [{sync_rc.ok!s}]: {sync_rc.msg}")
-                _rc.ok = sync_rc.ok
-        else:
-            _rc.msg = f"skipping tag - already exists: {image.source}:{tag}"
-            logging.info(_rc.msg)
-
-        rc.entity.append(_rc)
+            if _rc.err:
+                # failure while checking for existence
+                continue
+
+            if (image_exists and image.push_mode == "force") or not image_exists:
+                # image does not exist yet, or force sync is activated
+                pending.setdefault(tag, {})[target_image.target] = _rc
+            else:
+                _rc.msg = f"skipping tag - already exists: {target_image.target}:{tag}"
+                logging.info(_rc.msg)
+
+    if pending:
+        digests = get_image_digests(
+            image_name=image.source_repo,
+            tags=list(pending),
+            registry=image.source_registry,
+            username=src_creds.username,
+            password=src_creds.password,
+        )
+        for tags in group_tags_by_digest(list(pending), digests):
+            if len(tags) > 1:
+                logging.info(f"tags share digest {digests[tags[0]]}: {', '.join(tags)}")
+            _sync_tag_group(
+                image=image,
+                tags=tags,
+                digests=digests,
+                pending=pending,
+                credentials=credentials,
+                scanner=scanner,
+            )
+
     # did we have any error?
     for _rc in rc.entity:
         if not _rc.ok:
@@ -113,53 +119,167 @@ def sync_image(image: Image, credentials: Creds, scanners: Scanners) -> RC:
     return rc
 
 
-def _sync_image_tag(image: Image, tag: str, credentials: Creds) -> RC:
-    """Synchronizes a specific image tag between a source and target container registry.
+def _sync_tag_group(
+    image: Image,
+    tags: list[str],
+    digests: dict[str, str],
+    pending: dict[str, dict[str, RC]],
+    credentials: Creds,
+    scanner: Scanner | None,
+):
+    """Scans, pulls and pushes a group of tags sharing one source digest.
 
-    This function checks if the specified image tag exists in the target registry.
-    If it doesn't exist, it pulls the image from the source registry to a local
-    temporary folder, and then pushes it to the target registry. If the image tag
-    already exists in the target registry, it skips the synchronization process
-    and logs this information.
+    The image is scanned and pulled once using the first tag of the group; the scan
+    result holds for every tag of the group. The pull uses the best ranked trusted
+    source location (the source or one of its mirrors) and fails over to the next one.
+    The pulled data is pushed to all targets concurrently, each target receiving only
+    the tags it is missing. The per-tag and per-target result objects in `pending` are
+    updated in place with the outcome.
 
     Args:
-        image (Image): Contains information about the source and target
-            image names, repositories, and registries involved in the sync
-            process.
-        tag (str): The specific tag of the container image to be synchronized.
-        credentials (Creds): Handles authentication for accessing both the source
-            and target container registries.
-
-    Returns:
-        RC: An object representing the result of the synchronization
-            operation, containing information about success or failure,
-            an accompanying message, and a reference to the target image.
+        image (Image): The container image to be synchronized.
+        tags (list[str]): The tags of the group, all resolving to the same digest.
+        digests (dict[str, str]): The source manifest digest of each resolvable tag.
+        pending (dict[str, dict[str, RC]]): The result object of each tag and target,
+            updated in place.
+        credentials (Creds): The credentials object providing registry login details.
+        scanner (Optional[Scanner]): The scanner to use, if the image has to be scanned.
     """
     src_creds = credentials.get_image_creds(name=image.source_registry)
-    tgt_creds = credentials.get_image_creds(name=image.target_registry)
     folder_name = "./tmp/sync_tmp"
+    tag = tags[0]
+
+    def _fail_all(msg: str):
+        for t in tags:
+            for _rc in pending[t].values():
+                _rc.ok = False
+                _rc.msg = msg
 
-    logging.info(f"Pulling Docker image {image.source}:{tag}")
-    rc = pull_container_image(
-        image_name=image.source_repo,
+    if image.scan:
+        logging.info(f"scanning image with {scanner.name}")
+        scan_rc = scanner.scan_image(
+            image=image,
+            tag=tag,
+            registry_username=src_creds.username,
+            registry_password=src_creds.password,
+        )
+        logging.debug(f"scanning ok [{scan_rc.ok!s}]: {scan_rc.msg}")
+        if not scan_rc.ok:
+            _fail_all(scan_rc.msg)
+            return
+
+    logging.info(f"starting sync for {image.source}:{tag} ...")
+    pull_rc = RC(ok=False, msg=f"no trusted source available for {image.source}:{tag}")
+    sources = select_image_sources(
+        image=image,
         tag=tag,
-        registry=image.source_registry,
-        username=src_creds.username,
-        password=src_creds.password,
-        output_dir=folder_name,
+        credentials=credentials,
+        expected_digest=digests.get(tag),
     )
-    if not rc.ok:
-        logging.error(rc.msg)
-        return rc
+    for registry, repo in sources:
+        logging.info(f"Pulling Docker image {registry}/{repo}:{tag}")
+        creds = credentials.get_image_creds(name=registry)
+        pull_rc = pull_container_image(
+            image_name=repo,
+            tag=tag,
+            registry=registry,
+            username=creds.username,
+            password=creds.password,
+            output_dir=folder_name,
+        )
+        if pull_rc.ok:
+            break
+        logging.error(pull_rc.msg)
+        cleanup_directory(folder_name)
+        if len(sources) > 1:
+            record_source_failure(mirror_location(image, registry, repo))
+    if not pull_rc.ok:
+        _fail_all(pull_rc.msg)
+        return
+
+    # target -> tags of this group missing in that target
+    target_tags: dict[str, list[str]] = {}
+    for t in tags:
+        for target in pending[t]:
+            target_tags.setdefault(target, []).append(t)
+    target_images = {i.target: i for i in image.target_images}
+
+    with ThreadPoolExecutor(max_workers=len(target_tags)) as pool:
+        futures = {
+            target: pool.submit(
+                _push_image_tags,
+                image=target_images[target],
+                tags=t_tags,
+                credentials=credentials,
+                src_image_dir=folder_name,
+            )
+            for target, t_tags in target_tags.items()
+        }
+    for target, future in futures.items():
+        for t, sync_rc in zip(target_tags[target], future.result(), strict=True):
+            _rc = pending[t][target]
+            if not sync_rc.ok:
+                _rc.msg = sync_rc.msg
+            else:
+                _rc.msg = f"synced tag: {image.source}:{t} -> {target}"
+            logging.debug(f"sync finished [{sync_rc.ok!s}]: {sync_rc.msg}")
+            _rc.ok = sync_rc.ok
+
+    cleanup_directory(folder_name)
+
+
+def _push_image_tags(
+    image: Image, tags: list[str], credentials: Creds, src_image_dir: str
+) -> list[RC]:
+    """Pushes an already pulled image to the target registry under one or more tags.
+
+    The image data is uploaded with the first tag. All other tags point at the same
+    manifest, so they are created by pushing the manifest again under their name,
+    without transferring any blob a second time. The pulled data is left in place so
+    it can be pushed to further targets.
+
+    Args:
+        image (Image): A single-target view of the image, providing the target
+            registry and repository.
+        tags (list[str]): The tags to push, all resolving to the same digest.
+        credentials (Creds): Handles authentication for accessing the target
+            container registry.
+        src_image_dir (str): The directory containing the pulled image.
+
+    Returns:
+        list[RC]: One result per given tag, in the same order, containing information
+            about success or failure, an accompanying message, and the manifest digest.
+    """
+    tgt_creds = credentials.get_image_creds(name=image.target_registry)
+    tag, aliases = tags[0], tags[1:]
+
     logging.info(f"Pushing Docker image {image.target}:{tag}")
     rc = push_container_image(
-        src_image_dir=folder_name,
+        src_image_dir=src_image_dir,
         tgt_registry=image.target_registry,
         tgt_image_name=image.target_repo,
         tgt_image_tag=tag,
         username=tgt_creds.username,
         password=tgt_creds.password,
+        cleanup_src_image_dir=False,
     )
-    if rc.ok:
-        logging.info(f"sync done: {image.target}:{tag}")
-    return rc
+    if not rc.ok:
+        return [rc for _ in tags]
+    logging.info(f"sync done: {image.target}:{tag}")
+
+    rcs = [rc]
+    for alias in aliases:
+        logging.info(f"Pushing manifest for Docker image {image.target}:{alias}")
+        alias_rc = push_container_manifest(
+            src_image_dir=src_image_dir,
+            tgt_registry=image.target_registry,
+            tgt_image_name=image.target_repo,
+            tgt_image_tag=alias,
+            username=tgt_creds.username,
+            password=tgt_creds.password,
+            cleanup_src_image_dir=False,
+        )
+        if alias_rc.ok:
+            logging.info(f"sync done: {image.target}:{alias}")
+        rcs.append(alias_rc)
+    return rcs
@@ -1,8 +1,8 @@
-from http import HTTPStatus
-
 import requests
 from requests import RequestException
 
+from .capabilities import get_host_capabilities
+
 
 def parse_docker_image(image_str: str) -> tuple[str, str, str]:
     """Parses a Docker image string into (registry, image, tag).
@@ -43,10 +43,9 @@ def get_registry_token(
 ) -> str:
     """Gets a registry token for Docker image authentication.
 
-    This function triggers an authentication process with a Docker registry
-    to retrieve an authentication token required for accessing the registry.
-    It handles the WWW-Authenticate header challenge in a 401 unauthorized
-    response and fetches a token from the specified auth endpoint.
+    This function looks up the capability record of the registry, which holds the
+    authentication challenge of its `/v2/` ping (see `get_host_capabilities`), and
+    fetches a token scoped to pull the given image from the bearer realm.
 
     Parameters:
         image: str
@@ -57,46 +56,30 @@ def get_registry_token(
             The password for the Docker registry. Default is None for no authentication.
 
     Returns:
-        str: The authentication token required to access the registry.
+        str: The authentication token required to access the registry, or an empty
+            string if the registry can be accessed without authentication.
 
     Raises:
-        Exception: If the initial request to trigger the authentication process
-        does not return a 401 status code, or if an unsupported authentication
-        scheme is encountered in the response, or if token fetching fails.
+        Exception: If the registry does not answer the `/v2/` ping,
+        or if an unsupported authentication scheme is encountered in the response,
+        or if token fetching fails.
     """
-    parsed_image = parse_docker_image(image_str=image)
+    registry, repository, _ = parse_docker_image(image_str=image)
 
-    # Step 1: Trigger 401 to get the auth challenge
-    test_url = f"https://{parsed_image[0]}/v2/{parsed_image[1]}/manifests/{parsed_image[2]}"
-    headers = {
-        "Accept": (
-            "application/vnd.docker.distribution.manifest.v2+json,"
-            "application/vnd.oci.image.index.v1+json,"
-            "application/vnd.oci.image.manifest.v1+json"
-        )
-    }
-    response = requests.get(test_url, headers=headers, timeout=5)
-    if response.status_code == HTTPStatus.OK:
+    caps = get_host_capabilities(registry)
+    if not caps.oci:
+        raise RequestException(f"Registry did not answer the /v2/ ping: {registry}")
+    if caps.anonymous_pull:
         return ""
-    if response.status_code != HTTPStatus.UNAUTHORIZED:
-        raise RequestException(
-            f"Expected 401 response, got {response.status_code}: {response.text}"
-        )
-
-    www_auth = response.headers.get("WWW-Authenticate", "")
-    if not www_auth.startswith("Bearer"):
-        raise RequestException(f"Unsupported authentication scheme: {www_auth}")
-
-    # Step 2: Parse auth challenge
-    parts = dict(kv.strip().split("=") for kv in www_auth.replace("Bearer ", "").split(","))
-    realm = parts["realm"].strip('"')
-    service = parts["service"].strip('"')
-    scope = parts["scope"].strip('"')
+    if "bearer" not in caps.auth_schemes or not caps.realm:
+        raise RequestException(f"Unsupported authentication scheme: {caps.auth_schemes}")
 
-    # Step 3: Fetch the token
-    params = {"service": service, "scope": scope}
+    # Fetch the token
+    params = {"scope": f"repository:{repository}:pull"}
+    if caps.service:
+        params["service"] = caps.service
     auth = (username, password) if username and password else None
-    token_response = requests.get(realm, params=params, auth=auth, timeout=5)
+    token_response = requests.get(caps.realm, params=params, auth=auth, timeout=5)
     token_response.raise_for_status()
 
     return token_response.json()["token"]
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+
+from ..models.creds.creds import Creds
+from ..models.resources.image import Image
+from .pull import authenticate_with_registry, fetch_manifest, get_image_digests
+
+# bytes of a blob downloaded to measure the throughput of a mirror
+SAMPLE_SIZE = 256 * 1024
+
+# failed pulls after which a location still answering its ping is excluded
+FAILURE_LIMIT = 3
+
+# ranking of source locations, cached for the whole run
+_rankings: dict[tuple[str, ...], list[str]] = {}
+# locations that failed during this run and are not used anymore
+_unhealthy: set[str] = set()
+# failed pulls per location during this run
+_failures: dict[str, int] = {}
+_lock = threading.Lock()
+
+
+@dataclass
+class MirrorProbe:
+    """Holds the measurements of a single source registry.
+
+    Attributes:
+        registry: The hostname of the registry.
+        healthy: Whether the registry answered the `/v2/` ping.
+        latency: Seconds it took to answer the `/v2/` ping.
+        throughput: Bytes per second measured while sampling a blob.
+    """
+
+    registry: str
+    healthy: bool = False
+    latency: float = float("inf")
+    throughput: float = 0.0
+
+
+def probe_registry(
+    registry: str, repo: str, tag: str, username: str | None, password: str | None
+) -> MirrorProbe:
+    """Measures the latency and throughput of a source registry.
+
+    The latency is taken from a `GET /v2/` ping; any registry answering with 200 or 401
+    is considered healthy. The throughput is sampled by downloading the first
+    `SAMPLE_SIZE` bytes of the first layer of the given image.
+
+    Args:
+        registry (str): The hostname of the registry.
+        repo (str): The repository of the image to sample, eg. "library/ubuntu".
+        tag (str): The tag of the image to sample.
+        username (Optional[str]): The username for registry authentication.
+        password (Optional[str]): The password for registry authentication.
+
+    Returns:
+        MirrorProbe: The measurements of the registry.
+    """
+    probe = MirrorProbe(registry=registry)
+    probe.healthy, probe.latency = _ping(registry)
+    if not probe.healthy:
+        return probe
+
+    try:
+        headers = authenticate_with_registry(registry, repo, username, password)
+        manifest = fetch_manifest(f"https://{registry}/v2/{repo}/manifests/{tag}", headers)
+        if "manifests" in manifest:
+            digest = manifest["manifests"][0]["digest"]
+            manifest = fetch_manifest(f"https://{registry}/v2/{repo}/manifests/{digest}", headers)
+        blob = (manifest.get("layers") or [manifest["config"]])[0]["digest"]
+
+        start = time.monotonic()
+        received = 0
+        with requests.get(
+            f"https://{registry}/v2/{repo}/blobs/{blob}",
+            headers={**headers, "Range": f"bytes=0-{SAMPLE_SIZE - 1}"},
+            stream=True,
+            timeout=5,
+        ) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=8192):
+                received += len(chunk)
+                if received >= SAMPLE_SIZE:
+                    break
+        probe.throughput = received / max(time.monotonic() - start, 1e-6)
+    except (requests.exceptions.RequestException, KeyError, IndexError, ValueError) as e:
+        logging.debug(f"mirror throughput sample failed for {registry}: {e}")
+    logging.debug(f"mirror probe: {probe!s}")
+    return probe
+
+
+def mirror_location(image: Image, registry: str, repo: str) -> str:
+    """Gets the location of a source of an image, its registry and path prefix.
+
+    Args:
+        image (Image): The image the source belongs to.
+        registry (str): The registry of the source, see `Image.source_locations`.
+        repo (str): The repository of the image in that registry.
+
+    Returns:
+        str: The location, eg. "harbor.example.com/dockerhub-proxy".
+    """
+    prefix = repo.removesuffix(image.source_repo).strip("/")
+    return f"{registry}/{prefix}" if prefix else registry
+
+
+def record_source_failure(location: str):
+    """Records a failed pull from a source location.
+
+    The registry of the location is pinged again; if it does not answer, or the
+    location failed `FAILURE_LIMIT` times, it is excluded from being pulled from for
+    the rest of the run.
+
+    Args:
+        location (str): The location that failed, see `mirror_location`.
+    """
+    healthy, _ = _ping(location.partition("/")[0])
+    with _lock:
+        _failures[location] = _failures.get(location, 0) + 1
+        if healthy and _failures[location] < FAILURE_LIMIT:
+            return
+        _unhealthy.add(location)
+    logging.warning(f"excluding source location for this run: {location}")
+
+
+def select_image_sources(
+    image: Image, tag: str, credentials: Creds, expected_digest: str | None = None
+) -> list[tuple[str, str]]:
+    """Returns the locations to pull a tag of an image from, the preferred one first.
+
+    Without mirrors the image source is returned as is. Otherwise all locations are
+    probed once per run and ranked by throughput and latency. A location is only
+    trusted if its manifest digest of the tag matches `expected_digest`, or, if that is
+    unknown, the digest served by the first location answering in configured order.
+    Locations are identified by registry and path prefix (see `mirror_location`), and
+    those excluded during the run (see `record_source_failure`) are skipped.
+
+    Args:
+        image (Image): The image, including its source and mirrors.
+        tag (str): The tag to pull.
+        credentials (Creds): The credentials object providing registry login details.
+        expected_digest (Optional[str]): The manifest digest of the tag in the source.
+
+    Returns:
+        list[tuple[str, str]]: The trusted (registry, repository) locations, ranked.
+    """
+    locations = image.source_locations
+    if len(locations) == 1:
+        return locations
+
+    by_location = {mirror_location(image, *loc): loc for loc in locations}
+    key = tuple(by_location)
+    if key not in _rankings:
+        probes = {}
+        for location, (registry, repo) in by_location.items():
+            creds = credentials.get_image_creds(name=registry)
+            probes[location] = probe_registry(registry, repo, tag, creds.username, creds.password)
+        healthy = [location for location, p in probes.items() if p.healthy]
+        healthy.sort(key=lambda loc: (-probes[loc].throughput, probes[loc].latency))
+        _rankings[key] = healthy
+        logging.info(f"source ranking for {image.source}: {', '.join(_rankings[key])}")
+
+    digests = {}
+    for location, (registry, repo) in by_location.items():
+        if location in _unhealthy or location not in _rankings[key]:
+            continue
+        creds = credentials.get_image_creds(name=registry)
+        resolved = get_image_digests(repo, [tag], registry, creds.username, creds.password)
+        digests[location] = resolved.get(tag, "")
+
+    reference = expected_digest or next((d for d in digests.values() if d), None)
+    trusted = []
+    for location in _rankings[key]:
+        if location not in digests:
+            continue
+        if digests[location] and digests[location] == reference:
+            trusted.append(by_location[location])
+        else:
+            logging.warning(f"untrusted mirror for {image.source}:{tag}: {location}")
+    return trusted
+
+
+def _ping(registry: str) -> tuple[bool, float]:
+    """Pings a registry, returning whether it answered and the latency in seconds."""
+    try:
+        start = time.monotonic()
+        response = requests.get(f"https://{registry}/v2/", timeout=5)
+    except requests.exceptions.RequestException as e:
+        logging.debug(f"mirror ping failed for {registry}: {e}")
+        return False, float("inf")
+    return response.status_code in [200, 401], time.monotonic() - start
@@ -11,7 +11,7 @@ import requests
 from ..models.rc import RC
 
 
-def _cleanup_directory(src_image_dir):
+def cleanup_directory(src_image_dir):
     """Cleans up the contents of the specified directory by removing all files and
     subdirectories.
 
@@ -258,6 +258,54 @@ def push_container_image(
 
     # Step 6: Clean up directory (optional)
     if cleanup_src_image_dir:
-        _cleanup_directory(src_image_dir)
+        cleanup_directory(src_image_dir)
+
+    return RC(ok=True, ref=manifest_digest)
+
+
+def push_container_manifest(
+    src_image_dir: str,
+    tgt_image_name: str,
+    tgt_image_tag: str,
+    tgt_registry: str = "registry-1.docker.io",
+    username: str | None = None,
+    password: str | None = None,
+    cleanup_src_image_dir: bool = True,
+) -> RC:
+    """Pushes only the manifest of an already uploaded image under an additional tag.
+
+    This is used for tags that resolve to the same source digest as a tag that has just
+    been pushed with `push_container_image`: all blobs are present in the target
+    repository already, so a single manifest PUT is enough to create the tag.
+
+    Args:
+        src_image_dir (str): The directory containing the pulled `manifest.json`.
+        tgt_image_name (str): The target image repository name in the registry.
+        tgt_image_tag (str): The additional tag to assign to the image.
+        tgt_registry (str, optional): The URL of the target container registry.
+            Defaults to "registry-1.docker.io".
+        username (Optional[str], optional): The username for authentication.
+        password (Optional[str], optional): The password for authentication.
+        cleanup_src_image_dir (bool, optional): Whether to delete the source image
+            directory after a successful push. Defaults to True.
+
+    Returns:
+        RC: An object containing the status of the operation. On success the `ref`
+            attribute holds the manifest digest.
+    """
+    base_url = f"https://{tgt_registry}/v2/{tgt_image_name}"
+    headers = _generate_auth_headers(username, password) or {}
+
+    try:
+        with open(os.path.join(src_image_dir, "manifest.json"), encoding="utf-8") as f:
+            manifest_json = json.load(f)
+        manifest_digest = _push_manifest(manifest_json, tgt_image_tag, base_url, headers)
+    except Exception as e:
+        msg = f"Error uploading manifest for: {tgt_image_name}:{tgt_image_tag}"
+        logging.exception(msg)
+        return RC(ok=False, entity=e, msg=msg)
+
+    if cleanup_src_image_dir:
+        cleanup_directory(src_image_dir)
 
     return RC(ok=True, ref=manifest_digest)
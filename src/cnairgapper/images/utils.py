@@ -110,3 +110,24 @@ def check_image_tag_exists(
         msg = str(e)
         logging.exception(msg)
         return RC(ok=False, msg=msg, err=True)
+
+
+def group_tags_by_digest(tags: list[str], digests: dict[str, str]) -> list[list[str]]:
+    """Groups tags that resolve to the same source manifest digest.
+
+    The order of the given tags is preserved, both for the groups and within each group,
+    so the first tag of a group is the first one configured. Tags without a known digest
+    end up in a group of their own.
+
+    Args:
+        tags (list[str]): The tags to group.
+        digests (dict[str, str]): A mapping of tag to resolved manifest digest.
+
+    Returns:
+        list[list[str]]: The tag groups, each sharing one manifest digest.
+    """
+    groups: dict[str, list[str]] = {}
+    for tag in tags:
+        key = digests.get(tag) or f"tag:{tag}"
+        groups.setdefault(key, []).append(tag)
+    return list(groups.values())
@@ -2,11 +2,14 @@ import logging
 import os
 import sys
 
+from .cli.cache import set_cache_dir
+from .cli.capabilities import set_capability_ttl
 from .cli.parser import create_parser, validate_arguments
 from .cli.sync import sync
 from .config.load_config import load_config_file, load_config_folder
 from .credentials.load_creds import load_credentials_file, load_credentials_folder
 from .models.rc import print_rc
+from .repositories.mirror import set_mirror_budget
 
 
 def print_version():
@@ -61,6 +64,10 @@ def main():
         sys.exit(1)
 
     setup_logging(args.debug)
+    set_cache_dir(args.cache_dir)
+    set_capability_ttl(args.capability_ttl)
+    set_mirror_budget(args.git_mirror_budget * 1024**3)
+
     if args.credentials_file:
         creds_file = load_credentials_file(args.credentials_file)
     else:
@@ -72,7 +79,14 @@ def main():
         config_file = load_config_folder(args.config_folder)
 
     try:
-        rc = sync(config_file=config_file, creds_file=creds_file)
+        rc = sync(
+            config_file=config_file,
+            creds_file=creds_file,
+            workers=args.workers,
+            git_workers=args.git_workers,
+            git_bundle_export=args.git_bundle_export,
+            git_bundle_import=args.git_bundle_import,
+        )
         print_rc(rc)
         if not rc.ok:
             sys.exit(1)
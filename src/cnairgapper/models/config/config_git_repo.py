@@ -21,6 +21,7 @@ class ConfigGitRepo(BaseModel):
             changes (e.g., "push", "skip", or "force").
         refs (list[str]): A list of references (e.g., branches or tags) to operate on.
             The list can include multiple references.
+        lfs (bool): Whether the LFS objects of the references are synced as well.
     """
 
     type: str = Field("git", min_length=1, description="Object of type 'git'")
@@ -42,3 +43,7 @@ class ConfigGitRepo(BaseModel):
         default_factory=list,
         description="List of references to sync (e.g., branches or tags)",
     )
+    lfs: bool = Field(
+        False,
+        description="Sync the Git LFS objects reachable from the synced references",
+    )
@@ -2,6 +2,8 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from .config_helm_chart_target import ConfigHelmChartTarget
+
 
 class ConfigHelmChart(BaseModel):
     """Represents the configuration parameters required for a Helm chart.
@@ -20,9 +22,15 @@ class ConfigHelmChart(BaseModel):
         target_registry (str): Target registry of the Helm chart, which can be
             OCI or legacy registry.
         target_repo (str): Target repository of the Helm chart.
-        versions (list[str]): List of Helm chart versions to synchronize.
+        additional_targets (list[ConfigHelmChartTarget]): Further targets receiving
+            the same chart versions. The chart is pulled from the source only once.
+        versions (list[str]): List of Helm chart versions or version selectors to synchronize.
         push_mode (Literal["skip", "overwrite"]): Specifies the synchronization
             mode. Can either skip or overwrite if the target version already exists.
+        images_target (str | None): Registry, with an optional path, to mirror the
+            container images referenced by the chart to. Enables image discovery.
+        include_dependencies (bool): Whether the subcharts the chart depends on are
+            mirrored to the targets of the chart as well.
     """
 
     type: str = Field("helm", min_length=1, description="Object of type 'helm'")
@@ -48,12 +56,33 @@ class ConfigHelmChart(BaseModel):
         description="Target registry of the Helm chart, OCI or legacy.",
     )
     target_repo: str = Field(..., min_length=1, description="Target repository of the Helm chart.")
-    target_repo_type: Literal["oci", "nexus"] = Field(
-        "oci", min_length=1, description="Target repository type."
+    target_repo_type: Literal["oci", "nexus", "static"] = Field(
+        "oci",
+        min_length=1,
+        description="Target repository type, static writes into a folder served as Helm repo.",
+    )
+    additional_targets: list[ConfigHelmChartTarget] = Field(
+        default_factory=list,
+        description="Further targets to push the chart to, pulled from the source only once.",
     )
     versions: list[str] = Field(
-        default_factory=list, description="List of Helm chart versions to sync."
+        default_factory=list,
+        description="""
+            List of Helm chart versions to sync, exact versions or selectors:
+            latest:N, latest-minor:N, range constraints (>=15.0.0 <16) or regex.
+        """,
     )
     push_mode: Literal["skip", "overwrite"] = Field(
         "skip", description="skip or overwrite if target version already exists"
     )
+    images_target: str | None = Field(
+        None,
+        description="""
+            Registry/path to mirror the images referenced by the chart to, enables discovery.
+            eg. registry.lab.cloudstacks.eu/mirror
+        """,
+    )
+    include_dependencies: bool = Field(
+        False,
+        description="Also mirror the subcharts listed in the dependencies of Chart.yaml.",
+    )
@@ -0,0 +1,29 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class ConfigHelmChartTarget(BaseModel):
+    """Represents an additional target a Helm chart is synchronized to.
+
+    A Helm chart entry always has one primary target, defined by its own
+    `target_registry`, `target_repo` and `target_repo_type` fields. Every additional
+    target receives the same chart versions, pulled from the source only once.
+
+    Attributes:
+        target_registry (str): Target registry of the Helm chart, OCI or legacy.
+        target_repo (str): Target repository of the Helm chart.
+        target_repo_type (Literal["oci", "nexus", "static"]): Target repository type.
+    """
+
+    target_registry: str = Field(
+        ...,
+        min_length=1,
+        description="Target registry of the Helm chart, OCI or legacy.",
+    )
+    target_repo: str = Field(..., min_length=1, description="Target repository of the Helm chart.")
+    target_repo_type: Literal["oci", "nexus", "static"] = Field(
+        "oci",
+        min_length=1,
+        description="Target repository type, static writes into a folder served as Helm repo.",
+    )
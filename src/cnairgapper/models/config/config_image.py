@@ -15,6 +15,11 @@ class ConfigImage(BaseModel):
         source: Source image fully qualified name, without the tag. For example:
             `registry.lab.cloudstacks.eu/base-images/maven-graal`.
         target: Target image fully qualified name, without the tag.
+        additional_targets: Further target images, fully qualified and without tag.
+            The image is pulled from the source only once for all targets.
+        mirrors: Alternative registries serving the source image, optionally with a
+            path prefix, eg. `mirror.gcr.io` or `harbor.example.com/dockerhub-proxy`.
+            The fastest healthy mirror serving the same digest is pulled from.
         scan: Optional name of the scanner to use for this image.
         tags: List of tags to synchronize for this image.
     """
@@ -31,6 +36,17 @@ class ConfigImage(BaseModel):
     target: str = Field(
         ..., min_length=1, description="Target image fully qualified name, without tag."
     )
+    additional_targets: list[str] = Field(
+        default_factory=list,
+        description="Further target images fully qualified name, without tag.",
+    )
+    mirrors: list[str] = Field(
+        default_factory=list,
+        description="""
+            Alternative registries serving the source image, optionally with path prefix.
+            eg.: mirror.gcr.io, harbor.example.com/dockerhub-proxy
+        """,
+    )
     push_mode: Literal["skip", "force"] = Field(
         "force",
         description="force, try to force push if target ref already exists or skip",
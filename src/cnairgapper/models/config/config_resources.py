@@ -4,6 +4,7 @@ from ..resources.git import GitRepo
 from ..resources.image import Image
 from .config_git_repo import ConfigGitRepo
 from .config_helm_chart import ConfigHelmChart
+from .config_helm_chart_target import ConfigHelmChartTarget
 from .config_image import ConfigImage
 
 
@@ -13,7 +14,9 @@ class SyncResources:
     This class is designed to handle the synchronization of various resource
     types, including Helm charts, container images, and Git repositories.
     It provides methods to add these resources, while preventing duplicates
-    using overlap checks based on predefined rules.
+    using overlap checks based on predefined rules. Image and Helm chart entries
+    that only differ in their target are merged into one entry with multiple
+    targets, so the source is pulled only once.
 
     Attributes:
         images (List[Image]): A list of Image objects representing the container
@@ -49,14 +52,20 @@ class SyncResources:
 
     def add_helm(self, chart: ConfigHelmChart):
         """Adds a new helm chart configuration."""
-        if self.__has_overlap(chart):
+        if self.__merge_targets(chart):
+            logging.info(
+                f"adding targets to helm chart: {chart.source_registry}/{chart.source_chart}"
+            )
+        elif self.__has_overlap(chart):
             logging.warning(f"duplicate helm chart? {chart.source_registry}/{chart.source_chart}")
         else:
             self.charts.append(chart)
 
     def add_image(self, image: ConfigImage):
         """Adds a new image configuration."""
-        if self.__has_overlap(image):
+        if self.__merge_targets(image):
+            logging.info(f"adding targets to image: {image.source}")
+        elif self.__has_overlap(image):
             logging.warning(f"duplicate image? {image.source}")
         else:
             self.images.append(Image(image))
@@ -68,6 +77,59 @@ class SyncResources:
         else:
             self.repos.append(GitRepo(repo))
 
+    def __merge_targets(self, resource: ConfigHelmChart | ConfigImage) -> bool:
+        """Merges the targets of the given resource into an already stored resource
+        which syncs the same source with identical settings and only differs in its
+        targets.
+
+        Args:
+            resource (Union[ConfigHelmChart, ConfigImage]): The resource whose targets
+                should be merged into an existing resource.
+
+        Returns:
+            bool: True if the targets were merged into an existing resource, False if
+                there is no matching resource.
+        """
+        match resource:
+            case ConfigHelmChart():
+                existing = next(
+                    (
+                        e
+                        for e in self.charts
+                        if e.source_chart == resource.source_chart
+                        and e.source_registry == resource.source_registry
+                        and e.versions == resource.versions
+                        and e.push_mode == resource.push_mode
+                    ),
+                    None,
+                )
+                if existing is None:
+                    return False
+                for target in [_chart_target(resource), *resource.additional_targets]:
+                    if target not in [_chart_target(existing), *existing.additional_targets]:
+                        existing.additional_targets.append(target)
+                return True
+            case ConfigImage():
+                existing = next(
+                    (
+                        e
+                        for e in self.images
+                        if e.source == resource.source
+                        and e.tags == resource.tags
+                        and e.scan == resource.scan
+                        and e.push_mode == resource.push_mode
+                    ),
+                    None,
+                )
+                if existing is None:
+                    return False
+                for target in [resource.target, *resource.additional_targets]:
+                    if target not in existing.targets:
+                        existing.additional_targets.append(target)
+                return True
+            case _:
+                return False
+
     def __has_overlap(self, resource: ConfigHelmChart | ConfigImage | ConfigGitRepo):
         """Determines if there is an overlap between the given resource and the existing
         resources in the current object. Compares the resource's source properties
@@ -98,3 +160,12 @@ class SyncResources:
                 return any(existing.source_repo == resource.source_repo for existing in self.repos)
             case _:
                 raise ValueError(f"Unknown resource type: {type(resource)}")
+
+
+def _chart_target(chart: ConfigHelmChart) -> ConfigHelmChartTarget:
+    """Get the primary target of a helm chart configuration."""
+    return ConfigHelmChartTarget(
+        target_registry=chart.target_registry,
+        target_repo=chart.target_repo,
+        target_repo_type=chart.target_repo_type,
+    )
@@ -17,6 +17,7 @@ class GitRepo:
         target_repo (str): The URL of the target repository.
         push_mode (str): The push mode defined for the repository.
         refs (Any): The references used in the repository.
+        lfs (bool): Whether the LFS objects of the references are synced.
     """
 
     def __init__(self, config_repo: ConfigGitRepo):
@@ -25,6 +26,7 @@ class GitRepo:
         self.target_repo = config_repo.target_repo
         self.push_mode = config_repo.push_mode
         self.refs = config_repo.refs
+        self.lfs = config_repo.lfs
 
     @property
     def source_repo_host(self) -> str:
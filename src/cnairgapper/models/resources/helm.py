@@ -1,3 +1,6 @@
+import copy
+from typing import Self
+
 from ..config.config_helm_chart import ConfigHelmChart
 
 
@@ -13,8 +16,10 @@ class HelmChart:
         source_registry: Registry for the source Helm Chart.
         target_repo: Repository where the Helm Chart will be stored.
         target_registry: Target registry for the Helm Chart.
+        additional_targets: Further targets for the Helm Chart.
         version: Version of the Helm Chart.
         push_mode: Mode used to push the Helm Chart (e.g., overwrite, append).
+        images_target: Registry path the images referenced by the chart are mirrored to.
     """
 
     def __init__(self, config_chart: ConfigHelmChart, version: str):
@@ -23,8 +28,10 @@ class HelmChart:
         self.target_repo = config_chart.target_repo
         self.target_repo_type = config_chart.target_repo_type
         self.target_registry = config_chart.target_registry
+        self.additional_targets = list(config_chart.additional_targets)
         self.version = version
         self.push_mode = config_chart.push_mode
+        self.images_target = config_chart.images_target
 
     @property
     def chart_name(self):
@@ -32,3 +39,22 @@ class HelmChart:
         if "/" in self.source:
             return self.source.split("/")[-1]
         return self.source
+
+    @property
+    def target_charts(self) -> list[Self]:
+        """Get one single-target view of this chart per target, the primary one first."""
+        views = [copy.copy(self)]
+        for target in self.additional_targets:
+            view = copy.copy(self)
+            view.target_registry = target.target_registry
+            view.target_repo = target.target_repo
+            view.target_repo_type = target.target_repo_type
+            views.append(view)
+        for view in views:
+            view.additional_targets = []
+        return views
+
+    @property
+    def target_ref(self) -> str:
+        """Get a printable reference of the (primary) target."""
+        return f"{self.target_registry}/{self.target_repo}"
@@ -1,3 +1,6 @@
+import copy
+from typing import Self
+
 from ..config.config_image import ConfigImage
 
 
@@ -12,6 +15,9 @@ class Image:
     Attributes:
         source (str): The source image name.
         target (str): The target image name.
+        additional_targets (list[str]): Further target image names.
+        mirrors (list[str]): Alternative registries (with optional path prefix) serving
+            the source image.
         scan (bool): A flag indicating whether scanning is enabled for the image.
         tags (list[str]): A list of tags associated with the image.
 
@@ -22,6 +28,10 @@ class Image:
         target_repo (str): Retrieves the repository of the target image.
         source_name (str): Retrieves the name and tag of the source image.
         target_name (str): Retrieves the name and tag of the target image.
+        targets (list[str]): Retrieves all target image names.
+        source_locations (list[tuple[str, str]]): Retrieves registry and repository of
+            the source image and of each of its mirrors.
+        target_images (list[Image]): Retrieves one single-target view per target image.
 
     Static Methods:
         __parse_image_name (tuple[str, str, str]): Parses a given image name string into its
@@ -31,6 +41,8 @@ class Image:
     def __init__(self, config_image: ConfigImage):
         self.source = config_image.source
         self.target = config_image.target
+        self.additional_targets = list(config_image.additional_targets)
+        self.mirrors = config_image.mirrors
         self.scan = config_image.scan
         self.tags = config_image.tags
         self.push_mode = config_image.push_mode
@@ -65,6 +77,33 @@ class Image:
         """Get target chart name."""
         return self.__parse_image_name(self.target)[2]
 
+    @property
+    def targets(self) -> list[str]:
+        """Get all target images, the primary one first."""
+        return [self.target, *(t for t in self.additional_targets if t != self.target)]
+
+    @property
+    def target_images(self) -> list[Self]:
+        """Get one single-target view of this image per target."""
+        views = []
+        for target in self.targets:
+            view = copy.copy(self)
+            view.target = target
+            view.additional_targets = []
+            views.append(view)
+        return views
+
+    @property
+    def source_locations(self) -> list[tuple[str, str]]:
+        """Get (registry, repository) of the source image, followed by its mirrors."""
+        locations = [(self.source_registry, self.source_repo)]
+        for mirror in self.mirrors:
+            registry, _, prefix = mirror.strip("/").partition("/")
+            repo = f"{prefix}/{self.source_repo}" if prefix else self.source_repo
+            if (registry, repo) not in locations:
+                locations.append((registry, repo))
+        return locations
+
     @staticmethod
     def __parse_image_name(image_name: str):
         """Parses a given Docker image name into its components: registry, repository, and tag.
@@ -93,8 +132,9 @@ class Image:
         default_tag = "latest"
 
         # Determine the registry and the remaining part of the image name
-        if "/" in image_name and "." in image_name.split("/")[0]:
-            # registry.some/some/ubuntu:asdf
+        first = image_name.split("/")[0]
+        if "/" in image_name and ("." in first or ":" in first or first == "localhost"):
+            # registry.some/some/ubuntu:asdf, localhost:5000/ubuntu:asdf
             # Explicitly provided registry
             registry, rest = image_name.split("/", 1)
         elif "/" in image_name:
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import logging
+import os
+
+import git
+from git import GitCommandError
+
+from .utils import has_commit
+
+STATE_FILE = "bundle-state.json"
+
+
+def bundle_key(source_repo: str, target_repo: str) -> str:
+    """Gets the key of the bundles and the baseline of a repository sync.
+
+    The key is derived from the URLs of the source and the target repository, so the
+    export and the import side agree on it without credentials appearing in it, and
+    config entries sharing a source but not a target never share bundles.
+
+    Args:
+        source_repo (str): The URL of the source repository, without credentials.
+        target_repo (str): The URL of the target repository, without credentials.
+
+    Returns:
+        str: The key.
+    """
+    return hashlib.sha256(f"{source_repo}\n{target_repo}".encode()).hexdigest()[:32]
+
+
+def bundle_path(bundle_dir: str, key: str, sequence: int) -> str:
+    """Gets the path of a numbered bundle in a transfer folder.
+
+    The bundle `<key>-<sequence>.bundle` is accompanied by its manifest
+    `<key>-<sequence>.json` (see `write_bundle_manifest`). Every export adds the next
+    number; bundles are never replaced, as they may not have been imported yet.
+
+    Args:
+        bundle_dir (str): The transfer folder.
+        key (str): The key of the repository sync (see `bundle_key`).
+        sequence (int): The number of the export.
+
+    Returns:
+        str: The path of the bundle file.
+    """
+    return os.path.join(bundle_dir, f"{key}-{sequence:06d}.bundle")
+
+
+def list_bundles(bundle_dir: str, key: str) -> list[str]:
+    """Lists the bundles of a repository sync in a transfer folder, oldest first.
+
+    Args:
+        bundle_dir (str): The transfer folder.
+        key (str): The key of the repository sync (see `bundle_key`).
+
+    Returns:
+        list[str]: The paths of the bundle files that have a manifest; the bundle
+        file itself may be missing if the export needed no new commits.
+    """
+    if not os.path.isdir(bundle_dir):
+        return []
+    return [
+        os.path.join(bundle_dir, f"{name.removesuffix('.json')}.bundle")
+        for name in sorted(os.listdir(bundle_dir))
+        if name.startswith(f"{key}-") and name.endswith(".json")
+    ]
+
+
+def load_bundle_state(bundle_dir: str) -> dict[str, dict]:
+    """Loads the baselines of the previous exports from the transfer folder.
+
+    Args:
+        bundle_dir (str): The transfer folder.
+
+    Returns:
+        dict[str, dict]: The last export by key (see `bundle_key`), with its `source`,
+        `target`, `sequence` and the exported commit SHA by full ref name as `refs`.
+        Empty if nothing has been exported yet.
+    """
+    path = os.path.join(bundle_dir, STATE_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_bundle_state(bundle_dir: str, state: dict[str, dict]) -> None:
+    """Writes the baselines of the exports to the transfer folder, atomically.
+
+    Args:
+        bundle_dir (str): The transfer folder.
+        state (dict[str, dict]): The last export by key (see `load_bundle_state`).
+    """
+    path = os.path.join(bundle_dir, STATE_FILE)
+    with open(f"{path}.part", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.part", path)
+
+
+def create_bundle(
+    repo: git.Repo, path: str, refs: dict[str, str], baseline: dict[str, str]
+) -> bool:
+    """Writes a bundle with the commits of references missing since a baseline.
+
+    The commits of the baseline become the prerequisites of the bundle, so it only
+    carries the delta. Baseline commits the repository does not have (e.g. rewritten
+    history that has been garbage collected) are left out, which makes the bundle
+    larger but keeps it applicable. References pointing at a commit the baseline
+    already contains are not part of the bundle, the manifest carries them.
+
+    Args:
+        repo (git.Repo): The repository holding the references, usually a mirror.
+        path (str): The path of the bundle file.
+        refs (dict[str, str]): The commit SHA by full ref name to export.
+        baseline (dict[str, str]): The commit SHA by full ref name of the previous export.
+
+    Returns:
+        bool: True if the bundle was written, False if the target already has every
+        commit and no bundle is needed.
+
+    Raises:
+        GitCommandError: If the bundle cannot be written.
+    """
+    prerequisites = []
+    for full_name, sha in sorted(baseline.items()):
+        if has_commit(repo, sha):
+            prerequisites.append(f"^{sha}")
+        else:
+            logging.warning(f"baseline of {full_name} not in repository, bundling its history")
+
+    try:
+        repo.git.bundle("create", path, *sorted(refs), *sorted(set(prerequisites)))
+    except GitCommandError as e:
+        if "empty bundle" in str(e.stderr):
+            return False
+        raise
+    return True
+
+
+def write_bundle_manifest(path: str, repo_url: str, refs: dict[str, str]) -> None:
+    """Writes the manifest of a bundle, the references to apply on import.
+
+    Args:
+        path (str): The path of the bundle file.
+        repo_url (str): The URL of the source repository.
+        refs (dict[str, str]): The commit SHA by full ref name.
+    """
+    with open(f"{path.removesuffix('.bundle')}.json", "w", encoding="utf-8") as f:
+        json.dump({"source": repo_url, "refs": refs}, f, indent=2, sort_keys=True)
+
+
+def read_bundle_manifest(path: str) -> dict[str, str] | None:
+    """Reads the manifest of a bundle.
+
+    Args:
+        path (str): The path of the bundle file.
+
+    Returns:
+        dict[str, str] | None: The commit SHA by full ref name, or None if nothing
+        was exported for the repository.
+    """
+    try:
+        with open(f"{path.removesuffix('.bundle')}.json", encoding="utf-8") as f:
+            return json.load(f)["refs"]
+    except FileNotFoundError:
+        return None
+
+
+def remove_bundle(path: str) -> None:
+    """Removes a bundle and its manifest, e.g. of a failed export.
+
+    Args:
+        path (str): The path of the bundle file.
+    """
+    for file_path in (path, f"{path.removesuffix('.bundle')}.json"):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def apply_bundles(repo: git.Repo, paths: list[str], refs: dict[str, str]) -> dict[str, str]:
+    """Applies bundles and their manifests to a repository, oldest first.
+
+    The prerequisites of every bundle are checked with `git bundle verify` first, so
+    a bundle built against a baseline the repository does not have, e.g. because an
+    earlier bundle is missing, is rejected as a whole. Bundles already applied to the
+    target pass the check and change nothing. Afterwards every reference of the
+    manifests is set to its commit.
+
+    Args:
+        repo (git.Repo): The repository to apply the bundles to, usually a mirror of
+            the target holding its current refs.
+        paths (list[str]): The paths of the bundle files in export order (see
+            `list_bundles`); missing files are skipped.
+        refs (dict[str, str]): The commit SHA by full ref name of the newest
+            manifests.
+
+    Returns:
+        dict[str, str]: An error message by full ref name for the references whose
+        commit is missing; the other references were applied.
+
+    Raises:
+        GitCommandError: If a bundle lacks prerequisites or cannot be read.
+    """
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        repo.git.bundle("verify", path)
+        heads = [line.split(" ", 1)[1] for line in repo.git.bundle("list-heads", path).splitlines()]
+        if heads:
+            repo.git.fetch(path, *(f"+{head}:{head}" for head in heads))
+
+    errors = {}
+    for full_name, sha in refs.items():
+        if has_commit(repo, sha):
+            repo.git.update_ref(full_name, sha)
+        else:
+            errors[full_name] = f"commit {sha} is neither in the bundles nor in the target"
+    return errors
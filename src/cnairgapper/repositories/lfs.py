@@ -0,0 +1,295 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import shlex
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import git
+import requests
+from git import GitCommandError
+from gitdb.util import hex_to_bin
+
+from ..cli.cache import get_cache_path
+from ..models.creds.creds_git_repo import CredsGitRepo
+from ..models.rc import RC
+from .ssh import ssh_command
+from .utils import has_commit
+
+LFS_DIR = "lfs-objects"
+DEFAULT_LFS_WORKERS = 4
+# objects per batch API request, the limit most LFS servers enforce
+BATCH_SIZE = 100
+BATCH_TIMEOUT = 30
+OBJECT_TIMEOUT = 300
+MEDIA_TYPE = "application/vnd.git-lfs+json"
+# pointer files are small text files, larger blobs are never inspected
+POINTER_MAX_SIZE = 1024
+
+_POINTER = re.compile(
+    rb"^version https://git-lfs\.github\.com/spec/v1\n"
+    rb"oid sha256:(?P<oid>[0-9a-f]{64})\nsize (?P<size>\d+)\n"
+)
+
+
+def find_lfs_objects(repo: git.Repo, refs: list[str], exclude: list[str]) -> dict[str, int]:
+    """Finds the LFS objects referenced by pointer files reachable from references.
+
+    Only blobs small enough to be pointer files are read, and history reachable from
+    `exclude`, e.g. the refs the target already has, is not walked.
+
+    Args:
+        repo (git.Repo): The repository holding the references, usually a mirror.
+        refs (list[str]): The full names of the references, e.g. `refs/heads/main`.
+        exclude (list[str]): Commit SHAs whose history is left out; SHAs unknown to
+            the repository are ignored.
+
+    Returns:
+        dict[str, int]: The size of every LFS object by its sha256 oid.
+
+    Raises:
+        GitCommandError: If the history cannot be walked.
+    """
+    excluded = [f"^{sha}" for sha in exclude if has_commit(repo, sha)]
+    output = repo.git.rev_list(
+        "--objects", f"--filter=blob:limit={POINTER_MAX_SIZE}", *refs, *excluded
+    )
+
+    objects = {}
+    for line in output.splitlines():
+        sha, _, path = line.partition(" ")
+        if not path:
+            continue  # commits and root trees
+        info = repo.odb.info(hex_to_bin(sha))
+        if info.type != b"blob":
+            continue
+        if match := _POINTER.match(repo.odb.stream(hex_to_bin(sha)).read()):
+            objects[match["oid"].decode()] = int(match["size"])
+    return objects
+
+
+def lfs_object_path(oid: str) -> str:
+    """Gets the path of an LFS object in the content-addressed object cache.
+
+    The cache is shared between repositories and runs; it lives in the cache folder,
+    or below `./tmp` for the current run if persistence is disabled.
+
+    Args:
+        oid (str): The sha256 oid of the object.
+
+    Returns:
+        str: The path of the object file.
+    """
+    parts = (LFS_DIR, oid[:2], oid[2:4], oid)
+    path = get_cache_path(*parts)
+    if path is None:
+        path = os.path.join("./tmp", *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def sync_lfs_objects(
+    repo: git.Repo,
+    refs: list[str],
+    exclude: list[str],
+    *,
+    source_url: str,
+    source_creds: CredsGitRepo,
+    target_url: str,
+    target_creds: CredsGitRepo,
+    workers: int = DEFAULT_LFS_WORKERS,
+) -> RC:
+    """Copies the LFS objects reachable from references to the LFS server of the target.
+
+    The objects are found with `find_lfs_objects`. The target is asked first, with
+    upload batch requests, which objects it is missing; objects it already has are
+    skipped. Missing objects not yet in the object cache (see `lfs_object_path`) are
+    downloaded from the source and verified against their oid, then uploaded. Batch
+    requests and transfers run concurrently in a pool of `workers`.
+
+    Args:
+        repo (git.Repo): The repository holding the references, usually a mirror.
+        refs (list[str]): The full names of the references to sync.
+        exclude (list[str]): Commit SHAs the target already has.
+        source_url (str): The URL of the source repository.
+        source_creds (CredsGitRepo): The credentials of the source repository.
+        target_url (str): The URL of the target repository.
+        target_creds (CredsGitRepo): The credentials of the target repository.
+        workers (int, optional): The number of concurrent requests. Defaults to
+            `DEFAULT_LFS_WORKERS`.
+
+    Returns:
+        RC: The result, failed if an object could not be copied.
+    """
+    try:
+        objects = find_lfs_objects(repo, refs, exclude)
+        if not objects:
+            return RC(ok=True, msg="no LFS objects")
+        logging.info(f"found {len(objects)} LFS objects: {source_url}")
+
+        items = list(objects.items())
+        chunks = [items[i : i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            upload_href, upload_headers = lfs_endpoint(target_url, "upload", target_creds)
+            uploads = {
+                entry["oid"]: entry
+                for batch in pool.map(
+                    lambda chunk: _batch(upload_href, upload_headers, "upload", chunk), chunks
+                )
+                for entry in batch
+                if entry.get("actions", {}).get("upload")
+            }
+            logging.info(f"{len(objects) - len(uploads)} LFS objects already in target")
+
+            missing = [
+                (oid, objects[oid]) for oid in uploads if not os.path.exists(lfs_object_path(oid))
+            ]
+            if missing:
+                download_href, download_headers = lfs_endpoint(source_url, "download", source_creds)
+                chunks = [missing[i : i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+                downloads = [
+                    entry
+                    for batch in pool.map(
+                        lambda chunk: _batch(download_href, download_headers, "download", chunk),
+                        chunks,
+                    )
+                    for entry in batch
+                ]
+                list(pool.map(_download_object, downloads))
+
+            list(pool.map(_upload_object, uploads.values()))
+    except (GitCommandError, requests.exceptions.RequestException, ValueError, OSError) as e:
+        msg = f"Failed to sync LFS objects: {e!s}"
+        logging.exception(msg)
+        return RC(ok=False, msg=msg)
+
+    return RC(ok=True, msg=f"{len(uploads)} of {len(objects)} LFS objects uploaded")
+
+
+def lfs_endpoint(repo_url: str, operation: str, creds: CredsGitRepo) -> tuple[str, dict[str, str]]:
+    """Gets the LFS API endpoint of a repository and the headers to authenticate with.
+
+    SSH remotes are asked with `git-lfs-authenticate` over the shared SSH connection
+    (see `ssh_command`). HTTPS remotes use the `<repo>.git/info/lfs` endpoint with
+    the credentials of the repository, basic authentication or the header of Azure
+    Repos (see `git_auth`).
+
+    Args:
+        repo_url (str): The URL of the repository.
+        operation (str): The LFS operation, "download" or "upload".
+        creds (CredsGitRepo): The credentials of the repository.
+
+    Returns:
+        tuple[str, dict[str, str]]: The endpoint URL and the request headers.
+
+    Raises:
+        ValueError: If the endpoint cannot be determined.
+    """
+    if repo_url.startswith("git@"):
+        destination, _, path = repo_url.partition(":")
+        command = [*shlex.split(ssh_command(repo_url, creds.ssh_key_path)), destination]
+        try:
+            result = subprocess.run(
+                [*command, "git-lfs-authenticate", path, operation],
+                capture_output=True,
+                check=True,
+                timeout=BATCH_TIMEOUT,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            raise ValueError(f"git-lfs-authenticate failed for {repo_url}: {e!s}") from e
+        response = json.loads(result.stdout)
+        return response["href"], response.get("header", {})
+
+    if not repo_url.startswith(("https://", "http://")):
+        raise ValueError(f"LFS is only supported for HTTPS and SSH remotes: {repo_url}")
+
+    headers = {}
+    if creds.username and creds.password:
+        if creds.username == "AzureReposAuthnSucks":
+            name, _, value = os.environ.get(creds.password, "").partition(":")
+            headers[name.strip()] = value.strip()
+        else:
+            token = base64.b64encode(f"{creds.username}:{creds.password}".encode()).decode()
+            headers["Authorization"] = f"Basic {token}"
+    href = repo_url.rstrip("/")
+    href = href if href.endswith(".git") else f"{href}.git"
+    return f"{href}/info/lfs", headers
+
+
+def _batch(
+    href: str, headers: dict[str, str], operation: str, objects: list[tuple[str, int]]
+) -> list[dict]:
+    response = requests.post(
+        f"{href}/objects/batch",
+        json={
+            "operation": operation,
+            "transfers": ["basic"],
+            "objects": [{"oid": oid, "size": size} for oid, size in objects],
+        },
+        headers={**headers, "Accept": MEDIA_TYPE, "Content-Type": MEDIA_TYPE},
+        timeout=BATCH_TIMEOUT,
+    )
+    response.raise_for_status()
+    entries = response.json().get("objects", [])
+    for entry in entries:
+        if "error" in entry:
+            raise ValueError(f"LFS object {entry['oid']}: {entry['error'].get('message')}")
+    return entries
+
+
+def _download_object(entry: dict) -> None:
+    oid = entry["oid"]
+    path = lfs_object_path(oid)
+    action = entry.get("actions", {}).get("download")
+    if not action:
+        raise ValueError(f"LFS object {oid} not found in source")
+    sha256_hash = hashlib.sha256()
+    # unique partial file, repositories sharing an object may download it at once
+    fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with (
+            requests.get(
+                action["href"],
+                headers=action.get("header", {}),
+                timeout=OBJECT_TIMEOUT,
+                stream=True,
+            ) as response,
+            os.fdopen(fd, "wb") as f,
+        ):
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                sha256_hash.update(chunk)
+                f.write(chunk)
+        if sha256_hash.hexdigest() != oid:
+            raise ValueError(f"digest mismatch for LFS object {oid}")
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def _upload_object(entry: dict) -> None:
+    actions = entry["actions"]
+    with open(lfs_object_path(entry["oid"]), "rb") as f:
+        response = requests.put(
+            actions["upload"]["href"],
+            data=f,
+            headers={
+                **actions["upload"].get("header", {}),
+                "Content-Type": "application/octet-stream",
+            },
+            timeout=OBJECT_TIMEOUT,
+        )
+    response.raise_for_status()
+    if verify := actions.get("verify"):
+        response = requests.post(
+            verify["href"],
+            json={"oid": entry["oid"], "size": entry["size"]},
+            headers={**verify.get("header", {}), "Accept": MEDIA_TYPE, "Content-Type": MEDIA_TYPE},
+            timeout=BATCH_TIMEOUT,
+        )
+        response.raise_for_status()
@@ -0,0 +1,151 @@
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import git
+from git import GitCommandError
+
+from ..cli.cache import get_cache_path
+from ..cli.defaults import DEFAULT_MIRROR_BUDGET
+
+MIRROR_DIR = "git-mirrors"
+# seconds between housekeeping runs of a mirror
+MAINTENANCE_INTERVAL = 7 * 24 * 60 * 60
+MAINTENANCE_STAMP = "airgapper-maintenance"
+
+_budget: int = DEFAULT_MIRROR_BUDGET
+
+
+def set_mirror_budget(budget: int) -> None:
+    """Sets the size budget of the Git mirror cache.
+
+    Args:
+        budget (int): The maximum size of all mirrors in bytes.
+    """
+    global _budget  # noqa: PLW0603
+    _budget = budget
+
+
+def mirror_path(repo_url: str) -> str:
+    """Gets the folder of the bare mirror of a repository.
+
+    Mirrors live in the cache folder, or below `./tmp` for the current run if
+    persistence is disabled. The folder name is derived from the URL, so
+    credentials never appear in it.
+
+    Args:
+        repo_url (str): The URL of the source repository, without credentials.
+
+    Returns:
+        str: The folder of the bare mirror.
+    """
+    return os.path.join(_mirror_root(), f"{hashlib.sha256(repo_url.encode()).hexdigest()[:32]}.git")
+
+
+@contextmanager
+def open_mirror(repo_url: str) -> Iterator[git.Repo]:
+    """Opens the bare mirror of a repository, creating it if it does not exist yet.
+
+    The mirror is locked for the lifetime of the context, so concurrent runs sharing
+    the cache folder never fetch into or push from the same mirror at once. Afterwards
+    housekeeping (`git maintenance`) runs if it is due and the cache is trimmed to its
+    size budget (see `prune_mirrors`).
+
+    Args:
+        repo_url (str): The URL of the source repository, without credentials.
+
+    Yields:
+        git.Repo: The bare mirror repository.
+    """
+    path = mirror_path(repo_url)
+    with open(f"{path}.lock", "w", encoding="utf-8") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if os.path.isdir(path):
+                repo = git.Repo(path)
+            else:
+                logging.info(f"creating mirror of {repo_url}: {path}")
+                repo = git.Repo.init(path, bare=True)
+                _touch(os.path.join(path, MAINTENANCE_STAMP))
+            # the modification time orders mirrors for eviction
+            os.utime(path)
+            yield repo
+            _maintain(repo)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    prune_mirrors(keep=path)
+
+
+def prune_mirrors(keep: str | None = None) -> None:
+    """Removes the least recently used mirrors until the cache fits its size budget.
+
+    Mirrors locked by another sync are left alone.
+
+    Args:
+        keep (str, optional): The folder of a mirror that must not be removed.
+            Defaults to None.
+    """
+    root = _mirror_root()
+    mirrors = [
+        os.path.join(root, name)
+        for name in os.listdir(root)
+        if name.endswith(".git") and os.path.isdir(os.path.join(root, name))
+    ]
+    sizes = {path: _folder_size(path) for path in mirrors}
+    total = sum(sizes.values())
+    for path in sorted(mirrors, key=os.path.getmtime):
+        if total <= _budget:
+            break
+        if path == keep:
+            continue
+        with open(f"{path}.lock", "w", encoding="utf-8") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue
+            logging.info(f"removing mirror over cache budget: {path}")
+            shutil.rmtree(path, ignore_errors=True)
+            total -= sizes[path]
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _mirror_root() -> str:
+    # get_cache_path creates the parent folder of an entry, the mirror folder here
+    entry = get_cache_path(MIRROR_DIR, "mirror") or os.path.join("./tmp", MIRROR_DIR, "mirror")
+    root = os.path.dirname(entry)
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def _maintain(repo: git.Repo) -> None:
+    stamp = os.path.join(repo.git_dir, MAINTENANCE_STAMP)
+    if os.path.exists(stamp) and time.time() - os.path.getmtime(stamp) < MAINTENANCE_INTERVAL:
+        return
+    logging.info(f"running maintenance of mirror: {repo.git_dir}")
+    try:
+        repo.git.maintenance("run", "--task=gc")
+    except GitCommandError:
+        logging.warning(f"maintenance of mirror failed: {repo.git_dir}")
+        return
+    _touch(stamp)
+
+
+def _touch(path: str) -> None:
+    with open(path, "w", encoding="utf-8"):
+        pass
+
+
+def _folder_size(path: str) -> int:
+    size = 0
+    for folder, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.path.getsize(os.path.join(folder, name))
+            except OSError:
+                pass  # removed while walking, e.g. by a concurrent gc
+    return size
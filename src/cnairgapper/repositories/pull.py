@@ -1,92 +1,62 @@
 import logging
-import os
-import shutil
-from pathlib import Path
 
 import git
 from git import GitCommandError
 
 from ..models.rc import RC
+from .utils import git_auth, list_remote_refs, resolve_ref
 
 
-def clone_repo_ref(
+def fetch_repo_refs(
+    repo: git.Repo,
     repo_url: str,
-    ref: str,
-    target_path: str,
+    refs: list[str],
     username: str | None = None,
     password: str | None = None,
     ssh_key_path: str | None = None,
 ) -> RC:
-    """Clones a specific reference (branch, tag, or commit) from a Git repository and stores
-    it in the specified target path.
+    """Fetches branches and tags of a remote repository into a local (mirror) repository.
 
-    This function supports both SSH and HTTPS authentication for cloning repositories.
-    It creates or cleans the target directory as needed. For HTTPS authentication,
-        both username and password must be provided.
-    For SSH authentication, an SSH key file path must be specified.
-    The function logs errors encountered during the process and returns a result
-        indicating success or failure.
+    Every ref is looked up as branch first and as tag second in the refs of the remote
+    (see `list_remote_refs`), and only the found refs are fetched, with a single
+    `git fetch`. Objects already present locally are not
+    transferred again, so updating a mirror only fetches new commits.
 
     Args:
-        repo_url (str): The URL of the repository to clone. Must start with "http" or "git@".
-        ref (str): The specific branch, tag, or commit reference to clone.
-        target_path (str): The file path where the repository will be cloned.
+        repo (git.Repo): The local repository to fetch into, usually a bare mirror
+            (see `open_mirror`).
+        repo_url (str): The URL of the remote repository.
+        refs (list[str]): The names of the branches and tags to fetch.
         username (Optional[str]): The username for HTTPS authentication.
         password (Optional[str]): The password for HTTPS authentication.
         ssh_key_path (Optional[str]): The file path to the SSH private key for SSH authentication.
 
     Returns:
-        RC: An object indicating the result of the operation,
-            including success/failure status and optional data.
-
-    Raises:
-        GitCommandError: Raised when git operations fail internally.
+        RC: The result of the fetch. On success `entity` maps every found ref to its
+            full name, e.g. `{"main": "refs/heads/main"}`; refs missing in the remote
+            are left out.
     """
     try:
-        # Create target directory if it doesn't exist
-        target_dir = Path(target_path)
-        # Cleanup target path if requested
-        if target_dir.exists():
-            shutil.rmtree(target_dir)
-        target_dir.mkdir(parents=True, exist_ok=True)
-
-        git_options = []
-        # Configure authentication
-        if repo_url.startswith("git@"):
-            if not ssh_key_path:
-                msg = "SSH key path is required for SSH authentication"
-                logging.error(msg)
-                return RC(ok=False, msg=msg)
-            if not os.path.exists(ssh_key_path):
-                msg = f"SSH key path {ssh_key_path} does not exist"
-                logging.error(msg)
-                return RC(ok=False, msg=msg)
-            os.environ["GIT_SSH_COMMAND"] = f"ssh -i {ssh_key_path}"
-        elif username and password:
-            if username == "AzureReposAuthnSucks":
-                git_options.append(f"--config-env=http.extraheader={password}")
-            else:
-                logging.debug(f"using username [{username}] and password for HTTPS auth")
-                # Use Git credential environment variable for authentication
-                url_parts = repo_url.split("://")
-                repo_url = f"{url_parts[0]}://{username}:{password}@{url_parts[1]}"
-        elif username or password:
-            msg = "Both username and password are required for HTTPS authentication"
-            logging.error(msg)
-            return RC(ok=False, msg=msg)
-
-        # Clone the repository
-        repo = git.Repo.clone_from(
-            repo_url,
-            target_path,
-            branch=ref,
-            single_branch=True,
-            multi_options=git_options,
-        )
+        url, options = git_auth(repo_url, username, password, ssh_key_path)
+        remote_refs = list_remote_refs(repo_url, username, password, ssh_key_path)
+    except ValueError as e:
+        logging.error(str(e))  # noqa: TRY400
+        return RC(ok=False, msg=str(e))
+    except GitCommandError as e:
+        msg = f"Failed to list refs of repository: {e.stderr!s}"
+        logging.exception(msg)
+        return RC(ok=False, msg=msg)
 
-        return RC(ok=True, entity=repo)
+    found = {ref: resolve_ref(remote_refs, ref) for ref in refs}
+    found = {ref: full_name for ref, full_name in found.items() if full_name}
 
+    try:
+        if found:
+            logging.debug(f"fetching refs: {list(found.values())!s}")
+            repo.git(**options).fetch(url, "--no-tags", *(f"+{f}:{f}" for f in found.values()))
     except GitCommandError as e:
-        msg = f"Failed to clone repository: {e.stderr!s}"
+        msg = f"Failed to fetch repository: {e.stderr!s}"
         logging.exception(msg)
         return RC(ok=False, msg=msg)
+
+    return RC(ok=True, entity=found)
@@ -1,38 +1,48 @@
 import logging
-import os
 from pathlib import Path
 from typing import Literal
 
-from git import Repo
+from git import GitCommandError, Repo
 
 from ..models.rc import RC
+from .utils import git_auth, list_remote_refs
 
 PushMode = Literal["skip", "push", "force"]
 
+# flags of `git push --porcelain` for refs the remote did not accept
+_PUSH_FAILED = {"!"}
 
-def push_repo_ref(
+
+def push_repo_refs(
     local_repo_path: str | Path,
     remote_url: str,
-    ref: str,
+    refs: dict[str, str],
     push_mode: PushMode = "push",
     username: str | None = None,
     password: str | None = None,
     ssh_key_path: str | None = None,
-) -> RC:
-    """Handles pushing a specific Git reference from a local repository to a remote
-    repository using different modes and optional authentication methods.
+) -> list[RC]:
+    """Pushes branches and tags from a local repository to a remote repository at once.
+
+    All references are pushed with a single `git push`, so the objects to transfer are
+    negotiated once per repository. The push mode is applied per refspec: "force"
+    prefixes every refspec with `+`, "push" lets the remote reject non fast-forward
+    updates, and "skip" leaves out references that already exist in the remote (see
+    `list_remote_refs`). The outcome of every reference is read from the porcelain
+    output of the push.
 
     Args:
-        local_repo_path (str | Path): The local repository path from which the reference
-            should be pushed. This can be a string path or a Path object.
-        remote_url (str): URL of the remote repository to which the reference will be
+        local_repo_path (str | Path): The local repository path from which the references
+            should be pushed, a bare mirror or a working copy.
+        remote_url (str): URL of the remote repository to which the references will be
             pushed.
-        ref (str): The name of the reference (branch or tag) to be pushed.
-        push_mode (PushMode, optional): Determines how the reference is pushed.
+        refs (dict[str, str]): The names of the references (branches or tags) to push,
+            mapped to their full names, e.g. `{"main": "refs/heads/main"}`.
+        push_mode (PushMode, optional): Determines how the references are pushed.
             defaults to "push".
-            If set to "push", the reference is pushed normally.
-            If "force", it overrides any existing remote reference.
-            If "skip", the push will be skipped if the reference already exists.
+            If set to "push", the references are pushed normally.
+            If "force", they override any existing remote reference.
+            If "skip", references which already exist in the remote are not pushed.
         username (Optional[str], optional): Username for HTTPS-based authentication.
             Required only if the `remote_url` uses HTTPS without a pre-configured
             authentication method.
@@ -44,71 +54,68 @@ def push_repo_ref(
             Required only if the `remote_url` uses SSH and an explicit key is needed.
 
     Returns:
-        RC: A result object summarizing the outcome of the push. Contains `ok` (bool)
-            indicating success or failure, a `message` (str) detailing the result,
+        list[RC]: One result per reference, in the order of `refs`. Each contains `ok`
+            (bool) indicating success or failure, a `msg` (str) detailing the result,
             and `ref` (str) specifying the pushed reference.
-
-    Raises:
-        Exception: If an error occurs during the push process, it is caught and logged,
-        and the function returns a failure `RC` instance instead of propagating the
-        error.
     """
     try:
-        # Convert path to Path object
-        repo_path = Path(local_repo_path)
-
-        # Open the repository
-        repo = Repo(repo_path)
-
-        # Configure authentication
-        if remote_url.startswith("https://"):
-            if username and password:
-                # Format HTTPS URL with credentials
-                parsed_url = remote_url.replace("https://", "")
-                remote_url = f"https://{username}:{password}@{parsed_url}"
-        elif remote_url.startswith("git@") and ssh_key_path:
-            # Configure SSH key if provided
-            os.environ["GIT_SSH_COMMAND"] = f"ssh -i {ssh_key_path}"
-
-        # Add remote if it doesn't exist
-        remote_name = "push_remote"
-        try:
-            remote = repo.remote(remote_name)
-            remote.set_url(remote_url)
-        except ValueError:
-            remote = repo.create_remote(remote_name, remote_url)
-
-        # Fetch remote refs
-        remote.fetch()
-
-        # Check if ref exists in remote
-        remote_refs = [str(r.remote_head) for r in remote.refs]
-        ref_exists = ref in remote_refs
-
-        if ref_exists:
-            if push_mode == "skip":
-                msg = f"Ref {ref} already exists in remote, skipping push"
-                logging.info(msg)
-                return RC(ok=True, msg=msg, ref=ref)
-            if push_mode == "force":
-                logging.info(f"Force pushing ref {ref}")
-                push_info = remote.push(f"+{ref}")  # '+' prefix forces the push
-            else:  # push_mode == 'push'
-                logging.info(f"Pushing ref {ref}")
-                push_info = remote.push(ref)
-        else:
-            logging.info(f"Pushing new ref {ref}")
-            push_info = remote.push(ref)
-
-        # Check if push was successful
-        if push_info[0].flags & push_info[0].ERROR:
-            msg = f"Failed to push ref {ref}"
-            logging.error(msg)
-            return RC(ok=False, msg=msg, ref=ref)
-
-        return RC(ok=True, ref=ref)
-
-    except Exception as e:
+        # Open the repository, a bare mirror or a working copy
+        repo = Repo(Path(local_repo_path))
+
+        # Configure authentication, the URL is only used on the command line
+        url, options = git_auth(remote_url, username, password, ssh_key_path)
+        remote_refs = (
+            list_remote_refs(remote_url, username, password, ssh_key_path)
+            if push_mode == "skip"
+            else {}
+        )
+    except (GitCommandError, ValueError) as e:
         msg = f"Error pushing to remote: {e!s}"
         logging.exception(msg)
-        return RC(ok=False, msg=msg, ref=ref)
+        return [RC(ok=False, msg=msg, ref=ref) for ref in refs]
+
+    rcs: dict[str, RC] = {}
+    refspecs = []
+    for ref, full_name in refs.items():
+        if full_name in remote_refs:
+            msg = f"Ref {ref} already exists in remote, skipping push"
+            logging.info(msg)
+            rcs[ref] = RC(ok=True, msg=msg, ref=ref)
+        else:
+            prefix = "+" if push_mode == "force" else ""  # '+' prefix forces the push
+            refspecs.append(f"{prefix}{full_name}:{full_name}")
+
+    if refspecs:
+        logging.info(f"pushing {len(refspecs)} refs")
+        # a rejected ref makes git exit with an error, the porcelain output tells which
+        _, stdout, stderr = repo.git(**options).push(
+            "--porcelain", url, *refspecs, with_extended_output=True, with_exceptions=False
+        )
+        results = _parse_push_output(stdout)
+        for ref, full_name in refs.items():
+            if ref in rcs:
+                continue
+            flag, summary = results.get(full_name, ("!", stderr.strip()))
+            if flag in _PUSH_FAILED:
+                msg = f"Error pushing ref {ref} to remote: {summary}"
+                logging.error(msg)
+                rcs[ref] = RC(ok=False, msg=msg, ref=ref)
+            else:
+                rcs[ref] = RC(ok=True, msg=summary, ref=ref)
+
+    return [rcs[ref] for ref in refs]
+
+
+def _parse_push_output(output: str) -> dict[str, tuple[str, str]]:
+    r"""Maps the remote refs of `git push --porcelain` to their flag and summary.
+
+    Ref lines look like `<flag>\t<from>:<to>\t<summary>`, e.g.
+    `!\trefs/heads/main:refs/heads/main\t[rejected] (non-fast-forward)`.
+    """
+    results = {}
+    for line in output.splitlines():
+        if len(line) < 2 or line[1] != "\t":
+            continue
+        spec, _, summary = line[2:].partition("\t")
+        results[spec.rpartition(":")[2]] = (line[0], summary)
+    return results
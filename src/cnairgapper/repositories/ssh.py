@@ -0,0 +1,90 @@
+import atexit
+import hashlib
+import logging
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+
+# seconds an idle master connection stays open, in case the teardown at exit is skipped
+CONTROL_PERSIST = 600
+
+# control socket folder per key, and the `user@host` destinations connected through it
+_control_dir: str | None = None
+_masters: dict[str, set[str]] = {}
+_lock = threading.Lock()
+
+
+def ssh_command(repo_url: str, ssh_key_path: str | None = None) -> str:
+    """Builds the SSH command of a git command, sharing one connection per host and key.
+
+    Every (host, key) pair gets an SSH ControlMaster socket. The first git command
+    against a host opens the master connection, every later clone, fetch, ls-remote
+    and push of the run reuses it instead of doing a full key exchange. The masters
+    are closed when the process exits (see `close_ssh_masters`).
+
+    Args:
+        repo_url (str): The SSH URL of the remote repository, e.g.
+            "git@github.com:org/repo.git".
+        ssh_key_path (str, optional): The path to the SSH private key. Defaults to None,
+            which uses the local SSH setup.
+
+    Returns:
+        str: The SSH command, to be used as `core.sshCommand`.
+    """
+    control_dir = _key_control_dir(ssh_key_path)
+    destination = repo_url.split(":", 1)[0]
+    with _lock:
+        _masters.setdefault(control_dir, set()).add(destination)
+
+    command = ["ssh"]
+    if ssh_key_path:
+        command += ["-i", ssh_key_path, "-o", "IdentitiesOnly=yes"]
+    command += [
+        "-o",
+        "ControlMaster=auto",
+        "-o",
+        f"ControlPath={control_dir}/%C",
+        "-o",
+        f"ControlPersist={CONTROL_PERSIST}",
+    ]
+    return shlex.join(command)
+
+
+def close_ssh_masters() -> None:
+    """Closes the SSH master connections of the run and removes their sockets."""
+    global _control_dir
+    with _lock:
+        masters = {d: set(dests) for d, dests in _masters.items()}
+        _masters.clear()
+        control_dir, _control_dir = _control_dir, None
+
+    for key_dir, destinations in masters.items():
+        for destination in destinations:
+            try:
+                subprocess.run(
+                    ["ssh", "-o", f"ControlPath={key_dir}/%C", "-O", "exit", destination],  # noqa: S607
+                    capture_output=True,
+                    timeout=10,
+                    check=False,
+                )
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logging.debug(f"could not close SSH master of {destination}: {e!s}")
+    if control_dir:
+        shutil.rmtree(control_dir, ignore_errors=True)
+
+
+def _key_control_dir(ssh_key_path: str | None) -> str:
+    # %C hashes the host, port and user only, so every key gets its own folder
+    global _control_dir  # noqa: PLW0603
+    with _lock:
+        if _control_dir is None:
+            # short path, socket paths are limited to about 100 characters
+            _control_dir = tempfile.mkdtemp(prefix="airgapper-ssh-")
+            atexit.register(close_ssh_masters)
+        key = hashlib.sha256(os.path.abspath(ssh_key_path or "").encode()).hexdigest()[:12]
+        key_dir = os.path.join(_control_dir, key)
+        os.makedirs(key_dir, mode=0o700, exist_ok=True)
+    return key_dir
@@ -1,99 +1,152 @@
 import logging
 import os
 import re
-import shutil
-from pathlib import Path
+import threading
 
-from git import GitCommandError, Repo
+import git
+from git import Git, GitCommandError
 
 from ..models.creds.creds import Creds
 from ..models.resources.git import GitRepo
+from .ssh import ssh_command
 
+# refs per remote repository URL, listed once per run
+_remote_refs: dict[str, dict[str, str]] = {}
+_remote_refs_lock = threading.Lock()
 
-def get_all_tags_remote(
+
+def list_remote_refs(
     repo_url: str,
-    target_path: str,
     username: str | None = None,
     password: str | None = None,
     ssh_key_path: str | None = None,
-) -> list[str]:
-    """Retrieves all tags from a remote Git repository.
+) -> dict[str, str]:
+    """Lists the branches and tags of a remote Git repository.
 
-    This function interacts with a remote Git repository to fetch all available tags by
-    cloning the repository into a temporary directory. It supports both HTTPS and SSH
-    authentication mechanisms. The temporary directory used for cloning is cleaned up
-    after the operation, irrespective of its success or failure.
+    The refs are listed with a single `git ls-remote`, without cloning anything, and
+    kept for the run, so every further lookup of the same repository is free.
 
     Args:
         repo_url (str): The URL of the remote Git repository.
-        target_path (str): The local path where the repository will be temporarily cloned.
         username (str, optional): The username for HTTPS authentication. Defaults to None.
         password (str, optional): The password for HTTPS authentication. Defaults to None.
         ssh_key_path (str, optional): The path to the SSH private key file for SSH
             authentication. Defaults to None.
 
     Returns:
-        list[str]: A list of tag names retrieved from the remote repository. Returns an
-            empty list in case of any errors during the process.
+        dict[str, str]: The commit or tag object SHA by full ref name, e.g.
+            `{"refs/heads/main": "3f2a...", "refs/tags/v1.0.0": "9c1e..."}`.
+
+    Raises:
+        GitCommandError: If the refs cannot be listed.
+        ValueError: If the credentials are incomplete.
     """
-    try:
-        # Create target directory if it doesn't exist
-        target_dir = Path(target_path)
-        # Cleanup target path if requested
-        shutil.rmtree(target_dir)
-        target_dir.mkdir(parents=True, exist_ok=True)
-
-        # Configure authentication
-        if repo_url.startswith("git@"):  # SSH authentication
-            logging.debug(f"using ssh key @ {ssh_key_path}")
-            if not ssh_key_path or not os.path.exists(ssh_key_path):
-                logging.error(f"no ssk key found: {ssh_key_path}")
-                return []
-            os.environ["GIT_SSH_COMMAND"] = f"ssh -i {ssh_key_path}"
-        elif username and password:  # HTTPS authentication
-            # Modify the repo_url to include username and password for HTTPS if provided
-            logging.debug(f"using username [{username}] and password for HTTPS auth")
-            url_parts = repo_url.split("://")
-            repo_url = f"{url_parts[0]}://{username}:{password}@{url_parts[1]}"
-        elif username or password:
-            logging.error("Both username and password are required for HTTPS authentication.")
-            return []
-
-        # Clone the repository into the temporary directory (shallow clone --tags only)
-        repo = Repo.clone_from(
-            repo_url,
-            target_path,
-            depth=1,
-            multi_options=[
-                "--single-branch",
-                "--no-checkout",
-                "--filter=blob:none",
-                "--no-tags",
-            ],
-        )
+    with _remote_refs_lock:
+        if repo_url in _remote_refs:
+            return _remote_refs[repo_url]
+
+    url, options = git_auth(repo_url, username, password, ssh_key_path)
+    output = Git()(**options).ls_remote("--refs", "--heads", "--tags", url)
+    refs = {}
+    for line in output.splitlines():
+        sha, _, name = line.partition("\t")
+        refs[name] = sha
+    logging.debug(f"found {len(refs)} refs: {repo_url}")
+
+    with _remote_refs_lock:
+        _remote_refs[repo_url] = refs
+    return refs
+
 
-        # Explicitly fetch tags after clone
-        origin = repo.remotes.origin
-        origin.fetch(tags=True)
+def forget_remote_refs(repo_url: str) -> None:
+    """Drops the listed refs of a remote Git repository, e.g. after pushing to it.
 
-        # Fetch the tags from the repository
-        tags = [tag.name for tag in repo.tags]
+    Args:
+        repo_url (str): The URL of the remote Git repository.
+    """
+    with _remote_refs_lock:
+        _remote_refs.pop(repo_url, None)
 
-        logging.debug(f"found tags: {tags!s}")
+
+def resolve_ref(remote_refs: dict[str, str], ref: str) -> str | None:
+    """Resolves a branch or tag name to its full ref name, preferring branches.
+
+    Args:
+        remote_refs (dict[str, str]): The refs of a repository (see `list_remote_refs`).
+        ref (str): The branch or tag name.
+
+    Returns:
+        str | None: The full ref name, e.g. `refs/heads/main`, or None if the
+        repository has neither a branch nor a tag of that name.
+    """
+    return next((n for n in (f"refs/heads/{ref}", f"refs/tags/{ref}") if n in remote_refs), None)
+
+
+def has_commit(repo: git.Repo, sha: str) -> bool:
+    """Checks whether a local repository contains a commit.
+
+    Args:
+        repo (git.Repo): The local repository, e.g. a mirror.
+        sha (str): The SHA of the commit.
+
+    Returns:
+        bool: True if the commit is in the repository's object database.
+    """
+    try:
+        repo.git.cat_file("-e", f"{sha}^{{commit}}")
     except GitCommandError:
-        logging.exception("Git error")
-    except Exception:
-        logging.exception("An error occurred")
-    else:
-        return tags
-    finally:
-        # Clean up the temporary directory
-        logging.debug(f"cleaning up temporary directory: {target_path}")
-        if os.path.exists(target_path):
-            shutil.rmtree(target_path)
+        return False
+    return True
+
+
+def git_auth(
+    repo_url: str,
+    username: str | None = None,
+    password: str | None = None,
+    ssh_key_path: str | None = None,
+) -> tuple[str, dict[str, str]]:
+    """Prepares the authentication of a git command against a remote repository.
+
+    SSH remotes (`git@`) use the given key, or the local SSH setup, over a connection
+    shared per host and key (see `ssh_command`). HTTPS remotes use
+    basic authentication embedded in the URL, or for Azure Repos (username
+    `AzureReposAuthnSucks`) an extra HTTP header read from the environment variable
+    named by `password`. The URL and the options only apply to the single git command
+    they are passed to, so credentials never end up in the config of a persistent
+    repository or in the environment of the process, and repositories can be synced
+    concurrently with different credentials.
+
+    Args:
+        repo_url (str): The URL of the remote repository.
+        username (str, optional): The username for HTTPS authentication. Defaults to None.
+        password (str, optional): The password for HTTPS authentication. Defaults to None.
+        ssh_key_path (str, optional): The path to the SSH private key file for SSH
+            authentication. Defaults to None.
 
-    # Return an empty list in case of any error
-    return []
+    Returns:
+        tuple[str, dict[str, str]]: The URL to use and the top-level git options of the
+        command, e.g. `{"config_env": "http.extraheader=REPO_AUTH_HEADER"}` or
+        `{"c": "core.sshCommand=ssh -i /keys/id_ed25519 ..."}`.
+
+    Raises:
+        ValueError: If the credentials are incomplete.
+    """
+    options = {}
+    if repo_url.startswith("git@"):
+        # without a key the local SSH setup is used
+        if ssh_key_path and not os.path.exists(ssh_key_path):
+            raise ValueError(f"SSH key path {ssh_key_path} does not exist")
+        options["c"] = f"core.sshCommand={ssh_command(repo_url, ssh_key_path)}"
+    elif username and password:
+        if username == "AzureReposAuthnSucks":
+            options["config_env"] = f"http.extraheader={password}"
+        else:
+            logging.debug(f"using username [{username}] and password for HTTPS auth")
+            url_parts = repo_url.split("://")
+            repo_url = f"{url_parts[0]}://{username}:{password}@{url_parts[1]}"
+    elif username or password:
+        raise ValueError("Both username and password are required for HTTPS authentication")
+    return repo_url, options
 
 
 def pattern_is_regex(pattern: str) -> bool:
@@ -120,10 +173,11 @@ def pattern_is_regex(pattern: str) -> bool:
 def get_matching_refs(pattern: str, git_repo: GitRepo, creds: Creds) -> list[str]:
     """Gets all matching references in a remote Git repository based on a provided pattern.
 
-    This function connects to a remote Git repository using provided credentials, retrieves
-    all the references (e.g., tags) from the repository, and matches them against a supplied
-    regular expression pattern. Matching references are stored and returned as a list. It also
-    logs matching references and errors encountered during pattern matching.
+    This function lists the branches and tags of the source repository (see
+    `list_remote_refs`) and matches their names against the supplied regular
+    expression pattern, compiled once. Matching references are returned as a list of
+    branch and tag names. It also logs matching references and errors encountered
+    during listing or pattern matching.
 
     Args:
         pattern (str): The regular expression pattern to match references against.
@@ -136,25 +190,27 @@ def get_matching_refs(pattern: str, git_repo: GitRepo, creds: Creds) -> list[str
     Raises:
         Any exceptions occurring during execution are caught and logged without being raised.
     """
-    matching_refs = []
     logging.debug(f"getting matching refs for pattern: {pattern}")
+    try:
+        regex = re.compile(pattern)
+    except re.error:
+        logging.exception("Error matching pattern")
+        return []
+
     src_creds = creds.get_git_creds(name=git_repo.source_repo_host)
+    try:
+        all_refs = list_remote_refs(
+            repo_url=git_repo.source_repo,
+            username=src_creds.username,
+            password=src_creds.password,
+            ssh_key_path=src_creds.ssh_key_path,
+        )
+    except Exception:
+        logging.exception("Error listing refs")
+        return []
 
-    all_refs = get_all_tags_remote(
-        repo_url=git_repo.source_repo,
-        username=src_creds.username,
-        password=src_creds.password,
-        ssh_key_path=src_creds.ssh_key_path,
-        target_path="./tmp/sync_tmp",
-    )
-
-    logging.info(f"found refs: {all_refs!s}")
-    for ref in all_refs:
-        try:
-            if re.match(pattern, ref):
-                matching_refs.append(ref)
-                logging.info(f"matched ref [{pattern}]: {ref}")
-        except Exception:
-            logging.exception("Error matching pattern")
+    # branch and tag names, a name used by both is synced once
+    names = dict.fromkeys(name.split("/", 2)[2] for name in all_refs)
+    matching_refs = [name for name in names if regex.match(name)]
     logging.info(f"pattern matched refs: {matching_refs!s}")
     return matching_refs
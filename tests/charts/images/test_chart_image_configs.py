@@ -0,0 +1,70 @@
+from cnairgapper.charts.images import chart_image_configs
+from cnairgapper.models.config.config_image import ConfigImage
+from cnairgapper.models.resources.image import Image
+
+
+def test_chart_image_configs_dedup_and_mapping():
+    discovered = [
+        ("bitnami/redis:7.2", "registry.lab/mirror"),
+        ("docker.io/bitnami/redis:7.2", "registry.lab/mirror"),
+        ("bitnami/redis:7.2", "registry-dr.lab/mirror/"),
+        ("bitnami/redis:7.4", "registry.lab/mirror"),
+        ("quay.io/jetstack/cert-manager-controller:v1.15.0", "registry.lab/mirror"),
+        ("redis:7.2", "registry.lab/mirror"),
+        ("docker.io/library/postgres:16", "registry.lab/mirror"),
+        ("registry.k8s.io/pause:3.9", "registry.lab/mirror"),
+        ("gcr.io/distroless:1", "registry.lab/mirror"),
+        ("localhost:5000/foo:1", "registry.lab/mirror"),
+    ]
+    configured = [
+        Image(
+            ConfigImage(
+                source="quay.io/jetstack/cert-manager-controller",
+                target="registry.lab/mirror/jetstack/cert-manager-controller",
+                tags=["v1.15.0"],
+            )
+        ),
+        Image(
+            ConfigImage(
+                source="redis",
+                target="registry.lab/mirror/library/redis",
+                tags=["7.2"],
+            )
+        ),
+    ]
+
+    configs = chart_image_configs(discovered, configured)
+
+    assert [(c.source, c.target, c.additional_targets, c.tags) for c in configs] == [
+        (
+            "registry-1.docker.io/bitnami/redis",
+            "registry.lab/mirror/bitnami/redis",
+            [],
+            ["7.2", "7.4"],
+        ),
+        (
+            "registry-1.docker.io/bitnami/redis",
+            "registry-dr.lab/mirror/bitnami/redis",
+            [],
+            ["7.2"],
+        ),
+        (
+            "registry-1.docker.io/library/postgres",
+            "registry.lab/mirror/library/postgres",
+            [],
+            ["16"],
+        ),
+        ("registry.k8s.io/pause", "registry.lab/mirror/pause", [], ["3.9"]),
+        ("gcr.io/distroless", "registry.lab/mirror/distroless", [], ["1"]),
+        ("localhost:5000/foo", "registry.lab/mirror/foo", [], ["1"]),
+    ]
+    assert all(c.push_mode == "skip" for c in configs)
+
+    # the sources parse to the registry and repository images are pulled from
+    sources = [Image(c) for c in configs[2:]]
+    assert [(i.source_registry, i.source_repo) for i in sources] == [
+        ("registry-1.docker.io", "library/postgres"),
+        ("registry.k8s.io", "pause"),
+        ("gcr.io", "distroless"),
+        ("localhost:5000", "foo"),
+    ]
@@ -0,0 +1,67 @@
+import io
+import tarfile
+
+from cnairgapper.charts import images
+from cnairgapper.charts.images import cached_chart_images, discover_chart_images
+from cnairgapper.cli import cache
+
+FILES = {
+    "app/Chart.yaml": "name: app\nversion: 1.0.0\nappVersion: 2.4.0\n",
+    "app/values.yaml": (
+        "image:\n  registry: ghcr.io\n  repository: example/app\n  tag: ''\n"
+        "sidecar:\n  image: busybox:1.36\n"
+        "pinned:\n  image: nginx@sha256:" + "a" * 64 + "\n"
+        "pullPolicy: IfNotPresent\n"
+    ),
+    "app/templates/job.yaml": (
+        "spec:\n  containers:\n  - image: alpine:3.20\n"
+        '  - image: "{{ .Values.image.repository }}:{{ .Values.image.tag }}"\n'
+    ),
+    "app/charts/db/Chart.yaml": "name: db\nversion: 0.1.0\nappVersion: '16.4'\n",
+    "app/charts/db/values.yaml": "image:\n  repository: bitnami/postgresql\n",
+}
+
+
+def _chart_archive(path):
+    with tarfile.open(path, mode="w:gz") as tar:
+        for name, content in FILES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content.encode())
+            tar.addfile(info, io.BytesIO(content.encode()))
+    return str(path)
+
+
+def test_discover_chart_images_values_and_templates(tmp_path):
+    chart_file = _chart_archive(tmp_path / "app-1.0.0.tgz")
+
+    assert discover_chart_images(chart_file) == [
+        "alpine:3.20",
+        "bitnami/postgresql:16.4",
+        "busybox:1.36",
+        "ghcr.io/example/app:2.4.0",
+    ]
+
+
+def test_discover_chart_images_longhorn():
+    found = discover_chart_images("tests/data/longhorn-1.7.2.tgz")
+
+    assert "longhornio/longhorn-manager:v1.7.2" in found
+    assert "longhornio/csi-attacher:v4.7.0" in found
+    assert all(":" in image for image in found)
+
+
+def test_discover_chart_images_cached_by_digest(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path / "cache"))
+    chart_file = _chart_archive(tmp_path / "app-1.0.0.tgz")
+    ref = "https://charts.example.com/app:1.0.0"
+    assert cached_chart_images(ref) is None
+
+    found = discover_chart_images(chart_file, ref)
+
+    # a new run reads the persisted result without touching the archive
+    monkeypatch.setattr(images, "_cache", None)
+    monkeypatch.setattr(
+        images, "_scan_chart", lambda path: (_ for _ in ()).throw(AssertionError(path))
+    )
+    assert cached_chart_images(ref) == found
+    assert discover_chart_images(chart_file) == found
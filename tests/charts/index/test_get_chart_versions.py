@@ -0,0 +1,83 @@
+import pytest
+
+from cnairgapper.charts import index
+from cnairgapper.charts.index import get_chart_versions
+from cnairgapper.cli import cache
+
+INDEX_URL = "https://charts.example.com/stable/index.yaml"
+INDEX = """apiVersion: v1
+entries:
+  app:
+  - name: app
+    description: |
+      multi-line
+      description:
+    version: 1.0.0
+    urls:
+    - app-1.0.0.tgz
+  - name: app
+    version: "0.9"
+    urls:
+    - app-0.9.tgz
+  "other":
+  - name: other
+    version: 2.0.0
+    urls:
+    - other-2.0.0.tgz
+generated: "2024-01-01T00:00:00Z"
+"""
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_get_chart_versions_fetched_once_per_run(requests_mock, cache_dir):
+    mock = requests_mock.get(INDEX_URL, text=INDEX)
+
+    app = get_chart_versions("charts.example.com/stable", "app", {"Authorization": "Basic abc"})
+    other = get_chart_versions("https://charts.example.com/stable/", "other")
+
+    assert mock.call_count == 1
+    assert list(app) == ["1.0.0", "0.9"]
+    assert app["1.0.0"]["description"] == "multi-line\ndescription:\n"
+    assert other["2.0.0"]["urls"] == ["other-2.0.0.tgz"]
+
+
+def test_get_chart_versions_revalidated_between_runs(requests_mock, monkeypatch, cache_dir):
+    requests_mock.get(INDEX_URL, text=INDEX, headers={"ETag": '"v1"'})
+    get_chart_versions("charts.example.com/stable", "app")
+
+    # next run: conditional request, unchanged index served from the cache folder
+    monkeypatch.setattr(index, "_indexes", {})
+    monkeypatch.setattr(index, "_charts", {})
+    mock = requests_mock.get(INDEX_URL, status_code=304)
+    versions = get_chart_versions("charts.example.com/stable", "app")
+
+    assert mock.last_request.headers["If-None-Match"] == '"v1"'
+    assert versions["1.0.0"]["urls"] == ["app-1.0.0.tgz"]
+
+
+def test_get_chart_versions_without_cache_dir(requests_mock):
+    mock = requests_mock.get(INDEX_URL, text=INDEX, headers={"ETag": '"v1"'})
+
+    get_chart_versions("charts.example.com/stable", "app")
+
+    assert "If-None-Match" not in mock.last_request.headers
+
+
+def test_get_chart_versions_missing_chart(requests_mock):
+    requests_mock.get(INDEX_URL, text=INDEX)
+
+    assert get_chart_versions("charts.example.com/stable", "missing") == {}
+
+
+def test_get_chart_versions_flow_style_index(requests_mock):
+    requests_mock.get(
+        INDEX_URL,
+        text='{"apiVersion": "v1", "entries": {"app": [{"version": "1.0.0", "urls": []}]}}',
+    )
+
+    assert list(get_chart_versions("charts.example.com/stable", "app")) == ["1.0.0"]
@@ -0,0 +1,92 @@
+import hashlib
+import json
+
+from cnairgapper.charts.pull import pull_helm_chart
+from cnairgapper.cli import cache
+
+CHART = b"\x1f\x8b chart bytes"
+CONFIG = json.dumps({"name": "app", "version": "1.0.0"}).encode()
+BASE_URL = "https://registry.example.com/v2/charts/app"
+
+
+def _digest(data):
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def _mock_oci_chart(requests_mock, chart=CHART):
+    requests_mock.get("https://registry.example.com/v2/", status_code=200)
+    requests_mock.get(
+        f"{BASE_URL}/manifests/1.0.0",
+        json={
+            "config": {"digest": _digest(CONFIG)},
+            "layers": [
+                {
+                    "mediaType": "application/vnd.cncf.helm.chart.provenance.v1.prov",
+                    "digest": "sha256:prov",
+                },
+                {
+                    "mediaType": "application/vnd.cncf.helm.chart.content.v1.tar+gzip",
+                    "digest": _digest(CHART),
+                },
+            ],
+        },
+    )
+    requests_mock.get(f"{BASE_URL}/blobs/{_digest(CHART)}", content=chart)
+    requests_mock.get(f"{BASE_URL}/blobs/{_digest(CONFIG)}", content=CONFIG)
+
+
+def test_pull_helm_chart_oci_byte_exact(requests_mock, tmp_path):
+    _mock_oci_chart(requests_mock)
+
+    rc = pull_helm_chart("charts/app", "1.0.0", "registry.example.com", str(tmp_path), {})
+
+    assert rc.ok is True
+    assert rc.ref == str(tmp_path / "charts" / "app-1.0.0.tgz")
+    assert (tmp_path / "charts" / "app-1.0.0.tgz").read_bytes() == CHART
+    assert (tmp_path / "charts" / "app-1.0.0.config.json").read_bytes() == CONFIG
+    assert rc.entity == str(tmp_path / "charts" / "app-1.0.0.config.json")
+
+
+def test_pull_helm_chart_oci_digest_mismatch(requests_mock, tmp_path):
+    _mock_oci_chart(requests_mock, chart=b"tampered")
+
+    rc = pull_helm_chart("charts/app", "1.0.0", "registry.example.com", str(tmp_path), {})
+
+    assert rc.ok is False
+    assert rc.err is True
+    assert "digest mismatch" in rc.msg
+    assert not (tmp_path / "charts" / "app-1.0.0.tgz").exists()
+
+
+def _mock_classic_chart(requests_mock, chart=CHART):
+    requests_mock.get("https://charts.example.com/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/index.yaml", status_code=200)
+    requests_mock.get(
+        "https://charts.example.com/index.yaml",
+        text="apiVersion: v1\nentries:\n  app:\n  - name: app\n    version: 1.0.0\n"
+        f"    digest: {hashlib.sha256(CHART).hexdigest()}\n    urls:\n    - app-1.0.0.tgz\n",
+    )
+    return requests_mock.get("https://charts.example.com/app-1.0.0.tgz", content=chart)
+
+
+def test_pull_helm_chart_classic_reuses_cached_archive(requests_mock, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path / "cache"))
+    download = _mock_classic_chart(requests_mock)
+
+    for run in ("first", "second"):
+        rc = pull_helm_chart("app", "1.0.0", "charts.example.com", str(tmp_path / run), {})
+        assert rc.ok is True
+        assert (tmp_path / run / "app-1.0.0.tgz").read_bytes() == CHART
+
+    assert download.call_count == 1
+    assert [p.suffix for p in (tmp_path / "cache" / "helm-charts").iterdir()] == [".tgz"]
+
+
+def test_pull_helm_chart_classic_digest_mismatch(requests_mock, tmp_path):
+    _mock_classic_chart(requests_mock, chart=b"tampered")
+
+    rc = pull_helm_chart("app", "1.0.0", "charts.example.com", str(tmp_path), {})
+
+    assert rc.ok is False
+    assert "digest mismatch" in rc.msg
+    assert not (tmp_path / "app-1.0.0.tgz").exists()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+
+import pytest
+
+from cnairgapper.charts.push import push_helm_chart
+from cnairgapper.cli import capabilities
+
+REGISTRY = "https://registry.example.com"
+CONFIG = json.dumps({"name": "app", "version": "1.0.0"}).encode()
+
+
+def _digest(data):
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+@pytest.fixture
+def chart(tmp_path):
+    chart_path = tmp_path / "app-1.0.0.tgz"
+    chart_path.write_bytes(b"chart bytes")
+    config_path = tmp_path / "app-1.0.0.config.json"
+    config_path.write_bytes(CONFIG)
+    return str(chart_path), str(config_path)
+
+
+def _push(chart, repo_path):
+    chart_path, config_path = chart
+    return push_helm_chart(
+        chart_path=chart_path,
+        repo_url="registry.example.com",
+        repo_type="oci",
+        repo_path=repo_path,
+        headers={},
+        cleanup_chart=False,
+        config_path=config_path,
+    )
+
+
+def test_push_helm_chart_existing_blobs_only_put_manifest(requests_mock, chart):
+    requests_mock.head(f"{REGISTRY}/v2/team/app/blobs/{_digest(CONFIG)}", status_code=200)
+    requests_mock.head(f"{REGISTRY}/v2/team/app/blobs/{_digest(b'chart bytes')}", status_code=200)
+    manifest = requests_mock.put(f"{REGISTRY}/v2/team/app/manifests/1.0.0", status_code=201)
+
+    rc = _push(chart, "team")
+
+    assert rc.ok is True
+    assert [r.method for r in requests_mock.request_history] == ["HEAD", "HEAD", "PUT"]
+    assert manifest.last_request.json()["config"]["digest"] == _digest(CONFIG)
+
+
+def test_push_helm_chart_uploads_missing_blobs(requests_mock, chart):
+    requests_mock.head(f"{REGISTRY}/v2/team/app/blobs/{_digest(CONFIG)}", status_code=404)
+    requests_mock.head(f"{REGISTRY}/v2/team/app/blobs/{_digest(b'chart bytes')}", status_code=404)
+    requests_mock.post(
+        f"{REGISTRY}/v2/team/app/blobs/uploads/",
+        status_code=202,
+        headers={"Location": "/v2/team/app/blobs/uploads/abc"},
+    )
+    upload = requests_mock.put(f"{REGISTRY}/v2/team/app/blobs/uploads/abc", status_code=201)
+    requests_mock.put(f"{REGISTRY}/v2/team/app/manifests/1.0.0", status_code=201)
+
+    rc = _push(chart, "team")
+
+    assert rc.ok is True
+    assert upload.call_count == 2
+    assert upload.request_history[0].qs == {"digest": [_digest(CONFIG)]}
+    assert upload.request_history[1].qs == {"digest": [_digest(b"chart bytes")]}
+
+
+def test_push_helm_chart_mounts_blobs_pushed_to_other_repo(requests_mock, chart):
+    requests_mock.get(f"{REGISTRY}/v2/", status_code=401)
+    for repo in ("team", "dr"):
+        requests_mock.head(f"{REGISTRY}/v2/{repo}/app/blobs/{_digest(CONFIG)}", status_code=404)
+        requests_mock.head(
+            f"{REGISTRY}/v2/{repo}/app/blobs/{_digest(b'chart bytes')}", status_code=404
+        )
+        requests_mock.put(f"{REGISTRY}/v2/{repo}/app/manifests/1.0.0", status_code=201)
+    requests_mock.post(
+        f"{REGISTRY}/v2/team/app/blobs/uploads/",
+        status_code=202,
+        headers={"Location": f"{REGISTRY}/v2/team/app/blobs/uploads/abc?state=1"},
+    )
+    requests_mock.put(f"{REGISTRY}/v2/team/app/blobs/uploads/abc", status_code=201)
+    mount = requests_mock.post(f"{REGISTRY}/v2/dr/app/blobs/uploads/", status_code=201)
+
+    assert _push(chart, "team").ok is True
+    assert _push(chart, "dr").ok is True
+
+    assert mount.call_count == 2
+    assert mount.request_history[0].qs == {"mount": [_digest(CONFIG)], "from": ["team/app"]}
+    assert capabilities.get_host_capabilities(REGISTRY).cross_repo_mount is True
@@ -0,0 +1,62 @@
+import hashlib
+import io
+import tarfile
+
+import yaml
+
+from cnairgapper.charts import static
+from cnairgapper.charts.push import push_helm_chart
+from cnairgapper.charts.static import static_chart_exists, write_static_indexes
+
+
+def _chart_archive(tmp_path, version):
+    content = f"apiVersion: v2\nname: app\nversion: {version}\nappVersion: '9'\n".encode()
+    chart_path = tmp_path / f"app-{version}.tgz"
+    with tarfile.open(chart_path, "w:gz") as tar:
+        info = tarfile.TarInfo("app/Chart.yaml")
+        info.size = len(content)
+        tar.addfile(info, io.BytesIO(content))
+    return chart_path
+
+
+def _push(chart_path, root):
+    return push_helm_chart(
+        chart_path=str(chart_path),
+        repo_url=str(root),
+        repo_type="static",
+        repo_path="stable",
+        cleanup_chart=False,
+    )
+
+
+def test_push_static_chart_merges_index_entries(tmp_path, monkeypatch):
+    root = tmp_path / "repos"
+    (root / "stable").mkdir(parents=True)
+    (root / "stable" / "index.yaml").write_text(
+        "apiVersion: v1\nentries:\n  other:\n  - name: other\n    version: 1.0.0\n"
+        "    urls:\n    - other-1.0.0.tgz\n"
+    )
+    old = _chart_archive(tmp_path, "1.0.0")
+    new = _chart_archive(tmp_path, "1.10.0")
+
+    assert _push(new, root).ok is True
+    rc = _push(old, root)
+
+    assert rc.ok is True
+    assert rc.ref == f"sha256:{hashlib.sha256(old.read_bytes()).hexdigest()}"
+    assert (root / "stable" / "app-1.0.0.tgz").read_bytes() == old.read_bytes()
+
+    # the index is written once, after all pushes
+    assert "app" not in (root / "stable" / "index.yaml").read_text()
+    assert write_static_indexes() == []
+    index = yaml.safe_load((root / "stable" / "index.yaml").read_text())
+    assert [e["version"] for e in index["entries"]["app"]] == ["1.10.0", "1.0.0"]
+    assert index["entries"]["app"][1]["urls"] == ["app-1.0.0.tgz"]
+    assert index["entries"]["app"][1]["appVersion"] == "9"
+    assert index["entries"]["app"][1]["digest"] == rc.ref.removeprefix("sha256:")
+    assert index["entries"]["other"][0]["version"] == "1.0.0"
+
+    # next run reads the written index
+    monkeypatch.setattr(static, "_indexes", {})
+    assert static_chart_exists(str(root / "stable"), "app", "1.10.0").ok is True
+    assert static_chart_exists(str(root / "stable"), "app", "2.0.0").ok is False
@@ -0,0 +1,50 @@
+from cnairgapper.charts.utils import chart_exists
+from cnairgapper.models.config.config_helm_chart import ConfigHelmChart
+from cnairgapper.models.resources.helm import HelmChart
+
+INDEX_URL = "https://nexus.example.com/repository/helm-hosted/index.yaml"
+
+
+def _nexus_chart(version):
+    return HelmChart(
+        ConfigHelmChart(
+            source_registry="charts.example.com",
+            source_chart="app",
+            target_registry="nexus.example.com",
+            target_repo="helm-hosted",
+            target_repo_type="nexus",
+        ),
+        version,
+    )
+
+
+def test_chart_exists_nexus_uses_cached_index(requests_mock):
+    index = requests_mock.get(
+        INDEX_URL,
+        text="apiVersion: v1\nentries:\n  app:\n  - name: app\n    version: 1.0.0\n",
+    )
+
+    assert chart_exists(_nexus_chart("1.0.0"), {}).ok is True
+    missing = chart_exists(_nexus_chart("2.0.0"), {})
+
+    assert missing.ok is False
+    assert missing.err is False
+    assert index.call_count == 1
+
+
+def test_chart_exists_nexus_empty_repository(requests_mock):
+    requests_mock.get(INDEX_URL, status_code=404)
+
+    rc = chart_exists(_nexus_chart("1.0.0"), {})
+
+    assert rc.ok is False
+    assert rc.err is False
+
+
+def test_chart_exists_nexus_error(requests_mock):
+    requests_mock.get(INDEX_URL, status_code=500)
+
+    rc = chart_exists(_nexus_chart("1.0.0"), {})
+
+    assert rc.ok is False
+    assert rc.err is True
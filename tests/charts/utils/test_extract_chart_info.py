@@ -1,5 +1,8 @@
 # test_utils.py
+import io
+import json
 import os
+import tarfile
 
 from cnairgapper.charts.utils import extract_chart_info
 
@@ -12,3 +15,27 @@ def test_extract_chart_info_longhorn_1_7_2():
 
     result = extract_chart_info(chart_path)
     assert result == {"name": "longhorn", "version": "1.7.2"}
+
+
+def test_extract_chart_info_skips_subchart(tmp_path):
+    """Test that the Chart.yaml of a vendored subchart is not mistaken for the chart's."""
+    chart_path = tmp_path / "app-1.0.0.tgz"
+    with tarfile.open(chart_path, "w:gz") as tar:
+        for name, content in [
+            ("app/charts/db/Chart.yaml", b"name: db\nversion: 9.9.9\n"),
+            ("app/Chart.yaml", b"name: app\nversion: 1.0.0\n"),
+        ]:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+
+    assert extract_chart_info(str(chart_path)) == {"name": "app", "version": "1.0.0"}
+
+
+def test_extract_chart_info_from_oci_config(tmp_path):
+    """Test that the archive is not read when the OCI config carries name and version."""
+    config_path = tmp_path / "app-1.0.0.config.json"
+    config_path.write_text(json.dumps({"name": "app", "version": "1.0.0"}))
+
+    result = extract_chart_info(str(tmp_path / "missing.tgz"), str(config_path))
+    assert result == {"name": "app", "version": "1.0.0"}
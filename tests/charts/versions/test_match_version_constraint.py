@@ -0,0 +1,31 @@
+import pytest
+
+from cnairgapper.charts.versions import match_version_constraint
+
+AVAILABLE = ["0.2.3", "0.2.9", "0.3.0", "1.2.0", "1.2.5", "1.3.0", "2.0.0-rc.1", "2.4.1"]
+
+
+@pytest.mark.parametrize(
+    ("constraint", "expected"),
+    [
+        ("1.2.5", "1.2.5"),
+        ("^1.2", "1.3.0"),
+        ("^0.2.3", "0.2.9"),
+        ("~1.2.0", "1.2.5"),
+        ("1.2.x", "1.2.5"),
+        ("2.x.x", "2.4.1"),
+        ("*", "2.4.1"),
+        (">=1.0.0, <2.0.0", "1.3.0"),
+        ("0.2.3 - 1.2", "1.2.5"),
+        ("^3 || ~0.3", "0.3.0"),
+        ("2.0.0-rc.1", "2.0.0-rc.1"),
+        ("^5.0.0", None),
+    ],
+)
+def test_match_version_constraint(constraint, expected):
+    assert match_version_constraint(constraint, AVAILABLE) == expected
+
+
+def test_match_version_constraint_invalid():
+    with pytest.raises(ValueError, match="Invalid version constraint"):
+        match_version_constraint("stable", AVAILABLE)
@@ -0,0 +1,76 @@
+import pytest
+
+from cnairgapper.charts.versions import list_chart_versions, select_versions
+
+AVAILABLE = [
+    "14.3.0",
+    "15.0.0",
+    "15.0.1",
+    "15.1.0",
+    "15.2.0-rc.1",
+    "15.10.2",
+    "16.0.0",
+    "v16.1.0",
+    "not-a-version",
+]
+
+
+def test_select_versions_exact_versions_unchanged():
+    assert select_versions(["1.0.0", "2.0.0"], AVAILABLE) == ["1.0.0", "2.0.0"]
+
+
+def test_select_versions_range_excludes_prereleases():
+    assert select_versions([">=15.0.0 <16"], AVAILABLE) == ["15.10.2", "15.1.0", "15.0.1", "15.0.0"]
+    assert select_versions([">= 15.1, != 15.10.2, <16"], AVAILABLE) == ["15.1.0"]
+
+
+def test_select_versions_latest():
+    assert select_versions(["latest"], AVAILABLE) == ["v16.1.0"]
+    assert select_versions(["latest:3"], AVAILABLE) == ["v16.1.0", "16.0.0", "15.10.2"]
+
+
+def test_select_versions_latest_minor():
+    assert select_versions(["latest-minor:3"], AVAILABLE) == ["v16.1.0", "16.0.0", "15.10.2"]
+    assert select_versions(["latest-minor:5"], AVAILABLE)[3:] == ["15.1.0", "15.0.1"]
+
+
+def test_select_versions_regex_and_dedup():
+    assert select_versions(["15.0.1", "15\\.[02]\\..*"], AVAILABLE) == [
+        "15.0.1",
+        "15.2.0-rc.1",
+        "15.0.0",
+    ]
+
+
+def test_select_versions_exact_version_with_build_metadata():
+    assert select_versions(["15.0.1+build.1", "latest"], AVAILABLE) == ["15.0.1+build.1", "v16.1.0"]
+
+
+def test_select_versions_no_match():
+    with pytest.raises(ValueError, match=r"matched no version"):
+        select_versions([">=20"], AVAILABLE)
+
+
+def test_select_versions_empty_entry():
+    with pytest.raises(ValueError, match="Empty version entry"):
+        select_versions(["latest", " "], AVAILABLE)
+
+
+def test_select_versions_invalid_constraint():
+    with pytest.raises(ValueError, match="Invalid version constraint"):
+        select_versions([">=foo"], AVAILABLE)
+
+
+def test_list_chart_versions_oci_tags_paginated(requests_mock):
+    requests_mock.get("https://registry.example.com/v2/", status_code=401)
+    base = "https://registry.example.com/v2/charts/app/tags/list"
+    requests_mock.get(
+        base,
+        json={"tags": ["1.0.0", "1.1.0_build.1"]},
+        headers={"Link": '</v2/charts/app/tags/list?last=1.1.0_build.1&n=2>; rel="next"'},
+    )
+    requests_mock.get(f"{base}?last=1.1.0_build.1&n=2", json={"tags": ["2.0.0"]})
+
+    versions = list_chart_versions("registry.example.com", "charts/app")
+
+    assert versions == ["1.0.0", "1.1.0+build.1", "2.0.0"]
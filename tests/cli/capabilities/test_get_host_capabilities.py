@@ -0,0 +1,94 @@
+import json
+
+import pytest
+import requests
+
+from cnairgapper.cli import cache, capabilities
+from cnairgapper.cli.capabilities import get_host_capabilities
+
+CHALLENGE = 'Bearer realm="https://auth.example.com/token",service="registry.example.com"'
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_get_host_capabilities_detects_once_per_run(requests_mock):
+    ping = requests_mock.get(
+        "https://registry.example.com/v2/",
+        status_code=401,
+        headers={"WWW-Authenticate": CHALLENGE},
+    )
+
+    caps = get_host_capabilities("registry.example.com")
+    get_host_capabilities("https://registry.example.com/")
+
+    assert ping.call_count == 1
+    assert caps.oci is True
+    assert caps.anonymous_pull is False
+    assert caps.auth_schemes == ["bearer"]
+    assert caps.realm == "https://auth.example.com/token"
+    assert caps.service == "registry.example.com"
+
+
+def test_get_host_capabilities_classic_helm_repo(requests_mock):
+    requests_mock.get("https://charts.example.com/stable/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/stable/index.yaml", status_code=200)
+
+    caps = get_host_capabilities("charts.example.com/stable")
+
+    assert caps.oci is False
+    assert caps.helm_index is True
+
+
+def test_get_host_capabilities_persisted_between_runs(requests_mock, monkeypatch, cache_dir):
+    ping = requests_mock.get("https://registry.example.com/v2/", status_code=200)
+    get_host_capabilities("registry.example.com")
+
+    # next run: fresh memory, record read from disk
+    monkeypatch.setattr(capabilities, "_capabilities", {})
+    caps = get_host_capabilities("registry.example.com")
+
+    assert ping.call_count == 1
+    assert caps.anonymous_pull is True
+    records = json.loads((cache_dir / "capabilities.json").read_text())
+    assert records["registry.example.com"]["oci"] is True
+
+
+def test_get_host_capabilities_expired_record(requests_mock, monkeypatch, cache_dir):
+    ping = requests_mock.get("https://registry.example.com/v2/", status_code=200)
+    get_host_capabilities("registry.example.com")
+
+    monkeypatch.setattr(capabilities, "_capabilities", {})
+    monkeypatch.setattr(capabilities, "_ttl", -1)
+    get_host_capabilities("registry.example.com")
+
+    assert ping.call_count == 2
+
+
+def test_get_host_capabilities_outage_not_persisted(requests_mock, cache_dir):
+    requests_mock.get("https://registry.example.com/v2/", exc=requests.exceptions.ConnectTimeout)
+    requests_mock.head("https://registry.example.com/index.yaml", status_code=503)
+
+    caps = get_host_capabilities("registry.example.com")
+
+    assert caps.oci is False
+    assert caps.helm_index is False
+    assert not (cache_dir / "capabilities.json").exists()
+
+
+def test_get_host_capabilities_outage_detected_again(requests_mock):
+    ping = requests_mock.get(
+        "https://registry.example.com/v2/", exc=requests.exceptions.ConnectTimeout
+    )
+    requests_mock.head("https://registry.example.com/index.yaml", status_code=503)
+    get_host_capabilities("registry.example.com")
+
+    # the registry recovered within the run
+    ping = requests_mock.get("https://registry.example.com/v2/", status_code=200)
+    caps = get_host_capabilities("registry.example.com")
+
+    assert caps.oci is True
+    assert ping.call_count == 1
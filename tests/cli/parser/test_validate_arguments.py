@@ -10,11 +10,16 @@ class MockArgs:
         credentials_folder=None,
         config_file=None,
         config_folder=None,
+        *,
+        git_bundle_export=None,
+        git_bundle_import=None,
     ):
         self.credentials_file = credentials_file
         self.credentials_folder = credentials_folder
         self.config_file = config_file
         self.config_folder = config_folder
+        self.git_bundle_export = git_bundle_export
+        self.git_bundle_import = git_bundle_import
 
 
 class MockParser:
@@ -56,6 +61,17 @@ def test_validate_arguments_config_double():
     assert not validate_arguments(args, parser)
 
 
+def test_validate_arguments_bundle_double():
+    parser = MockParser()
+    args = MockArgs(
+        credentials_file="file.txt",
+        config_file="file.txt",
+        git_bundle_export="bundles",
+        git_bundle_import="bundles",
+    )
+    assert not validate_arguments(args, parser)
+
+
 def test_validate_arguments_fine_1():
     parser = MockParser()
     args = MockArgs(credentials_folder="folder", config_file="config.txt")
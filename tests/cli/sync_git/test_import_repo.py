@@ -0,0 +1,84 @@
+import os
+
+from cnairgapper.cli import cache
+from cnairgapper.cli.sync_git import import_repo, sync_repo
+from cnairgapper.models.config.config_git_repo import ConfigGitRepo
+from cnairgapper.models.creds.creds import Creds
+from cnairgapper.models.creds.creds_file import CredsFile
+from cnairgapper.models.resources.git import GitRepo
+from cnairgapper.repositories import utils as repo_utils
+from cnairgapper.repositories.bundle import bundle_key, bundle_path, list_bundles
+
+
+def test_import_repo_applies_incremental_bundles(
+    tmp_path, monkeypatch, source_repo, target_repo, git_commit
+):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path / "cache"))
+    source = source_repo
+    first = source.head.commit
+    git_repo = GitRepo(
+        ConfigGitRepo(
+            source_repo=source.working_tree_dir,
+            target_repo=target_repo.git_dir,
+            push_mode="push",
+            refs=["main", "v.*"],
+        )
+    )
+    bundle_dir = str(tmp_path / "transfer")
+    os.makedirs(bundle_dir)
+    state = {}
+    key = bundle_key(git_repo.source_repo, git_repo.target_repo)
+
+    rc = sync_repo(git_repo, Creds(CredsFile()), bundle_dir=bundle_dir, bundle_state=state)
+    assert rc.ok is True
+    assert state[key]["refs"] == {"refs/heads/main": first.hexsha}
+
+    # a second export before the transfer only carries the delta, the first is kept
+    second = git_commit(source, "second")
+    source.create_tag("v1.0.0", ref=first)
+    monkeypatch.setattr(repo_utils, "_remote_refs", {})
+    rc = sync_repo(git_repo, Creds(CredsFile()), bundle_dir=bundle_dir, bundle_state=state)
+    assert rc.ok is True
+    verify = source.git.bundle("verify", bundle_path(bundle_dir, key, 2))
+    assert f"requires this ref:\n{first.hexsha}" in verify
+
+    # nothing changed, nothing is exported or removed
+    monkeypatch.setattr(repo_utils, "_remote_refs", {})
+    rc = sync_repo(git_repo, Creds(CredsFile()), bundle_dir=bundle_dir, bundle_state=state)
+    assert all("unchanged" in _rc.msg for _rc in rc.entity)
+    assert list_bundles(bundle_dir, key) == [bundle_path(bundle_dir, key, n) for n in (1, 2)]
+
+    rc = import_repo(git_repo, Creds(CredsFile()), bundle_dir)
+    assert [_rc.ok for _rc in rc.entity] == [True, True]
+    assert target_repo.commit("main") == second
+    assert target_repo.commit("v1.0.0") == first
+
+    # importing again changes nothing
+    rc = import_repo(git_repo, Creds(CredsFile()), bundle_dir)
+    assert [_rc.ok for _rc in rc.entity] == [True, True]
+
+
+def test_export_repo_per_target(tmp_path, monkeypatch, source_repo):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path / "cache"))
+    git_repos = [
+        GitRepo(
+            ConfigGitRepo(
+                source_repo=source_repo.working_tree_dir,
+                target_repo=str(tmp_path / target),
+                refs=["main"],
+            )
+        )
+        for target in ("target.git", "dr-target.git")
+    ]
+    bundle_dir = str(tmp_path / "transfer")
+    os.makedirs(bundle_dir)
+    state = {}
+
+    for git_repo in git_repos:
+        rc = sync_repo(git_repo, Creds(CredsFile()), bundle_dir=bundle_dir, bundle_state=state)
+        assert rc.ok is True
+
+    # the first export does not make the second one skip its refs
+    keys = [bundle_key(r.source_repo, r.target_repo) for r in git_repos]
+    assert len(set(keys)) == 2
+    assert all(len(list_bundles(bundle_dir, key)) == 1 for key in keys)
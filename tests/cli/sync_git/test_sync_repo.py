@@ -0,0 +1,66 @@
+import pytest
+from git import Repo
+
+from cnairgapper.cli import cache
+from cnairgapper.cli.sync_git import sync_repo
+from cnairgapper.models.config.config_git_repo import ConfigGitRepo
+from cnairgapper.models.creds.creds import Creds
+from cnairgapper.models.creds.creds_file import CredsFile
+from cnairgapper.models.resources.git import GitRepo
+from cnairgapper.repositories import utils as repo_utils
+from cnairgapper.repositories.mirror import mirror_path
+
+
+@pytest.fixture
+def git_repo(source_repo, target_repo):
+    source_repo.create_tag("v1.0.0")
+    return GitRepo(
+        ConfigGitRepo(
+            source_repo=source_repo.working_tree_dir,
+            target_repo=target_repo.git_dir,
+            push_mode="push",
+            refs=["main", "v1.0.0", "missing"],
+        )
+    )
+
+
+def test_sync_repo_through_mirror(tmp_path, monkeypatch, source_repo, git_repo, git_commit):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path / "cache"))
+    source = source_repo
+
+    rc = sync_repo(git_repo, Creds(CredsFile()))
+
+    assert [_rc.ok for _rc in rc.entity] == [True, True, False]
+    assert "not found" in rc.entity[2].msg
+    target = Repo(tmp_path / "target.git")
+    assert target.commit("main") == source.commit("main")
+    assert target.commit("v1.0.0") == source.commit("v1.0.0")
+
+    # the mirror is kept and updated incrementally
+    mirror = Repo(mirror_path(git_repo.source_repo))
+    assert mirror.bare
+    second = git_commit(source, "second")
+    git_repo.refs = ["main"]
+    monkeypatch.setattr(repo_utils, "_remote_refs", {})
+    rc = sync_repo(git_repo, Creds(CredsFile()))
+
+    assert rc.ok is True
+    assert Repo(tmp_path / "target.git").commit("main") == second
+    assert mirror.commit("main") == second
+    assert mirror.remotes == []
+
+
+def test_sync_repo_skips_unchanged_refs(tmp_path, monkeypatch, git_repo):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path / "cache"))
+    git_repo.refs = ["main", "v1.0.0"]
+    sync_repo(git_repo, Creds(CredsFile()))
+    monkeypatch.setattr(repo_utils, "_remote_refs", {})
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged refs must not be fetched")
+
+    monkeypatch.setattr("cnairgapper.cli.sync_git.open_mirror", fail)
+    rc = sync_repo(git_repo, Creds(CredsFile()))
+
+    assert rc.ok is True
+    assert all("up to date" in _rc.msg for _rc in rc.entity)
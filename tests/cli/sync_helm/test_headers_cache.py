@@ -0,0 +1,33 @@
+import threading
+
+from cnairgapper.cli import sync_helm
+from cnairgapper.models.creds.creds import Creds
+from cnairgapper.models.creds.creds_file import CredsFile
+
+
+def test_headers_cache_fetch_blocks_only_its_registry(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def get_auth_headers(creds, registry):
+        calls.append(registry)
+        if registry == "slow.example.com":
+            started.set()
+            assert release.wait(5)
+        return {"Authorization": registry}
+
+    monkeypatch.setattr(sync_helm, "get_auth_headers", get_auth_headers)
+    headers = sync_helm._HeadersCache(Creds(CredsFile()))
+
+    slow = threading.Thread(target=headers.get, args=("slow.example.com",))
+    slow.start()
+    try:
+        assert started.wait(5)
+        # answered while the token of the other registry is still being fetched
+        assert headers.get("fast.example.com") == {"Authorization": "fast.example.com"}
+    finally:
+        release.set()
+        slow.join()
+
+    assert headers.get("slow.example.com") == {"Authorization": "slow.example.com"}
+    assert sorted(calls) == ["fast.example.com", "slow.example.com"]
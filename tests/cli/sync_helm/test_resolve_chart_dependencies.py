@@ -0,0 +1,110 @@
+from cnairgapper.cli import sync_helm
+from cnairgapper.cli.sync_helm import resolve_chart_dependencies, resolve_chart_versions
+from cnairgapper.models.config.config_helm_chart import ConfigHelmChart
+from cnairgapper.models.creds.creds import Creds
+from cnairgapper.models.creds.creds_file import CredsFile
+
+INDEX = """apiVersion: v1
+entries:
+  api:
+  - name: api
+    version: 1.0.0
+    dependencies:
+    - name: common
+      version: ^2.1.0
+      repository: https://charts.example.com
+    - name: bundled
+      version: 0.1.0
+      repository: file://charts/bundled
+  web:
+  - name: web
+    version: 3.0.0
+    dependencies:
+    - name: common
+      version: 2.x
+      repository: https://charts.example.com
+    - name: cache
+      version: ~1.0
+      repository: oci://registry.example.com/charts
+  common:
+  - name: common
+    version: 2.2.0
+  - name: common
+    version: 2.1.0
+"""
+
+
+def _chart(name, version, **kwargs):
+    return ConfigHelmChart(
+        source_registry="charts.example.com",
+        source_chart=name,
+        target_registry="registry.lab.example.com",
+        target_repo="mirror",
+        versions=[version],
+        **kwargs,
+    )
+
+
+def test_resolve_chart_dependencies_dedup(requests_mock, monkeypatch):
+    monkeypatch.setattr(sync_helm, "get_auth_headers", lambda creds, registry: {})
+    requests_mock.get("https://charts.example.com/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/index.yaml", status_code=200)
+    requests_mock.get("https://charts.example.com/index.yaml", text=INDEX)
+
+    # OCI dependency, read from the config blob of its manifest
+    oci = "https://registry.example.com/v2/charts/cache"
+    requests_mock.get("https://registry.example.com/v2/", status_code=200)
+    requests_mock.get(f"{oci}/tags/list", json={"tags": ["1.0.1", "1.0.4", "1.1.0"]})
+    requests_mock.get(f"{oci}/manifests/1.0.4", json={"config": {"digest": "sha256:c"}})
+    requests_mock.get(f"{oci}/blobs/sha256:c", json={"name": "cache", "version": "1.0.4"})
+
+    charts, rcs = resolve_chart_dependencies(
+        [
+            _chart("api", "1.0.0", include_dependencies=True),
+            _chart("web", "3.0.0", include_dependencies=True),
+            _chart("other", "1.0.0"),
+        ],
+        Creds(CredsFile()),
+    )
+
+    assert rcs == []
+    assert [(c.source_registry, c.source_chart, c.versions) for c in charts] == [
+        ("charts.example.com", "common", ["2.2.0"]),
+        ("registry.example.com", "charts/cache", ["1.0.4"]),
+    ]
+    assert all(c.target_registry == "registry.lab.example.com" for c in charts)
+
+
+def test_resolve_chart_dependencies_unresolvable(requests_mock, monkeypatch):
+    monkeypatch.setattr(sync_helm, "get_auth_headers", lambda creds, registry: {})
+    requests_mock.get("https://charts.example.com/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/index.yaml", status_code=200)
+    requests_mock.get(
+        "https://charts.example.com/index.yaml", text=INDEX.replace("^2.1.0", "^3.0.0")
+    )
+
+    charts, rcs = resolve_chart_dependencies(
+        [_chart("api", "1.0.0", include_dependencies=True)], Creds(CredsFile())
+    )
+
+    assert charts == []
+    assert len(rcs) == 1
+    assert rcs[0].ok is False
+    assert "no version matches ^3.0.0" in rcs[0].msg
+
+
+def test_resolve_chart_dependencies_configured_by_selector(requests_mock, monkeypatch):
+    monkeypatch.setattr(sync_helm, "get_auth_headers", lambda creds, registry: {})
+    requests_mock.get("https://charts.example.com/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/index.yaml", status_code=200)
+    requests_mock.get("https://charts.example.com/index.yaml", text=INDEX)
+
+    # common 2.2.0 is already synced through the selector of its own entry
+    configured, _ = resolve_chart_versions(
+        [_chart("api", "1.0.0", include_dependencies=True), _chart("common", "latest")],
+        Creds(CredsFile()),
+    )
+    charts, rcs = resolve_chart_dependencies(configured, Creds(CredsFile()))
+
+    assert rcs == []
+    assert charts == []
@@ -0,0 +1,48 @@
+from cnairgapper.cli import sync_helm
+from cnairgapper.cli.sync_helm import resolve_chart_versions
+from cnairgapper.models.config.config_helm_chart import ConfigHelmChart
+from cnairgapper.models.creds.creds import Creds
+from cnairgapper.models.creds.creds_file import CredsFile
+
+INDEX = """apiVersion: v1
+entries:
+  app:
+  - name: app
+    version: 1.1.0
+  - name: app
+    version: 1.0.0
+"""
+
+
+def _chart(versions):
+    return ConfigHelmChart(
+        source_registry="charts.example.com",
+        source_chart="app",
+        target_registry="registry.lab.example.com",
+        target_repo="mirror",
+        versions=versions,
+    )
+
+
+def test_resolve_chart_versions_lists_source_once(requests_mock, monkeypatch):
+    monkeypatch.setattr(sync_helm, "get_auth_headers", lambda creds, registry: {})
+    requests_mock.get("https://charts.example.com/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/index.yaml", status_code=200)
+    index = requests_mock.get("https://charts.example.com/index.yaml", text=INDEX)
+    exact = _chart(["1.0.0"])
+
+    charts, rcs = resolve_chart_versions(
+        [exact, _chart(["latest"]), _chart([">=2.0.0"])], Creds(CredsFile())
+    )
+
+    assert charts[0] is exact
+    assert [c.versions for c in charts] == [["1.0.0"], ["1.1.0"]]
+    assert len(rcs) == 1
+    assert rcs[0].ok is False
+    assert "matched no version" in rcs[0].msg
+    assert index.call_count == 1
+
+    # resolved entries are synced without listing the source again
+    rc = sync_helm._resolve_versions(charts[1], sync_helm._HeadersCache(Creds(CredsFile())))
+    assert rc.entity == ["1.1.0"]
+    assert index.call_count == 1
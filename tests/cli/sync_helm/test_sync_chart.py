@@ -0,0 +1,144 @@
+import io
+import os
+import re
+import tarfile
+
+from cnairgapper.cli import sync_helm
+from cnairgapper.cli.sync_helm import sync_chart
+from cnairgapper.models.config.config_helm_chart import ConfigHelmChart
+from cnairgapper.models.creds.creds import Creds
+from cnairgapper.models.creds.creds_file import CredsFile
+
+VERSIONS = ["1.0.0", "1.1.0", "1.2.0"]
+
+
+def _chart_archive(version):
+    content = f"name: app\nversion: {version}\n".encode()
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        info = tarfile.TarInfo("app/Chart.yaml")
+        info.size = len(content)
+        tar.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_sync_chart_versions_share_auth_and_index(requests_mock, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    auth_calls = []
+    monkeypatch.setattr(
+        sync_helm, "get_auth_headers", lambda creds, registry: auth_calls.append(registry) or {}
+    )
+
+    # classic source repository
+    requests_mock.get("https://charts.example.com/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/index.yaml", status_code=200)
+    entries = "".join(
+        f"  - name: app\n    version: {v}\n    urls:\n    - app-{v}.tgz\n" for v in VERSIONS
+    )
+    index = requests_mock.get(
+        "https://charts.example.com/index.yaml", text=f"apiVersion: v1\nentries:\n  app:\n{entries}"
+    )
+    for version in VERSIONS:
+        requests_mock.get(
+            f"https://charts.example.com/app-{version}.tgz", content=_chart_archive(version)
+        )
+
+    # OCI target, blobs already present
+    target = "https://registry.example.com/v2/team/app"
+    requests_mock.get(re.compile(f"{target}/manifests/.*"), status_code=404)
+    requests_mock.head(re.compile(f"{target}/blobs/.*"), status_code=200)
+    manifests = requests_mock.put(re.compile(f"{target}/manifests/.*"), status_code=201)
+
+    rc = sync_chart(
+        ConfigHelmChart(
+            source_registry="charts.example.com",
+            source_chart="app",
+            target_registry="registry.example.com",
+            target_repo="team",
+            versions=VERSIONS,
+        ),
+        Creds(CredsFile()),
+    )
+
+    assert rc.ok is True
+    assert [_rc.ref for _rc in rc.entity] == [
+        f"charts.example.com - app:{version}" for version in VERSIONS
+    ]
+    assert index.call_count == 1
+    assert sorted(auth_calls) == ["charts.example.com", "registry.example.com"]
+    assert manifests.call_count == len(VERSIONS)
+    assert os.listdir(sync_helm.STAGING_DIR) == []
+
+
+def test_sync_chart_discovers_images_of_skipped_versions(requests_mock, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sync_helm, "get_auth_headers", lambda creds, registry: {})
+
+    requests_mock.get("https://charts.example.com/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/index.yaml", status_code=200)
+    requests_mock.get(
+        "https://charts.example.com/index.yaml",
+        text="apiVersion: v1\nentries:\n  app:\n  - name: app\n    version: 1.0.0\n"
+        "    urls:\n    - app-1.0.0.tgz\n",
+    )
+    content = b"image:\n  repository: example/app\n  tag: 1.0.0\n"
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, data in [
+            ("app/Chart.yaml", b"name: app\nversion: 1.0.0\n"),
+            ("app/values.yaml", content),
+        ]:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    download = requests_mock.get(
+        "https://charts.example.com/app-1.0.0.tgz", content=buffer.getvalue()
+    )
+
+    # chart already present in the target
+    requests_mock.get("https://registry.example.com/v2/team/app/manifests/1.0.0", status_code=200)
+
+    config = ConfigHelmChart(
+        source_registry="charts.example.com",
+        source_chart="app",
+        target_registry="registry.example.com",
+        target_repo="team",
+        versions=["1.0.0"],
+        images_target="registry.example.com/mirror",
+    )
+    found = []
+    rc = sync_chart(config, Creds(CredsFile()), images=found)
+    sync_chart(config, Creds(CredsFile()), images=found)
+
+    assert rc.ok is True
+    assert found == [("example/app:1.0.0", "registry.example.com/mirror")] * 2
+    # pulled once for discovery, the second run is served from the discovery cache
+    assert download.call_count == 1
+
+
+def test_sync_chart_selector_without_match_fails(requests_mock, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sync_helm, "get_auth_headers", lambda creds, registry: {})
+
+    requests_mock.get("https://charts.example.com/v2/", status_code=404)
+    requests_mock.head("https://charts.example.com/index.yaml", status_code=200)
+    entries = "".join(
+        f"  - name: app\n    version: {v}\n    urls:\n    - app-{v}.tgz\n" for v in VERSIONS
+    )
+    requests_mock.get(
+        "https://charts.example.com/index.yaml", text=f"apiVersion: v1\nentries:\n  app:\n{entries}"
+    )
+
+    rc = sync_chart(
+        ConfigHelmChart(
+            source_registry="charts.example.com",
+            source_chart="app",
+            target_registry="registry.example.com",
+            target_repo="team",
+            versions=[">=2.0.0"],
+        ),
+        Creds(CredsFile()),
+    )
+
+    assert rc.ok is False
+    assert "matched no version" in rc.msg
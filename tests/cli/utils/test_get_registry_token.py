@@ -0,0 +1,45 @@
+import pytest
+import requests
+
+from cnairgapper.cli.utils import get_registry_token
+
+CHALLENGE = 'Bearer realm="https://auth.example.com/token",service="registry.example.com"'
+
+
+def test_get_registry_token_pings_registry_once(requests_mock):
+    ping = requests_mock.get(
+        "https://registry.example.com/v2/",
+        status_code=401,
+        headers={"WWW-Authenticate": CHALLENGE},
+    )
+    token = requests_mock.get("https://auth.example.com/token", json={"token": "abc"})
+
+    assert get_registry_token("registry.example.com/team/app:1.0") == "abc"
+    assert get_registry_token("registry.example.com/team/other:2.0", "user", "pass") == "abc"
+
+    assert ping.call_count == 1
+    assert token.call_count == 2
+    assert token.request_history[0].qs == {
+        "scope": ["repository:team/app:pull"],
+        "service": ["registry.example.com"],
+    }
+    assert token.request_history[0].headers.get("Authorization") is None
+    assert token.request_history[1].qs["scope"] == ["repository:team/other:pull"]
+    assert token.request_history[1].headers["Authorization"].startswith("Basic ")
+
+
+def test_get_registry_token_anonymous_registry(requests_mock):
+    requests_mock.get("https://registry.example.com/v2/", status_code=200)
+
+    assert get_registry_token("registry.example.com/team/app:1.0") == ""
+
+
+def test_get_registry_token_unsupported_scheme(requests_mock):
+    requests_mock.get(
+        "https://registry.example.com/v2/",
+        status_code=401,
+        headers={"WWW-Authenticate": 'Basic realm="Harbor"'},
+    )
+
+    with pytest.raises(requests.RequestException, match="Unsupported authentication scheme"):
+        get_registry_token("registry.example.com/team/app:1.0")
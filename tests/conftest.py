@@ -0,0 +1,56 @@
+import pytest
+from git import Actor, Repo
+
+from cnairgapper.charts import images, index, push, static
+from cnairgapper.cli import capabilities
+from cnairgapper.repositories import utils as repo_utils
+
+# the test environment has no git identity configured
+GIT_AUTHOR = Actor("Airgapper", "airgapper@example.com")
+
+
+@pytest.fixture(autouse=True)
+def reset_run_caches(monkeypatch):
+    """Keeps per-run caches from leaking between tests."""
+    monkeypatch.setattr(capabilities, "_capabilities", {})
+    monkeypatch.setattr(images, "_cache", None)
+    monkeypatch.setattr(index, "_indexes", {})
+    monkeypatch.setattr(index, "_charts", {})
+    monkeypatch.setattr(push, "_blob_repos", {})
+    monkeypatch.setattr(static, "_indexes", {})
+    monkeypatch.setattr(static, "_pending", set())
+    monkeypatch.setattr(repo_utils, "_remote_refs", {})
+
+
+@pytest.fixture
+def git_commit():
+    """Commits to a repository, appending the message to `file.txt` unless `files` is given.
+
+    Further keyword arguments, e.g. `parent_commits`, are passed to `IndexFile.commit`.
+    """
+
+    def commit(repo, message, files=None, **kwargs):
+        paths = []
+        for name, content in (files or {"file.txt": None}).items():
+            path = f"{repo.working_tree_dir}/{name}"
+            with open(path, "a" if content is None else "w", encoding="utf-8") as f:
+                f.write(f"{message}\n" if content is None else content)
+            paths.append(path)
+        repo.index.add(paths)
+        return repo.index.commit(message, author=GIT_AUTHOR, committer=GIT_AUTHOR, **kwargs)
+
+    return commit
+
+
+@pytest.fixture
+def source_repo(tmp_path, git_commit):
+    """A repository at `<tmp_path>/source` with a first commit on `main`."""
+    repo = Repo.init(tmp_path / "source", initial_branch="main")
+    git_commit(repo, "first")
+    return repo
+
+
+@pytest.fixture
+def target_repo(tmp_path):
+    """An empty bare repository at `<tmp_path>/target.git`."""
+    return Repo.init(tmp_path / "target.git", bare=True)
@@ -0,0 +1,107 @@
+import pytest
+import requests
+
+from cnairgapper.images import mirrors
+from cnairgapper.images.mirrors import select_image_sources
+from cnairgapper.models.config.config_image import ConfigImage
+from cnairgapper.models.creds.creds import Creds
+from cnairgapper.models.creds.creds_file import CredsFile
+from cnairgapper.models.resources.image import Image
+
+
+@pytest.fixture(autouse=True)
+def reset_run_cache(monkeypatch):
+    monkeypatch.setattr(mirrors, "_rankings", {})
+    monkeypatch.setattr(mirrors, "_unhealthy", set())
+    monkeypatch.setattr(mirrors, "_failures", {})
+
+
+def _mock_registry(requests_mock, registry, repo, digest):
+    base = f"https://{registry}/v2/{repo}"
+    requests_mock.get(f"https://{registry}/v2/", status_code=200)
+    # anonymous pull, no token required
+    requests_mock.get(f"{base}/manifests/latest", status_code=200)
+    requests_mock.get(f"{base}/manifests/1.0", json={"layers": [{"digest": "sha256:l1"}]})
+    requests_mock.head(f"{base}/manifests/1.0", headers={"Docker-Content-Digest": digest})
+    requests_mock.get(f"{base}/blobs/sha256:l1", content=b"x" * 1024)
+
+
+def _image(mirror_list):
+    return Image(
+        ConfigImage(
+            source="registry.example.com/org/app",
+            target="target.example.com/org/app",
+            mirrors=mirror_list,
+            tags=["1.0"],
+        )
+    )
+
+
+def test_select_image_sources_without_mirrors_skips_probing(requests_mock):
+    image = _image([])
+    sources = select_image_sources(image, "1.0", Creds(CredsFile()))
+    assert sources == [("registry.example.com", "org/app")]
+    assert requests_mock.call_count == 0
+
+
+def test_select_image_sources_excludes_digest_mismatch_and_dead_mirrors(requests_mock):
+    _mock_registry(requests_mock, "registry.example.com", "org/app", "sha256:good")
+    _mock_registry(requests_mock, "mirror.example.com", "proxy/org/app", "sha256:good")
+    _mock_registry(requests_mock, "stale.example.com", "org/app", "sha256:stale")
+    requests_mock.get("https://dead.example.com/v2/", exc=requests.exceptions.ConnectTimeout)
+
+    image = _image(["mirror.example.com/proxy", "stale.example.com", "dead.example.com"])
+    sources = select_image_sources(image, "1.0", Creds(CredsFile()), "sha256:good")
+
+    assert sorted(sources) == [
+        ("mirror.example.com", "proxy/org/app"),
+        ("registry.example.com", "org/app"),
+    ]
+
+
+def test_select_image_sources_skips_unhealthy_registries(requests_mock):
+    _mock_registry(requests_mock, "registry.example.com", "org/app", "sha256:good")
+    _mock_registry(requests_mock, "mirror.example.com", "org/app", "sha256:good")
+
+    image = _image(["mirror.example.com"])
+    credentials = Creds(CredsFile())
+    assert len(select_image_sources(image, "1.0", credentials)) == 2
+
+    # still answering its ping, excluded after repeated failures only
+    for _ in range(mirrors.FAILURE_LIMIT - 1):
+        mirrors.record_source_failure("mirror.example.com")
+    assert len(select_image_sources(image, "1.0", credentials)) == 2
+
+    mirrors.record_source_failure("mirror.example.com")
+    assert select_image_sources(image, "1.0", credentials) == [("registry.example.com", "org/app")]
+
+
+def test_select_image_sources_failed_reprobe_excludes_location(requests_mock):
+    _mock_registry(requests_mock, "registry.example.com", "org/app", "sha256:good")
+    _mock_registry(requests_mock, "mirror.example.com", "org/app", "sha256:good")
+    image = _image(["mirror.example.com"])
+    credentials = Creds(CredsFile())
+    assert len(select_image_sources(image, "1.0", credentials)) == 2
+
+    requests_mock.get("https://mirror.example.com/v2/", exc=requests.exceptions.ConnectTimeout)
+    mirrors.record_source_failure("mirror.example.com")
+
+    assert select_image_sources(image, "1.0", credentials) == [("registry.example.com", "org/app")]
+
+
+def test_select_image_sources_keys_locations_by_path_prefix(requests_mock):
+    _mock_registry(requests_mock, "registry.example.com", "org/app", "sha256:good")
+    _mock_registry(requests_mock, "harbor.example.com", "proxy-a/org/app", "sha256:good")
+    _mock_registry(requests_mock, "harbor.example.com", "proxy-b/org/app", "sha256:good")
+    image = _image(["harbor.example.com/proxy-a", "harbor.example.com/proxy-b"])
+    credentials = Creds(CredsFile())
+    assert len(select_image_sources(image, "1.0", credentials)) == 3
+
+    # the prefix of one proxy project breaks, the other one on the same host is kept
+    for _ in range(mirrors.FAILURE_LIMIT):
+        mirrors.record_source_failure("harbor.example.com/proxy-a")
+
+    assert sorted(select_image_sources(image, "1.0", credentials)) == [
+        ("harbor.example.com", "proxy-b/org/app"),
+        ("registry.example.com", "org/app"),
+    ]
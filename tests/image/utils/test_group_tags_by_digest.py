@@ -0,0 +1,22 @@
+from cnairgapper.images.utils import group_tags_by_digest
+
+
+def test_group_tags_by_digest_coalesces_aliases():
+    tags = ["1.2", "1.2.3", "latest", "1.1"]
+    digests = {
+        "1.2": "sha256:aaa",
+        "1.2.3": "sha256:aaa",
+        "latest": "sha256:aaa",
+        "1.1": "sha256:bbb",
+    }
+    assert group_tags_by_digest(tags, digests) == [["1.2", "1.2.3", "latest"], ["1.1"]]
+
+
+def test_group_tags_by_digest_keeps_unresolved_tags_separate():
+    tags = ["1.0", "2.0", "3.0"]
+    digests = {"2.0": "sha256:aaa"}
+    assert group_tags_by_digest(tags, digests) == [["1.0"], ["2.0"], ["3.0"]]
+
+
+def test_group_tags_by_digest_empty():
+    assert group_tags_by_digest([], {}) == []
@@ -83,3 +83,33 @@ def test_sync_resources_prevents_duplicate_git_repo():
     )
     sync = SyncResources([repo, repo])
     assert len(sync.repos) == 1
+
+
+def test_sync_resources_merges_image_targets():
+    prod = ConfigImage(source="source_image", target="prod/image", tags=["latest"])
+    dr = ConfigImage(source="source_image", target="dr/image", tags=["latest"])
+    sync = SyncResources([prod, dr])
+    assert len(sync.images) == 1
+    assert sync.images[0].targets == ["prod/image", "dr/image"]
+
+
+def test_sync_resources_keeps_image_with_different_tags_as_duplicate():
+    prod = ConfigImage(source="source_image", target="prod/image", tags=["latest"])
+    dr = ConfigImage(source="source_image", target="dr/image", tags=["1.0"])
+    sync = SyncResources([prod, dr])
+    assert len(sync.images) == 1
+    assert sync.images[0].targets == ["prod/image"]
+
+
+def test_sync_resources_merges_helm_chart_targets():
+    prod = ConfigHelmChart(
+        source_registry="source_registry",
+        source_chart="source_chart",
+        target_registry="prod_registry",
+        target_repo="target_repo",
+        versions=["1.0.0"],
+    )
+    dr = prod.model_copy(update={"target_registry": "dr_registry", "additional_targets": []})
+    sync = SyncResources([prod, dr, dr])
+    assert len(sync.charts) == 1
+    assert [t.target_registry for t in sync.charts[0].additional_targets] == ["dr_registry"]
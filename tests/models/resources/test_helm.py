@@ -53,3 +53,29 @@ def test_helm_chart_chart_name_without_slash_in_source():
     helm_chart = HelmChart(config_chart=config_chart, version=version)
 
     assert helm_chart.chart_name == "source-chart"
+
+
+def test_helm_chart_target_charts():
+    config_chart = ConfigHelmChart(
+        type="chart",
+        source_registry="source-registry",
+        source_chart="source-chart",
+        target_registry="target-registry",
+        target_repo="target-repo",
+        additional_targets=[
+            {
+                "target_registry": "dr-registry",
+                "target_repo": "dr-repo",
+                "target_repo_type": "nexus",
+            }
+        ],
+        versions=["1.0.0"],
+    )
+    helm_chart = HelmChart(config_chart=config_chart, version="1.0.0")
+
+    targets = helm_chart.target_charts
+    assert [t.target_ref for t in targets] == ["target-registry/target-repo", "dr-registry/dr-repo"]
+    assert targets[1].target_repo_type == "nexus"
+    assert targets[1].version == "1.0.0"
+    assert all(t.additional_targets == [] for t in targets)
+    assert helm_chart.target_registry == "target-registry"
@@ -89,3 +89,48 @@ def test_image_default_registry_and_tag():
     assert image.target_registry == "registry-1.docker.io"
     assert image.target_repo == "myrepo/python"
     assert image.target_name == "latest"
+
+
+def test_image_target_images():
+    config_image = ConfigImage(
+        type="docker",
+        source="registry-1.docker.io/library/python",
+        target="registry-2.docker.io/prod/python",
+        additional_targets=["registry-3.docker.io/dr/python", "registry-2.docker.io/prod/python"],
+        tags=["3.13"],
+    )
+    image = Image(config_image)
+
+    assert image.targets == ["registry-2.docker.io/prod/python", "registry-3.docker.io/dr/python"]
+    views = image.target_images
+    assert [v.target_registry for v in views] == ["registry-2.docker.io", "registry-3.docker.io"]
+    assert [v.target_repo for v in views] == ["prod/python", "dr/python"]
+    assert all(v.source == image.source for v in views)
+    assert image.target == "registry-2.docker.io/prod/python"
+
+
+def test_image_source_locations():
+    config_image = ConfigImage(
+        type="docker",
+        source="ubuntu",
+        target="registry-2.docker.io/myrepo/ubuntu",
+        mirrors=["mirror.gcr.io", "harbor.example.com/dockerhub-proxy/"],
+        tags=["24.04"],
+    )
+    image = Image(config_image)
+
+    assert image.source_locations == [
+        ("registry-1.docker.io", "library/ubuntu"),
+        ("mirror.gcr.io", "library/ubuntu"),
+        ("harbor.example.com", "dockerhub-proxy/library/ubuntu"),
+    ]
+
+
+def test_image_source_registry_with_port_or_localhost():
+    for source, expected in [
+        ("localhost:5000/app:1.0", ("localhost:5000", "app", "1.0")),
+        ("localhost/team/app", ("localhost", "team/app", "latest")),
+        ("bitnami/redis:7.2", ("registry-1.docker.io", "bitnami/redis", "7.2")),
+    ]:
+        image = Image(ConfigImage(source=source, target="registry.lab/app", tags=["1.0"]))
+        assert (image.source_registry, image.source_repo, image.source_name) == expected
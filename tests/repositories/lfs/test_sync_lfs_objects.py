@@ -0,0 +1,95 @@
+import hashlib
+import os
+
+from cnairgapper.cli import cache
+from cnairgapper.models.creds.creds_git_repo import CredsGitRepo
+from cnairgapper.repositories.lfs import lfs_object_path, sync_lfs_objects
+
+SOURCE = "https://git.example.com/org/assets.git"
+TARGET = "https://git.internal.example.com/mirror/assets"
+CONTENTS = [b"design asset", b"already mirrored"]
+
+
+def _oid(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def test_sync_lfs_objects_uploads_missing_objects(
+    tmp_path, monkeypatch, requests_mock, source_repo, git_commit
+):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path / "cache"))
+    repo = source_repo
+    pointers = {
+        f"asset{i}.psd": "version https://git-lfs.github.com/spec/v1\n"
+        f"oid sha256:{_oid(content)}\nsize {len(content)}\n"
+        for i, content in enumerate(CONTENTS)
+    }
+    git_commit(repo, "assets", files=pointers)
+    missing, present = (_oid(c) for c in CONTENTS)
+    upload_batch = requests_mock.post(
+        f"{TARGET}.git/info/lfs/objects/batch",
+        json={
+            "objects": [
+                {
+                    "oid": missing,
+                    "size": len(CONTENTS[0]),
+                    "actions": {"upload": {"href": f"https://lfs.internal/{missing}"}},
+                },
+                {"oid": present, "size": len(CONTENTS[1])},
+            ]
+        },
+    )
+    download_batch = requests_mock.post(
+        f"{SOURCE}/info/lfs/objects/batch",
+        json={
+            "objects": [
+                {
+                    "oid": missing,
+                    "size": len(CONTENTS[0]),
+                    "actions": {"download": {"href": f"https://lfs.example.com/{missing}"}},
+                }
+            ]
+        },
+    )
+    requests_mock.get(f"https://lfs.example.com/{missing}", content=CONTENTS[0])
+    uploaded = []
+    upload = requests_mock.put(
+        f"https://lfs.internal/{missing}",
+        text=lambda request, _: uploaded.append(request.body.read()) or "",
+    )
+    creds = CredsGitRepo(name="git.example.com", username="user", password="token")
+
+    rc = sync_lfs_objects(
+        repo,
+        ["refs/heads/main"],
+        [],
+        source_url=SOURCE,
+        source_creds=creds,
+        target_url=TARGET,
+        target_creds=creds,
+    )
+
+    assert rc.ok is True
+    assert "1 of 2" in rc.msg
+    assert upload_batch.last_request.json()["operation"] == "upload"
+    assert upload_batch.last_request.headers["Authorization"].startswith("Basic ")
+    assert download_batch.last_request.json()["objects"] == [
+        {"oid": missing, "size": len(CONTENTS[0])}
+    ]
+    assert uploaded == [CONTENTS[0]]
+    assert os.path.exists(lfs_object_path(missing))
+
+    # the object cache is shared, the source is not asked again
+    rc = sync_lfs_objects(
+        repo,
+        ["refs/heads/main"],
+        [],
+        source_url=SOURCE,
+        source_creds=creds,
+        target_url=TARGET,
+        target_creds=creds,
+    )
+
+    assert rc.ok is True
+    assert download_batch.call_count == 1
+    assert upload.call_count == 2
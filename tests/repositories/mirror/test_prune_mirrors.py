@@ -0,0 +1,21 @@
+import os
+
+from cnairgapper.cli import cache
+from cnairgapper.repositories import mirror
+from cnairgapper.repositories.mirror import mirror_path, open_mirror, prune_mirrors
+
+
+def test_prune_mirrors_removes_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_cache_dir", str(tmp_path))
+    monkeypatch.setattr(mirror, "_budget", 1 << 40)
+    for url in ("https://git.example.com/old.git", "https://git.example.com/new.git"):
+        with open_mirror(url):
+            pass
+    os.utime(mirror_path("https://git.example.com/old.git"), (1, 1))
+
+    # over budget, the least recently used mirror goes first
+    monkeypatch.setattr(mirror, "_budget", 1)
+    prune_mirrors(keep=mirror_path("https://git.example.com/new.git"))
+
+    assert not os.path.exists(mirror_path("https://git.example.com/old.git"))
+    assert os.path.isdir(mirror_path("https://git.example.com/new.git"))
@@ -0,0 +1,26 @@
+from git import Repo
+
+from cnairgapper.repositories.push import push_repo_refs
+
+
+def test_push_repo_refs_reports_each_ref(source_repo, target_repo, git_commit):
+    source = source_repo
+    target_url = target_repo.git_dir
+    refs = {"main": "refs/heads/main"}
+    assert [rc.ok for rc in push_repo_refs(source.git_dir, target_url, refs)] == [True]
+
+    # rewrite main and add a tag, the push rejects only the non fast-forward update
+    git_commit(source, "rewritten", parent_commits=[])
+    source.create_tag("v1.0.0")
+    refs = {"main": "refs/heads/main", "v1.0.0": "refs/tags/v1.0.0"}
+
+    rcs = push_repo_refs(source.git_dir, target_url, refs)
+
+    assert [rc.ref for rc in rcs] == ["main", "v1.0.0"]
+    assert [rc.ok for rc in rcs] == [False, True]
+    assert "rejected" in rcs[0].msg
+
+    rcs = push_repo_refs(source.git_dir, target_url, refs, push_mode="force")
+
+    assert [rc.ok for rc in rcs] == [True, True]
+    assert Repo(target_url).commit("main") == source.commit("main")
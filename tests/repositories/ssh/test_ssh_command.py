@@ -0,0 +1,27 @@
+import os
+import shlex
+
+from cnairgapper.repositories.ssh import close_ssh_masters, ssh_command
+
+
+def _control_path(command):
+    args = shlex.split(command)
+    return next(a for a in args if a.startswith("ControlPath=")).removeprefix("ControlPath=")
+
+
+def test_ssh_command_shares_master_per_host_and_key(tmp_path):
+    first = ssh_command("git@github.com:org/a.git", str(tmp_path / "key"))
+    second = ssh_command("git@gitlab.com:org/b.git", str(tmp_path / "key"))
+    other_key = ssh_command("git@github.com:org/a.git", str(tmp_path / "other"))
+    local_setup = ssh_command("git@github.com:org/a.git")
+
+    assert "ControlMaster=auto" in shlex.split(first)
+    # %C tells hosts apart, the folder keys
+    assert _control_path(first) == _control_path(second)
+    assert _control_path(first) != _control_path(other_key)
+    assert "-i" not in shlex.split(local_setup)
+
+    control_dir = os.path.dirname(os.path.dirname(_control_path(first)))
+    assert os.path.isdir(control_dir)
+    close_ssh_masters()
+    assert not os.path.exists(control_dir)
@@ -0,0 +1,35 @@
+import pytest
+
+from cnairgapper.models.config.config_git_repo import ConfigGitRepo
+from cnairgapper.models.creds.creds import Creds
+from cnairgapper.models.creds.creds_file import CredsFile
+from cnairgapper.models.resources.git import GitRepo
+from cnairgapper.repositories.utils import get_matching_refs
+
+
+@pytest.fixture
+def git_repo(source_repo):
+    for tag in ("v1.0.0", "v1.1.0", "v2.0.0", "nightly"):
+        source_repo.create_tag(tag)
+    source_repo.create_head("v1.x")
+    return GitRepo(ConfigGitRepo(source_repo=source_repo.working_tree_dir, target_repo="unused"))
+
+
+def test_get_matching_refs_branches_and_tags(git_repo):
+    assert sorted(get_matching_refs("v1\\..*", git_repo, Creds(CredsFile()))) == [
+        "v1.0.0",
+        "v1.1.0",
+        "v1.x",
+    ]
+
+
+def test_get_matching_refs_lists_refs_once_per_run(tmp_path, git_repo):
+    assert get_matching_refs("v2.*", git_repo, Creds(CredsFile())) == ["v2.0.0"]
+    (tmp_path / "source" / ".git" / "refs" / "tags" / "v2.0.0").unlink()
+
+    # served from the run cache, the removed tag is still listed
+    assert get_matching_refs("v2.*", git_repo, Creds(CredsFile())) == ["v2.0.0"]
+
+
+def test_get_matching_refs_invalid_pattern(git_repo):
+    assert get_matching_refs("v[", git_repo, Creds(CredsFile())) == []
@@ -0,0 +1,11 @@
+from cnairgapper.repositories.utils import has_commit
+
+
+def test_has_commit(source_repo):
+    repo = source_repo
+    commit = repo.head.commit
+
+    assert has_commit(repo, commit.hexsha) is True
+    # the tree is an object of the repository, but no commit
+    assert has_commit(repo, commit.tree.hexsha) is False
+    assert has_commit(repo, "0" * 40) is False